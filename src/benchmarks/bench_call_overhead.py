@@ -0,0 +1,111 @@
+#
+# Per-call client overhead benchmark
+#
+# Calls get_contact_by_email against a zero-latency in-memory transport, so
+# the time measured is the client's own work. Compares the native synchronous
+# client with the previous approach of driving the async source by hand with
+# ``coro.send`` after a ``sniffio`` check (reproduced below), and with the
+# async client.
+#
+# usage (from src/): python -m benchmarks.bench_call_overhead [--calls 5000]
+#
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+import sniffio
+
+from hubspotclient.client.hubspot.async_client import HubspotClient as AsyncHubspotClient
+from hubspotclient.client.hubspot.base import BaseHubspotClient
+from hubspotclient.client.hubspot.client import HubspotClient
+
+
+def _handler(request):
+    return httpx.Response(200, json={"total": 0, "results": []})
+
+
+class _SteppedClient(httpx.Client):
+    # the old SyncClient: httpx.Client with coroutine methods
+    async def request(self, *args, **kwargs):
+        return super().request(*args, **kwargs)
+
+
+class _SteppedHubspotClient(BaseHubspotClient):
+    client_cls = _SteppedClient
+
+
+def _stepped(coro):
+    # the old maybe_sync wrapper
+    try:
+        sniffio.current_async_library()
+    except sniffio.AsyncLibraryNotFoundError:
+        pass
+    else:
+        return coro
+    result = None
+    try:
+        while True:
+            result = coro.send(result)
+    except StopIteration as si:
+        return si.value
+
+
+def _client(cls):
+    return cls(
+        hubspot_auth_token="x",
+        transport=httpx.MockTransport(_handler),
+        rate_limiter=False,
+    )
+
+
+def run_native(calls):
+    client = _client(HubspotClient)
+    for i in range(calls):
+        client.get_contact_by_email("user{}@example.org".format(i))
+
+
+def run_stepped(calls):
+    client = _client(_SteppedHubspotClient)
+    for i in range(calls):
+        _stepped(client.get_contact_by_email("user{}@example.org".format(i)))
+
+
+def run_async(calls):
+    async def _run():
+        client = _client(AsyncHubspotClient)
+        for i in range(calls):
+            await client.get_contact_by_email("user{}@example.org".format(i))
+
+    asyncio.run(_run())
+
+
+def measure(name, fn, calls):
+    fn(min(calls, 100))  # warm up, incl. generating the synchronous code
+    start = time.perf_counter()
+    fn(calls)
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": name,
+        "calls": calls,
+        "us_per_call": round(elapsed / calls * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call client overhead benchmark")
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    results = [
+        measure("sync-native", run_native, args.calls),
+        measure("sync-stepped-coroutine", run_stepped, args.calls),
+        measure("async", run_async, args.calls),
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
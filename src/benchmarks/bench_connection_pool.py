@@ -0,0 +1,101 @@
+#
+# Connection reuse benchmark
+#
+# Starts a local stand-in for api.hubapi.com that counts TCP connections and
+# compares a fresh client per call (the old behaviour of
+# ``BaseHubspotClient.request``) with the pooled client.
+#
+# usage (from src/): python -m benchmarks.bench_connection_pool [--calls 200]
+#
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from hubspotclient.client.hubspot.async_client import HubspotClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with _Handler.lock:
+            _Handler.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({"total": 0, "results": []}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run_fresh(base_url, calls):
+    for _ in range(calls):
+        client = HubspotClient(
+            hubspot_base_url=base_url, hubspot_auth_token="x", rate_limiter=False
+        )
+        await client.get_contact_by_email("someone@example.org")
+        await client.close()
+
+
+async def run_pooled(base_url, calls):
+    async with HubspotClient(
+        hubspot_base_url=base_url, hubspot_auth_token="x", rate_limiter=False
+    ) as client:
+        for _ in range(calls):
+            await client.get_contact_by_email("someone@example.org")
+
+
+def measure(name, fn, base_url, calls):
+    _Handler.connections = 0
+    start = time.perf_counter()
+    asyncio.run(fn(base_url, calls))
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": name,
+        "calls": calls,
+        "connections": _Handler.connections,
+        "seconds": round(elapsed, 4),
+        "calls_per_second": round(calls / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Connection reuse benchmark")
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    server = start_server()
+    base_url = "http://127.0.0.1:{}/crm/v3/objects".format(server.server_port)
+    try:
+        results = [
+            measure("fresh-client-per-call", run_fresh, base_url, args.calls),
+            measure("pooled", run_pooled, base_url, args.calls),
+        ]
+    finally:
+        server.shutdown()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
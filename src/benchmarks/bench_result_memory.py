@@ -0,0 +1,69 @@
+#
+# Memory per search result benchmark
+#
+# Decodes the same page of contacts into Hubspot's JSON dicts and into the
+# typed models (hubspotclient.client.hubspot.models) and reports the bytes
+# held per contact, measured with tracemalloc.
+#
+# usage (from src/): python -m benchmarks.bench_result_memory [--contacts 100000]
+#
+
+import argparse
+import gc
+import json
+import tracemalloc
+
+from hubspotclient.client.hubspot.models import Contact
+
+
+def _contact(i):
+    return {
+        "id": str(i),
+        "properties": {
+            "createdate": "2019-12-18T19:49:03.109Z",
+            "email": "user{}@example.org".format(i),
+            "firstname": "First{}".format(i),
+            "hs_object_id": str(i),
+            "lastmodifieddate": "2021-07-08T17:28:39.152Z",
+            "lastname": "Last{}".format(i),
+        },
+        "createdAt": "2019-12-18T19:49:03.109Z",
+        "updatedAt": "2021-07-08T17:28:39.152Z",
+        "archived": False,
+    }
+
+
+def measure(name, decode, payload, contacts):
+    gc.collect()
+    tracemalloc.start()
+    results = decode(payload)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return {
+        "mode": name,
+        "contacts": contacts,
+        "bytes_per_contact": round(size / contacts),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory per search result benchmark")
+    parser.add_argument("--contacts", type=int, default=100000)
+    args = parser.parse_args()
+
+    payload = json.dumps([_contact(i) for i in range(args.contacts)])
+    results = [
+        measure("dict", json.loads, payload, args.contacts),
+        measure(
+            "typed",
+            lambda p: [Contact.from_json(c) for c in json.loads(p)],
+            payload,
+            args.contacts,
+        ),
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+#
+# Benchmark suite
+#
+# Runs the client against the in-memory fake Hubspot
+# (hubspotclient.client.hubspot.fake) and reports, as JSON:
+#
+# - throughput: requests/second and p50/p95/p99 latency of
+#   get_contact_by_email, committee search (get_contacts_by_committee) and
+#   update_contact, with the sync client on threads and the async client on
+#   tasks, at several concurrency levels
+# - overhead: per-call cost of the client itself on a zero-latency transport
+#   (see bench_call_overhead)
+# - memory: bytes held per search result, dicts and typed models (see
+#   bench_result_memory)
+#
+# Save the output of one commit and pass it to --compare on another to see
+# the change of every metric; --max-regression makes the run fail when one
+# got worse by more than that many percent.
+#
+# usage (from src/):
+#   python -m benchmarks.suite [--calls 400] [--concurrency 1,8,32]
+#       [--latency 0.005] [--output results.json]
+#       [--compare baseline.json [--max-regression 10]]
+#
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from hubspotclient.client.hubspot.async_client import HubspotClient as AsyncHubspotClient
+from hubspotclient.client.hubspot.client import HubspotClient
+from hubspotclient.client.hubspot.fake import COMMITTEES, FakeHubspot
+from hubspotclient.client.hubspot.models import Contact
+
+from benchmarks import bench_call_overhead, bench_result_memory
+
+
+OPERATIONS = ("get_contact_by_email", "committee_search", "update_contact")
+METRICS = (
+    "requests_per_second",
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "us_per_call",
+    "bytes_per_contact",
+)
+# metrics where a larger value is better; for the others smaller is better
+HIGHER_IS_BETTER = ("requests_per_second",)
+
+
+def _operation(name, client, emails, ids):
+    """Return ``call(i)`` running the i-th call of an operation."""
+    if name == "get_contact_by_email":
+        return lambda i: client.get_contact_by_email(emails[i % len(emails)])
+    if name == "committee_search":
+        return lambda i: client.get_contacts_by_committee(COMMITTEES[i % len(COMMITTEES)])
+    if name == "update_contact":
+        return lambda i: client.update_contact(
+            ids[i % len(ids)], {"firstname": "Bench{}".format(i)}
+        )
+    raise ValueError(name)
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of a sorted list."""
+    if not ordered:
+        return None
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(name, latencies, elapsed, **fields):
+    ordered = sorted(latencies)
+    result = {"name": name}
+    result.update(fields)
+    result.update(
+        {
+            "calls": len(ordered),
+            "requests_per_second": round(len(ordered) / elapsed, 1),
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        }
+    )
+    return result
+
+
+def run_sync(fake, operation, calls, concurrency, emails, ids):
+    client = HubspotClient(
+        hubspot_auth_token="bench", transport=fake.transport(), rate_limiter=False
+    )
+    call = _operation(operation, client, emails, ids)
+
+    def _timed(i):
+        start = time.perf_counter()
+        call(i)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(_timed, range(concurrency)))  # warm up
+        start = time.perf_counter()
+        latencies = list(executor.map(_timed, range(calls)))
+        elapsed = time.perf_counter() - start
+    client.close()
+    return latencies, elapsed
+
+
+def run_async(fake, operation, calls, concurrency, emails, ids):
+    async def _run():
+        client = AsyncHubspotClient(
+            hubspot_auth_token="bench", transport=fake.transport(), rate_limiter=False
+        )
+        call = _operation(operation, client, emails, ids)
+        latencies = []
+        counter = iter(range(calls))
+
+        async def _worker():
+            for i in counter:
+                start = time.perf_counter()
+                await call(i)
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(call(i) for i in range(concurrency)))  # warm up
+        start = time.perf_counter()
+        await asyncio.gather(*(_worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        await client.close()
+        return latencies, elapsed
+
+    return asyncio.run(_run())
+
+
+def throughput(args):
+    fake = FakeHubspot(latency=args.latency).seed(contacts=args.contacts)
+    contacts = fake.records("contacts")
+    emails = [contact["properties"]["email"] for contact in contacts]
+    ids = [contact["id"] for contact in contacts]
+
+    results = []
+    for operation in OPERATIONS:
+        for mode, run in (("sync", run_sync), ("async", run_async)):
+            for concurrency in args.concurrency:
+                latencies, elapsed = run(
+                    fake, operation, args.calls, concurrency, emails, ids
+                )
+                results.append(
+                    summarize(
+                        "throughput/{}/{}/c{}".format(operation, mode, concurrency),
+                        latencies,
+                        elapsed,
+                        operation=operation,
+                        mode=mode,
+                        concurrency=concurrency,
+                    )
+                )
+                print(json.dumps(results[-1]), file=sys.stderr)
+    return results
+
+
+def overhead(args):
+    results = []
+    for mode, fn in (
+        ("sync", bench_call_overhead.run_native),
+        ("async", bench_call_overhead.run_async),
+    ):
+        result = bench_call_overhead.measure(mode, fn, args.overhead_calls)
+        results.append(
+            {
+                "name": "overhead/get_contact_by_email/{}".format(mode),
+                "mode": mode,
+                "calls": result["calls"],
+                "us_per_call": result["us_per_call"],
+            }
+        )
+    return results
+
+
+def memory(args):
+    contacts = [bench_result_memory._contact(i) for i in range(args.memory_contacts)]
+    payload = json.dumps(contacts)
+    results = []
+    for mode, decode in (
+        ("dict", json.loads),
+        ("typed", lambda p: [Contact.from_json(c) for c in json.loads(p)]),
+    ):
+        result = bench_result_memory.measure(mode, decode, payload, args.memory_contacts)
+        results.append(
+            {
+                "name": "memory/contact/{}".format(mode),
+                "mode": mode,
+                "contacts": result["contacts"],
+                "bytes_per_contact": result["bytes_per_contact"],
+            }
+        )
+    return results
+
+
+def _commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """
+    Return the change of every metric present in both runs, in percent, and
+    whether it is a regression.
+    """
+    previous = {result["name"]: result for result in baseline["results"]}
+    changes = []
+    for result in results:
+        old = previous.get(result["name"])
+        if old is None:
+            continue
+        for metric in METRICS:
+            if metric not in result or not old.get(metric):
+                continue
+            change = (result[metric] - old[metric]) / float(old[metric]) * 100
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            changes.append(
+                {
+                    "name": result["name"],
+                    "metric": metric,
+                    "baseline": old[metric],
+                    "value": result[metric],
+                    "change_percent": round(change, 1),
+                    "regression_percent": round(max(0.0, worse), 1),
+                }
+            )
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hubspot client benchmark suite")
+    parser.add_argument("--calls", type=int, default=400, help="calls per scenario")
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(level) for level in value.split(",")],
+        default=[1, 8, 32],
+        help="comma-separated concurrency levels",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.005, help="fake Hubspot latency, seconds"
+    )
+    parser.add_argument(
+        "--contacts", type=int, default=2000, help="size of the fake dataset"
+    )
+    parser.add_argument("--overhead-calls", type=int, default=5000)
+    parser.add_argument("--memory-contacts", type=int, default=50000)
+    parser.add_argument("--output", help="write the results to this file")
+    parser.add_argument("--compare", help="results of a previous run to compare with")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        help="exit with status 1 if a metric regressed by more than this many percent",
+    )
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.now(timezone.utc).isoformat(),
+            "calls": args.calls,
+            "latency": args.latency,
+            "contacts": args.contacts,
+        },
+        "results": throughput(args) + overhead(args) + memory(args),
+    }
+
+    failed = False
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(report["results"], json.load(f))
+        if args.max_regression is not None:
+            failed = any(
+                change["regression_percent"] > args.max_regression
+                for change in report["comparison"]
+            )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Command line interface of the Hubspot client, for live checks against a
+Hubspot account and bulk exports::
+
+    export HUBSPOT_AUTH_TOKEN=...
+    hubspotclient committee INSTRuCT
+    hubspotclient contact someone@example.org
+    hubspotclient update-contact 9601 --firstname Luca
+    hubspotclient export contacts contacts.csv --format csv \\
+        --properties email,firstname,lastname --partitions 8
+
+An interrupted export resumes when run again; ``--restart`` starts over.
+Run as ``python -m hubspotclient.cli`` without installing the package.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from .client.hubspot.client import HubspotClient
+from .client.hubspot.errors import HubspotError
+from .client.hubspot.export import FORMATS
+
+
+def _properties(value):
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="hubspotclient", description="Live checks and bulk exports against Hubspot"
+    )
+    parser.add_argument(
+        "--token",
+        default=os.environ.get("HUBSPOT_AUTH_TOKEN"),
+        help="Hubspot API key, defaults to $HUBSPOT_AUTH_TOKEN",
+    )
+    parser.add_argument("--base-url", default="https://api.hubapi.com/crm/v3/objects/")
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="answer the lookups with the client's test data (HUBSPOT_DEBUG)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    committee = commands.add_parser("committee", help="list the members of a committee")
+    committee.add_argument("consortium", help="consortium code, e.g. INSTRuCT")
+
+    contact = commands.add_parser("contact", help="look up a contact by email")
+    contact.add_argument("email")
+
+    update = commands.add_parser("update-contact", help="update a contact's name")
+    update.add_argument("contact_id")
+    update.add_argument("--firstname")
+    update.add_argument("--lastname")
+
+    export = commands.add_parser("export", help="export every contact or company to a file")
+    export.add_argument("object_type", choices=("contacts", "companies"))
+    export.add_argument("output")
+    export.add_argument(
+        "--properties", type=_properties, default=[], help="comma-separated properties"
+    )
+    export.add_argument("--format", choices=FORMATS, default="ndjson")
+    export.add_argument("--partitions", type=int, default=4, help="ID ranges exported at once")
+    export.add_argument(
+        "--restart", action="store_true", help="ignore the progress of an interrupted export"
+    )
+    return parser.parse_args(argv)
+
+
+def _print(data):
+    print(json.dumps(data, indent=2, sort_keys=True))
+
+
+def run(args, hubspot):
+    """Run the command of parsed ``args`` with ``hubspot``; return the exit status."""
+    if args.command == "committee":
+        committee = "{} Executive Committee Member".format(args.consortium)
+        response = hubspot.get_contacts_by_committee(committee=committee)
+        _print(response)
+        return 0 if response and int(response.get("total") or 0) else 1
+    if args.command == "contact":
+        response = hubspot.get_contact_by_email(email=args.email)
+        _print(response)
+        return 0 if response and int(response.get("total") or 0) else 1
+    if args.command == "update-contact":
+        properties = {}
+        if args.firstname:
+            properties["firstname"] = args.firstname
+        if args.lastname:
+            properties["lastname"] = args.lastname
+        if not properties:
+            print("nothing to update: pass --firstname and/or --lastname", file=sys.stderr)
+            return 2
+        _print(hubspot.update_contact(args.contact_id, properties))
+        return 0
+    if args.command == "export":
+        count = hubspot.export(
+            args.object_type,
+            args.output,
+            args.properties,
+            format=args.format,
+            partitions=args.partitions,
+            resume=not args.restart,
+        )
+        print("exported {} {} to {}".format(count, args.object_type, args.output))
+        return 0
+    raise ValueError(args.command)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.debug:
+        os.environ["HUBSPOT_DEBUG"] = "TRUE"
+    if not args.token and not args.debug:
+        raise SystemExit("pass --token or set HUBSPOT_AUTH_TOKEN")
+    with HubspotClient(hubspot_auth_token=args.token, hubspot_base_url=args.base_url) as hubspot:
+        try:
+            status = run(args, hubspot)
+        except HubspotError as e:
+            print("Hubspot request failed: {}".format(e.message), file=sys.stderr)
+            status = 1
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,10 @@ class CrmClient(six.with_metaclass(abc.ABCMeta)):
     def get_contact_by_email(self, email, hubspot_id=None):
         pass
 
+    @abc.abstractmethod
+    def get_contacts_by_emails(self, emails):
+        pass
+
     @abc.abstractmethod
     def get_contacts_by_committee(self, committee):
         pass
@@ -0,0 +1,97 @@
+"""
+Associations between contacts and companies, read in batches and cached.
+
+:meth:`~.base.BaseHubspotClient.get_associations` reads the associations of
+many objects with Hubspot's batch association reads, ``ASSOCIATION_BATCH_SIZE``
+IDs per request and several requests at a time, and keeps the associated IDs
+of every object in an :class:`AssociationCache` for ``association_ttl``
+seconds. :meth:`~.base.BaseHubspotClient.get_contacts_with_companies` joins
+contacts with their company records in two rounds of batch requests: the
+associations (and the contacts, if only their IDs are given), then the
+companies::
+
+    members = hubspot.get_contacts_by_committee(committee)["results"]
+    for contact in hubspot.get_contacts_with_companies(members):
+        print(contact["properties"]["email"], [c["properties"]["name"] for c in contact["companies"]])
+
+Cached associations aren't invalidated by writes: associations made or
+removed in Hubspot show up once the cached ones expire.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+# maximum number of IDs in one batch association read
+ASSOCIATION_BATCH_SIZE = 100
+DEFAULT_ASSOCIATION_TTL = 300
+DEFAULT_MAX_ENTRIES = 100000
+
+
+def association_results(response_json):
+    """
+    Map each ``from`` ID of a batch association read to its associated IDs.
+    Objects with no associations are left out (Hubspot reports them as errors).
+    """
+    associations = {}
+    for result in response_json.get("results") or ():
+        to_ids = associations.setdefault(str(result["from"]["id"]), [])
+        for to in result.get("to") or ():
+            # "toObjectId" in the v4 API
+            to_ids.append(str(to.get("id", to.get("toObjectId"))))
+    return associations
+
+
+class AssociationCache(object):
+    """
+    Thread-safe associated IDs per ``(from type, to type, from ID)``, kept for
+    ``ttl`` seconds, the least recently used dropped past ``max_entries``.
+    """
+
+    def __init__(self, ttl=DEFAULT_ASSOCIATION_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_many(self, from_type, to_type, ids):
+        """
+        Return the cached associations of ``ids`` as a dict, and the list of
+        the IDs that aren't cached.
+        """
+        now = time.monotonic()
+        found, missing = {}, []
+        with self._lock:
+            for object_id in ids:
+                key = (from_type, to_type, object_id)
+                entry = self._entries.get(key)
+                if entry is None or entry[0] <= now:
+                    missing.append(object_id)
+                    continue
+                self._entries.move_to_end(key)
+                found[object_id] = list(entry[1])
+            self._hits += len(found)
+            self._misses += len(missing)
+        return found, missing
+
+    def set_many(self, from_type, to_type, associations):
+        """Cache the associated IDs of each ID of the dict ``associations``."""
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for object_id, to_ids in associations.items():
+                key = (from_type, to_type, object_id)
+                self._entries[key] = (expires, tuple(to_ids))
+                self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self._hits, "misses": self._misses}
@@ -1,11 +1,126 @@
 import httpx
 
 from .base import BaseHubspotClient
+from .fanout import CallResult, call_args
+from .taskgroup import DEFAULT_MAX_CONCURRENCY, TaskGroup
+
+
+async def _call_in_env(env, kwargs, fn, args):
+    env.restore(kwargs)
+    return await fn(*args)
+
+
+class CallStream(object):
+    """
+    The results of :meth:`HubspotClient.as_completed`, to iterate over with
+    ``async for``. Leaving the ``async with`` block it is used in, or
+    :meth:`aclose`, cancels the calls still running.
+    """
+
+    def __init__(self, results):
+        self._results = results
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self._results.__anext__()
+
+    async def aclose(self):
+        """Cancel the calls still running and wait for them to stop."""
+        await self._results.aclose()
 
 
 class HubspotClient(BaseHubspotClient):
     client_cls = httpx.AsyncClient
 
-    # This is used for backoff.on_predicate to detect async correctly
-    async def healthy(self, timeout=1):
-        return await super().healthy(timeout)
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def task_group(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, fail_fast=True):
+        """
+        Return a :class:`~.taskgroup.TaskGroup` running at most
+        ``max_concurrency`` calls at once, to use with ``async with``.
+        """
+        return TaskGroup(max_concurrency, fail_fast)
+
+    def _spawn_all(self, group, method, items):
+        """
+        Spawn ``method`` (a client method or its name) on ``group`` once per
+        item, with the caller's ``context()`` settings; return the
+        ``{task: (index, args)}`` of the calls.
+        """
+        fn = getattr(self, method) if isinstance(method, str) else method
+        kwargs = self._env.current()
+        calls = {}
+        for index, item in enumerate(items):
+            args = call_args(item)
+            task = group.spawn(_call_in_env, self._env, kwargs, fn, args)
+            calls[task] = (index, args)
+        return calls
+
+    @staticmethod
+    def _call_result(task, index, args):
+        if task.exception() is not None:
+            return CallResult(args, error=task.exception(), index=index)
+        return CallResult(args, value=task.result(), index=index)
+
+    async def map(
+        self, method, items, max_concurrency=DEFAULT_MAX_CONCURRENCY, fail_fast=False
+    ):
+        """
+        Await ``method`` once per item, at most ``max_concurrency`` at a time,
+        see :mod:`~.taskgroup`.
+
+        Args:
+            method: a client method, e.g. ``hubspot.get_contact_by_email``, or
+                its name
+            items (iterable): the arguments of each call, a tuple or a single
+                value
+            max_concurrency (int): calls in flight
+            fail_fast (bool): on the first error, cancel the other calls and
+                raise it
+
+        Return:
+            list: one :class:`~.fanout.CallResult` per item, in order; a call
+            that raised has its exception in ``error``
+        """
+        async with TaskGroup(max_concurrency, fail_fast) as group:
+            calls = self._spawn_all(group, method, items)
+        return [self._call_result(task, *call) for task, call in calls.items()]
+
+    def as_completed(
+        self, method, items, max_concurrency=DEFAULT_MAX_CONCURRENCY, fail_fast=False
+    ):
+        """
+        Like :meth:`map`, but yield each :class:`~.fanout.CallResult` as soon
+        as its call finishes; its ``index`` is the position of its input.
+
+        A loop that may stop early (``break``, an exception) should run inside
+        ``async with``, which cancels the calls still running when it exits::
+
+            async with hubspot.as_completed(method, items) as results:
+                async for result in results:
+                    ...
+
+        Otherwise they run on until the iterator is garbage collected.
+
+        Return:
+            CallStream: the results, in the order the calls finish
+        """
+        return CallStream(self._as_completed(method, items, max_concurrency, fail_fast))
+
+    async def _as_completed(self, method, items, max_concurrency, fail_fast):
+        async with TaskGroup(max_concurrency, fail_fast) as group:
+            calls = self._spawn_all(group, method, items)
+            async for task in group.as_completed():
+                yield self._call_result(task, *calls[task])
@@ -4,20 +4,98 @@ Base classes for interfacing with the Hubspot service for hubspot. Please use
 :class:`~.async_client.HubspotClient` in asynchronous context like FastAPI.
 """
 
+import asyncio
 import inspect
 import json
+import time
 from collections import deque
 from urllib.parse import quote
 
-import backoff
 import contextvars
 import httpx
 from cdislogging import get_logger
 
-from ..hubspot.errors import HubspotError, HubspotUnhealthyError
+from ..hubspot.associations import (
+    ASSOCIATION_BATCH_SIZE,
+    DEFAULT_ASSOCIATION_TTL,
+    AssociationCache,
+    association_results,
+)
+from ..hubspot.breaker import CircuitBreakers
+from ..hubspot.deadline import as_deadline, cap_timeout, earliest
+from ..hubspot.errors import (
+    HubspotCircuitOpenError,
+    HubspotDeadlineError,
+    HubspotError,
+    HubspotUnhealthyError,
+    HubspotValidationError,
+)
+from ..hubspot.cache import ResponseCache, contact_tags, contact_write_tags
+from ..hubspot.changes import (
+    DEFAULT_OVERLAP,
+    MODIFIED_PROPERTY,
+    Watermark,
+    modified_ms,
+    timestamp_ms,
+)
+from ..hubspot.events import Listeners, endpoint_of
+from ..hubspot.export import ExportJob, range_filters, split_range
+from ..hubspot.hedging import Hedger
+from ..hubspot.loader import ContactLoader
+from ..hubspot.models import Company, Contact, HubspotObject, SearchPage
+from ..hubspot.ratelimit import shared_rate_limiter
+from ..hubspot.retry import RetryPolicy, resolve_policy
+from ..hubspot.schema import DEFAULT_SCHEMA_TTL, RECHECK_AFTER, PropertySchema, SchemaCache
+from ..hubspot.singleflight import FlightTimeout, SingleFlight, flight_key
+from ..hubspot.transport import ConnectionPool
 from ..base import CrmClient
 from ... import string_types
-from ...utils import maybe_sync
+from ...utils import (
+    cancel_background,
+    chunked,
+    map_bounded,
+    maybe_sync,
+    sleep,
+    start_background,
+    wait_background,
+    wait_first,
+)
+from .batch import (
+    BatchRecordResult,
+    CONFLICT,
+    CREATED,
+    ERROR,
+    UPDATED,
+    conflict_message,
+    existing_id,
+)
+
+
+# maximum number of inputs Hubspot accepts in one batch request
+BATCH_SIZE = 100
+# default number of batch requests sent concurrently
+BATCH_CONCURRENCY = 4
+# maximum page size of the search endpoints
+SEARCH_PAGE_SIZE = 100
+# a single search query can't be paged past this many results
+SEARCH_RESULT_LIMIT = 10000
+# properties the read methods return unless asked for others
+CONTACT_PROPERTIES = ("firstname", "lastname", "institution")
+COMMITTEE_PROPERTIES = ("email", "disease_group_executive_committee")
+COMPANY_PROPERTIES = ("approval_committees",)
+
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 
 def _escape_newlines(text):
@@ -26,38 +104,67 @@ def _escape_newlines(text):
 
 class HubspotResponse(object):
     """
+    Response of a Hubspot request. The body is decoded lazily, at most once,
+    the first time :attr:`json` is read, and not at all for requests sent with
+    ``expect_json=False``.
+
     Args:
-        response (requests.Response)
+        response (httpx.Response)
     """
 
     def __init__(self, response, expect_json=True):
         self._response = response
-        print(response.status_code)
-        print(response.json())
+        self._expect_json = expect_json
         self.code = response.status_code
 
-        if not expect_json:
-            return
-
+    @property
+    def json(self):
+        if not self._expect_json:
+            raise AttributeError("json")
+        try:
+            return self.__dict__["json"]
+        except KeyError:
+            pass
         try:
-            self.json = response.json()
+            data = _json_loads(self._response.content)
         except ValueError as e:
             if self.code != 500:
                 raise HubspotError(
                     "got a confusing response from Hubspot, couldn't parse JSON from"
                     " response but got code {} for this response: {}".format(
-                        self.code, _escape_newlines(response.text)
+                        self.code, _escape_newlines(self._response.text)
                     ),
                     self.code,
                 )
-            self.json = {"error": {"message": str(e), "code": 500}}
+            data = {"error": {"message": str(e), "code": 500}}
+        self.__dict__["json"] = data
+        return data
+
+    def iter_items(self, prefix="results.item"):
+        """
+        Yield the items of an array in the body one at a time, e.g. the results
+        of a search page, without decoding the whole body into one object first.
+        Requires the optional ``ijson`` package; without it, or once
+        :attr:`json` has been read, this iterates over the decoded body.
+        """
+        if ijson is None or "json" in self.__dict__:
+            data = self.json
+            for key in prefix.split(".")[:-1]:
+                data = data.get(key) or {}
+            for item in data or ():
+                yield item
+            return
+        for item in ijson.items(self._response.content, prefix, use_float=True):
+            yield item
 
     @property
     def successful(self):
+        if self.code >= 400:
+            return False
         try:
             return "error" not in self.json
         except AttributeError:
-            return self.code < 400
+            return True
 
     @property
     def error_msg(self):
@@ -65,7 +172,12 @@ class HubspotResponse(object):
             return None
         try:
             return self.json["error"]["message"]
-        except (KeyError, AttributeError):
+        except (KeyError, AttributeError, TypeError):
+            pass
+        try:
+            # Hubspot's own error format, see the example below
+            return self.json["message"]
+        except (KeyError, AttributeError, TypeError):
             return self._response.text
 
 
@@ -118,6 +230,177 @@ class _Env(object):
     def make_context(self, kwargs):
         return EnvContext(self._get_stack(), kwargs)
 
+    def current(self):
+        """Return the kwargs of the innermost context, to hand to :meth:`restore`."""
+        stack = self._get_stack()
+        return dict(stack[-1]) if stack else {}
+
+    def restore(self, kwargs):
+        """
+        Give the current ``contextvars`` context a stack of its own, starting
+        with ``kwargs``, e.g. in a thread running a call for another one.
+        """
+        self._local.set(deque([kwargs] if kwargs else []))
+
+
+def _email_key(property_json):
+    email = property_json.get("email")
+    return email.lower() if email else None
+
+
+def _email_of_result(result):
+    return _email_key(result.get("properties") or {})
+
+
+def _match_batch_results(chunk, response_json, key_of, status):
+    """
+    Turn the response of a successful (200/201/207) batch write into one
+    :class:`~.batch.BatchRecordResult` per record of ``chunk``.
+    """
+    by_key = {}
+    unkeyed = []
+    for result in response_json.get("results", []):
+        key = key_of(result)
+        if key is None:
+            unkeyed.append(result)
+        else:
+            by_key[key] = result
+
+    # a multi-status (207) response lists the records it couldn't write
+    failed = {}
+    for error in response_json.get("errors", []):
+        for ids in (error.get("context") or {}).values():
+            for key in ids:
+                failed[str(key).lower()] = error.get("message") or error.get("category")
+
+    results = []
+    for original, _, key in chunk:
+        result = by_key.get(key) if key is not None else None
+        if result is None and key is None and unkeyed:
+            result = unkeyed.pop(0)
+        if result is not None:
+            if status is None:
+                record_status = CREATED if result.get("new") else UPDATED
+            else:
+                record_status = status
+            results.append(
+                BatchRecordResult(
+                    original, record_status, id=result.get("id"), record=result
+                )
+            )
+        else:
+            results.append(
+                BatchRecordResult(
+                    original,
+                    ERROR,
+                    error=failed.get(key, "no result returned by Hubspot"),
+                )
+            )
+    return results
+
+
+_MODELS = {"contacts": Contact, "companies": Company}
+
+
+def _anchor_deadline(kwargs):
+    """
+    Turn a ``deadline`` in seconds into a fixed point in time, so that every
+    request of a call made of many counts down the same budget.
+    """
+    if kwargs.get("deadline") is not None:
+        kwargs["deadline"] = as_deadline(kwargs["deadline"])
+    return kwargs
+
+
+def _projection(properties, default):
+    """
+    Return the properties a read asks for, and the extra cache key arguments
+    telling it apart from a read of the ``default`` ones.
+    """
+    if properties is None:
+        return list(default), ()
+    properties = list(dict.fromkeys(properties))
+    if properties == list(default):
+        return properties, ()
+    return properties, (sorted(properties),)
+
+
+def _contact_entry(contact):
+    """``(ID, record or None)`` of a contact given as an ID, a record or a ``Contact``."""
+    if isinstance(contact, HubspotObject):
+        return str(contact.id), contact.to_json()
+    if isinstance(contact, dict):
+        return str(contact["id"]), contact
+    return str(contact), None
+
+
+def _is_read(method, url):
+    """Whether a request is an idempotent read that may be coalesced or hedged."""
+    method = method.upper()
+    if method == "GET":
+        return True
+    return method == "POST" and url.endswith(("/search", "/batch/read"))
+
+
+def _properties_of(property_json):
+    """
+    Return ``property_json`` as a dict: callers of the single writes may pass
+    the properties as a JSON string.
+    """
+    if isinstance(property_json, string_types):
+        try:
+            property_json = json.loads(property_json)
+        except ValueError as e:
+            raise TypeError("property_json is not valid JSON: {}".format(e)) from None
+    if not isinstance(property_json, dict):
+        raise TypeError(
+            "property_json must be a dict or a JSON object, not {}".format(
+                type(property_json).__name__
+            )
+        )
+    return property_json
+
+
+def _search_body(filter_groups, properties, page_size, lower_bound=None, after=None):
+    if lower_bound is not None:
+        # continue past the last object seen, see BaseHubspotClient.iter_search
+        bound = {"propertyName": "hs_object_id", "operator": "GT", "value": lower_bound}
+        filter_groups = [
+            dict(group, filters=list(group.get("filters", [])) + [bound])
+            for group in (filter_groups or [{"filters": []}])
+        ]
+    data = {
+        "filterGroups": filter_groups,
+        "properties": list(properties),
+        "sorts": [{"propertyName": "hs_object_id", "direction": "ASCENDING"}],
+        "limit": page_size,
+    }
+    if after is not None:
+        data["after"] = after
+    return data
+
+
+def _changes_body(modified_property, start, properties, page_size, tie_after=None):
+    """
+    Search of the objects modified at or after ``start``, oldest first; or,
+    with ``tie_after``, of those modified exactly at ``start`` with an ID
+    greater than it, by ID, to page through more ties than fit in one page.
+    """
+    if tie_after is None:
+        filters = [{"propertyName": modified_property, "operator": "GTE", "value": str(start)}]
+        sort = modified_property
+    else:
+        filters = [{"propertyName": modified_property, "operator": "EQ", "value": str(start)}]
+        if tie_after:
+            filters.append({"propertyName": "hs_object_id", "operator": "GT", "value": tie_after})
+        sort = "hs_object_id"
+    return {
+        "filterGroups": [{"filters": filters}],
+        "properties": list(properties),
+        "sorts": [{"propertyName": sort, "direction": "ASCENDING"}],
+        "limit": page_size,
+    }
+
 
 class BaseHubspotClient(CrmClient):
     """
@@ -125,6 +408,8 @@ class BaseHubspotClient(CrmClient):
     """
 
     client_cls = NotImplemented
+    # whether the maybe_sync methods are synchronous or coroutines
+    synchronous = False
 
     def __init__(
         self,
@@ -132,28 +417,347 @@ class BaseHubspotClient(CrmClient):
         hubspot_base_url="https://api.hubapi.com/crm/v3/objects/",
         hubspot_auth_token=None,
         timeout=10,
+        http2=False,
+        limits=None,
+        transport=None,
+        rate_limiter=True,
+        cache=None,
+        coalesce=True,
+        batch_lookups=False,
+        typed_results=False,
+        listeners=None,
+        retry=True,
+        circuit_breaker=True,
+        hedging=False,
+        mirror=None,
+        validate_properties=False,
+        schema_ttl=DEFAULT_SCHEMA_TTL,
+        association_ttl=DEFAULT_ASSOCIATION_TTL,
     ):
+        """
+        Args:
+            logger: logger to use, defaults to the ``HubspotClient`` logger
+            hubspot_base_url (str): root of the Hubspot CRM objects API
+            hubspot_auth_token (str): Hubspot API key
+            timeout (float): default per-request timeout in seconds
+            http2 (bool): negotiate HTTP/2 on the pooled connections
+            limits (httpx.Limits): connection pool size and keep-alive expiry
+            transport: optional ``httpx`` transport, e.g. for tests
+            rate_limiter: ``True`` (default) to share the process-wide
+                :class:`~.ratelimit.RateLimiter` of ``hubspot_auth_token``, a
+                ``RateLimiter`` to use, or ``False`` to disable rate limiting
+            cache: ``True`` for an in-process :class:`~.cache.ResponseCache`
+                of contact, committee and company reads, or a
+                ``ResponseCache`` to use; disabled by default
+            coalesce (bool): share one in-flight request between concurrent
+                identical reads (GETs, searches and batch reads)
+            batch_lookups: ``True``, or a dict of :class:`~.loader.ContactLoader`
+                options (``window``, ``max_batch_size``), to merge concurrent
+                ``get_contact_by_email`` calls into batch reads
+            typed_results (bool): return :mod:`~.models` objects (``SearchPage``
+                of ``Contact``/``Company``) from the read methods instead of
+                Hubspot's JSON dicts
+            listeners (list): :class:`~.events.EventListener` objects to
+                notify of the lifecycle of every request, e.g. a
+                :class:`~.metrics.MetricsCollector`
+            retry: ``True`` (default) for the default
+                :class:`~.retry.RetryPolicy`, a ``RetryPolicy``, or ``False``
+                to never retry; can be changed per call, see :meth:`request`
+            circuit_breaker: ``True`` (default) for per endpoint group
+                :mod:`~.breaker` circuit breakers, a dict of
+                :class:`~.breaker.CircuitBreaker` options, or ``False``
+            hedging: ``True``, or a dict of :class:`~.hedging.Hedger` options,
+                to send a second copy of idempotent reads that are slower than
+                usual and use the first response
+            mirror (Mirror): local :class:`~.mirror.Mirror` to serve contact,
+                committee and company reads from, see :meth:`refresh_mirror`
+            validate_properties (bool): check the properties of contact
+                writes against Hubspot's property definitions before sending
+                them, see :mod:`~.schema`
+            schema_ttl (float): seconds the property definitions are cached
+            association_ttl (float): seconds the associations read with
+                :meth:`get_associations` are cached, 0 to not cache them
+        """
         self.logger = logger or get_logger("HubspotClient")
         self._auth_token = hubspot_auth_token
         self._base_url = hubspot_base_url.strip("/")
         self._companies_url = self._base_url + "/companies"
-        self._associated_companies_url = self._base_url + "/associations/companies"
         self._contacts_url = self._base_url + "/contacts"
+        # the properties and associations APIs live next to the objects one,
+        # e.g. /crm/v3/properties
+        crm_url = self._base_url.rsplit("/", 1)[0]
+        self._properties_url = crm_url + "/properties"
+        self._associations_url = crm_url + "/associations"
+        self._associated_companies_url = self._associations_url + "/contacts/companies"
         self._timeout = timeout
         self._env = _Env()
+        pool_kwargs = {}
+        if transport is not None:
+            pool_kwargs["transport"] = transport
+        self._pool = ConnectionPool(
+            self.client_cls, http2=http2, limits=limits, **pool_kwargs
+        )
+        if rate_limiter is True:
+            rate_limiter = shared_rate_limiter(hubspot_auth_token)
+        self._rate_limiter = rate_limiter or None
+        if cache is True:
+            cache = ResponseCache()
+        self._cache = cache or None
+        self._single_flight = SingleFlight(self.synchronous) if coalesce else None
+        self._typed_results = typed_results
+        self._retry = resolve_policy(RetryPolicy(), retry)
+        self._breakers = None
+        if circuit_breaker:
+            options = circuit_breaker if isinstance(circuit_breaker, dict) else {}
+            self._breakers = CircuitBreakers(self._base_url, **options)
+        self._hedger = None
+        if hedging:
+            self._hedger = Hedger(**(hedging if isinstance(hedging, dict) else {}))
+        self._mirror = mirror
+        self._validate_properties = validate_properties
+        self._schemas = SchemaCache(schema_ttl)
+        self._association_cache = AssociationCache(association_ttl) if association_ttl else None
+        self._events = None
+        for listener in listeners or ():
+            self.add_listener(listener)
+        self._loader = None
+        if batch_lookups:
+            options = batch_lookups if isinstance(batch_lookups, dict) else {}
+            self._loader = ContactLoader(self, **options)
+
+    def cache_stats(self):
+        """
+        Return the response cache counters, see
+        :meth:`~.cache.ResponseCache.stats`, or ``None`` if caching is
+        disabled.
+        """
+        if self._cache is None:
+            return None
+        return self._cache.stats()
+
+    def batch_lookup_stats(self):
+        """
+        Return the micro-batching stats of ``get_contact_by_email``, see
+        :meth:`~.loader.ContactLoader.stats`, or ``None`` if it is disabled.
+        """
+        if self._loader is None:
+            return None
+        return self._loader.stats()
+
+    def circuit_breaker_status(self):
+        """
+        Return the state of the circuit breaker of every endpoint group used
+        so far, see :meth:`~.breaker.CircuitBreaker.status`, or ``None`` if
+        circuit breaking is disabled.
+        """
+        if self._breakers is None:
+            return None
+        return self._breakers.status()
+
+    def hedging_stats(self):
+        """
+        Return the hedged read counters, see :meth:`~.hedging.Hedger.stats`,
+        or ``None`` if hedging is disabled.
+        """
+        if self._hedger is None:
+            return None
+        return self._hedger.stats()
+
+    def association_stats(self):
+        """
+        Return the counters of the association cache (entries, hits,
+        misses), or ``None`` if associations aren't cached.
+        """
+        if self._association_cache is None:
+            return None
+        return self._association_cache.stats()
+
+    def mirror_stats(self):
+        """
+        Return the local mirror's counters, see :meth:`~.mirror.Mirror.stats`,
+        or ``None`` without a mirror.
+        """
+        if self._mirror is None:
+            return None
+        return self._mirror.stats()
+
+    @maybe_sync
+    async def refresh_mirror(self, object_types=("contacts", "companies"), full=False, **kwargs):
+        """
+        Bring the local mirror up to date with the changes made in Hubspot
+        since its last refresh; the first refresh loads every object. See
+        :mod:`~.mirror`.
+
+        Args:
+            object_types (iterable): ``contacts`` and/or ``companies``
+            full (bool): reload every object, and drop from the mirror those
+                no longer in Hubspot
+
+        Return:
+            dict: number of objects written per object type, e.g.
+            {'contacts': 12, 'companies': 0}
+        """
+        if self._mirror is None:
+            raise ValueError("this client has no mirror")
+        _anchor_deadline(kwargs)
+        counts = {}
+        for object_type in object_types:
+            started = time.time()
+            if full:
+                self._mirror.reset(object_type)
+            count = 0
+            async for result in self.iter_changes(
+                object_type,
+                self._mirror.checkpoint(object_type),
+                self._mirror.properties[object_type],
+                **kwargs
+            ):
+                if self._typed_results:
+                    result = result.to_json()
+                self._mirror.stage(object_type, result)
+                count += 1
+            if full:
+                self._mirror.prune(object_type, started)
+            self._mirror.mark_refreshed(object_type, started)
+            counts[object_type] = count
+        return counts
+
+    def _mirrored(self, lookup, value, properties):
+        """
+        Return the mirror's answer to a read, or ``None`` to ask Hubspot; see
+        :meth:`~.mirror.Mirror._search`.
+        """
+        if self._mirror is None:
+            return None
+        return getattr(self._mirror, lookup)(value, properties)
+
+    @maybe_sync
+    async def get_property_schema(self, object_type, refresh=False, **kwargs):
+        """
+        Return the property definitions of an object type, cached for
+        ``schema_ttl`` seconds; see :mod:`~.schema`.
+
+        Args:
+            object_type (str): ``contacts`` or ``companies``
+            refresh (bool): read them from Hubspot even if they are cached
+
+        Return:
+            PropertySchema: the definitions, e.g. ``schema.options(name)``
+
+        Raises:
+            - HubspotError: if the definitions couldn't be read
+        """
+        schema = None if refresh else self._schemas.get(object_type)
+        if schema is not None:
+            return schema
+        response = await self.get(self._properties_url + "/" + object_type, **kwargs)
+        if not response.successful:
+            msg = "could not read the {} properties in Hubspot: {}".format(
+                object_type, response.error_msg
+            )
+            self.logger.error(msg)
+            raise HubspotError(msg, response.code)
+        schema = PropertySchema.from_json(object_type, response.json)
+        self._schemas.set(schema)
+        return schema
+
+    @maybe_sync
+    async def _property_errors(self, object_type, property_jsons):
+        """
+        Return the errors of each of ``property_jsons`` (a list per write,
+        empty if it is valid), or ``None`` if the definitions can't be read.
+        """
+        try:
+            schema = await self.get_property_schema(object_type)
+            errors = [schema.errors(property_json) for property_json in property_jsons]
+            if any(errors) and schema.age > RECHECK_AFTER:
+                # the properties may have changed since the definitions were read
+                schema = await self.get_property_schema(object_type, refresh=True)
+                errors = [schema.errors(property_json) for property_json in property_jsons]
+        except HubspotError as e:
+            # Hubspot checks the write itself
+            self.logger.warning(
+                "could not check the {} properties: {}".format(object_type, e.message)
+            )
+            return None
+        return errors
+
+    def add_listener(self, listener):
+        """Notify ``listener`` (an :class:`~.events.EventListener`) of requests."""
+        events = self._events or Listeners(self._base_url, self.logger)
+        self._events = events.with_listener(listener)
+
+    def remove_listener(self, listener):
+        if self._events is not None:
+            self._events = self._events.without_listener(listener) or None
+
+    def _typed_page(self, response_json, model):
+        if not self._typed_results or "results" not in response_json:
+            return response_json
+        return SearchPage.from_json(response_json, model)
+
+    def _cached(self, method, *args):
+        if self._cache is None:
+            return False, None
+        hit, value = self._cache.get(method, *args)
+        if hit and self._events is not None:
+            self._events.cache_hit(method, args)
+        return hit, value
+
+    def _cache_search(self, method, args, response_json, **tag_kwargs):
+        if self._cache is None:
+            return
+        results = response_json.get("results") or []
+        self._cache.set(
+            method,
+            args,
+            response_json,
+            tags=contact_tags(results, **tag_kwargs) if tag_kwargs else (),
+            negative=not results,
+        )
+
+    def _invalidate(self, tags):
+        if self._cache is not None and tags:
+            self._cache.invalidate(tags)
+
+    def rate_limit_status(self):
+        """
+        Return the rate-limit headroom left for this client's Hubspot account,
+        see :meth:`~.ratelimit.RateLimiter.status`, or ``None`` if rate
+        limiting is disabled.
+        """
+        if self._rate_limiter is None:
+            return None
+        return self._rate_limiter.status()
+
+    @maybe_sync
+    async def close(self):
+        """
+        Close the pooled connections. The client can still be used afterwards;
+        a new pool is opened on the next request.
+        """
+        await self._pool.aclose()
 
     def context(self, **kwargs):
+        if kwargs.get("deadline") is not None:
+            # seconds count from now, and a nested deadline can't extend its parent
+            kwargs["deadline"] = earliest(
+                as_deadline(kwargs["deadline"]),
+                as_deadline(self._env.current().get("deadline")),
+            )
         return self._env.make_context(kwargs)
 
 
+    @maybe_sync
     async def request(self, method, url, **kwargs):
         """
         Wrapper method of ``requests.request`` adding retry, timeout and headers.
 
-        If the actual request fails to connect or timed out, this client will retry the
-        same request if ``retry`` is truthy after Hubspot becomes healthy.
-        By default, it will retry health check up to 5 times, waiting for a maximum of
-        10 seconds, before giving up and declaring Hubspot unavailable.
+        Failed attempts (retryable status codes such as 429 and 5xx,
+        connection errors and timeouts) are sent again as the retry policy
+        allows, see :mod:`~.retry`. If the last attempt couldn't reach Hubspot,
+        ``HubspotUnhealthyError`` is raised; otherwise the last response is
+        returned.
 
         Args:
             method:
@@ -162,14 +766,32 @@ class BaseHubspotClient(CrmClient):
                 expect_json:
                     True (default) if the response should be in JSON format
                 retry:
-                    True (default) if the request should be retried, or a dict as
-                    keyword arguments for ``backoff.on_predicate``
+                    True (default) for the client's retry policy, False to send
+                    the request only once, a ``RetryPolicy``, or a dict of
+                    options to change on the client's policy; also settable
+                    with ``client.context(retry=...)``
                 timeout:
                     overwrite timeout parameter for ``requests``
+                coalesce:
+                    True (default) to share the response of an identical read
+                    that is already in flight (see :mod:`~.singleflight`)
+                deadline:
+                    seconds from now, or a ``Deadline``, by which the request
+                    and its retries must be done, including the wait for an
+                    identical read in flight; combined with the deadline of
+                    ``client.context(deadline=...)``, see :mod:`~.deadline`
+
+        Requests wait for the client's rate limiter.
+
+        Raises:
+            - HubspotDeadlineError: if the deadline ran out first
         """
         expect_json = kwargs.pop("expect_json", True)
+        deadline = as_deadline(kwargs.pop("deadline", None))
         kwargs = self._env.get_current_with(kwargs)
-        retry = kwargs.pop("retry", True)
+        kwargs["deadline"] = earliest(deadline, as_deadline(kwargs.get("deadline")))
+        policy = resolve_policy(self._retry, kwargs.pop("retry", True))
+        coalesce = kwargs.pop("coalesce", True)
         kwargs.setdefault("timeout", self._timeout)
 
     
@@ -184,37 +806,209 @@ class BaseHubspotClient(CrmClient):
         kwargs.setdefault("params",params)
 
 
-        async with self.client_cls() as client:
+        send = self._send
+        if self._hedger is not None and _is_read(method, url):
+            send = self._send_hedged
+        if coalesce and self._single_flight is not None and _is_read(method, url):
+            key = flight_key(method, url, kwargs.get("params"), kwargs.get("json"))
+            deadline = kwargs["deadline"]
             try:
-                rv = await client.request(method, url, **kwargs)
-            except httpx.TimeoutException:
-                if retry:
-                    if isinstance(retry, bool):
-                        retry = {}
-                    # set some defaults for when to give up: after 5 failures, or 10
-                    # seconds (these can be overridden by keyword arguments)
-                    retry.setdefault("max_tries", 5)
-                    retry.setdefault("max_time", 10)
-
-                    def giveup():
-                        raise HubspotUnhealthyError()
-
-                    def wait_gen():
-                        # shorten the wait times between retries a little to fit our
-                        # scale a little better (aim to give up within 10 s)
-                        for n in backoff.fibo():
-                            yield n / 2.0
-
-                    await backoff.on_predicate(wait_gen, on_giveup=giveup, **retry)(
-                        self.healthy
-                    )()
-                    rv = await client.request(method, url, **kwargs)
-                else:
-                    raise
+                rv = await self._single_flight.do(
+                    key,
+                    lambda: send(method, url, policy, kwargs),
+                    timeout=max(0.0, deadline.remaining()) if deadline is not None else None,
+                )
+            except FlightTimeout:
+                # joined an identical read that outlasts this caller's deadline
+                raise self._deadline_error(method, url, deadline, None) from None
+        else:
+            rv = await send(method, url, policy, kwargs)
         return HubspotResponse(rv, expect_json=expect_json)
 
+    @maybe_sync
+    async def _send(self, method, url, policy, kwargs):
+        """
+        Send a request once the rate limiter lets it through, and send it again
+        as ``policy`` (a :class:`~.retry.RetryPolicy`, or ``None``) allows,
+        within the ``deadline`` in ``kwargs``.
+        """
+        kwargs = dict(kwargs)
+        deadline = kwargs.pop("deadline", None)
+        client = self._pool.client
+        events = self._events
+        event = events.start(method, url) if events is not None else None
+        search = url.endswith("/search")
+        if policy is not None and policy.budget is not None:
+            policy.budget.record_request()
+        started = time.monotonic()
+        attempt = 1
+        delay = 0.0
+        breaker = self._breakers.for_url(url) if self._breakers is not None else None
+        try:
+            while True:
+                if breaker is not None:
+                    try:
+                        breaker.acquire()
+                    except HubspotCircuitOpenError as e:
+                        # fail fast rather than wait for a degraded Hubspot
+                        if event is not None:
+                            events.give_up(event, e)
+                        raise
+                error = rv = None
+                attempt_kwargs = kwargs
+                try:
+                    if self._rate_limiter is not None:
+                        wait = self._rate_limiter.acquire(search=search)
+                        if deadline is not None and not deadline.fits(wait):
+                            raise self._deadline_error(method, url, deadline, event)
+                        await sleep(wait)
+                    if deadline is not None:
+                        remaining = deadline.remaining()
+                        if not deadline.fits(0):
+                            raise self._deadline_error(method, url, deadline, event)
+                        attempt_kwargs = dict(
+                            kwargs, timeout=cap_timeout(kwargs.get("timeout"), remaining)
+                        )
+                    if event is not None:
+                        events.sending(event)
+                    sent = time.monotonic()
+                    rv = await client.request(method, url, **attempt_kwargs)
+                except httpx.TransportError as e:
+                    error = e
+                except BaseException:
+                    if breaker is not None:
+                        breaker.release()
+                    raise
+                if breaker is not None:
+                    breaker.record(
+                        error is not None or rv.status_code >= 500, time.monotonic() - sent
+                    )
+                if error is None:
+                    if event is not None:
+                        events.response(event, rv)
+                    if self._rate_limiter is not None:
+                        self._rate_limiter.update(rv.status_code, rv.headers)
+                    if rv.status_code < 400:
+                        break
+
+                wait = None
+                if policy is not None:
+                    wait = policy.next_wait(
+                        method,
+                        url,
+                        attempt,
+                        started,
+                        delay,
+                        response=rv,
+                        error=error,
+                        deadline=deadline,
+                    )
+                if wait is None:
+                    if error is None:
+                        if event is not None and policy is not None and policy.is_retryable(
+                            method, url, response=rv
+                        ):
+                            events.give_up(event)
+                        break
+                    if isinstance(error, httpx.TimeoutException) and deadline is not None and (
+                        attempt_kwargs["timeout"] != kwargs.get("timeout")
+                    ):
+                        # the attempt timed out because the deadline cut its timeout
+                        raise self._deadline_error(method, url, deadline, event) from error
+                    if event is not None:
+                        events.give_up(event, error)
+                    if policy is None:
+                        raise error
+                    msg = "could not reach Hubspot for {} {}: {!r}".format(
+                        method.upper(), url, error
+                    )
+                    self.logger.error(msg)
+                    raise HubspotUnhealthyError(msg) from error
+
+                self.logger.warning(
+                    "Hubspot {} on {} {}; retrying in {:.2f}s ({}/{})".format(
+                        rv.status_code if rv is not None else repr(error),
+                        method.upper(),
+                        url,
+                        wait,
+                        attempt,
+                        policy.max_attempts,
+                    )
+                )
+                if event is not None:
+                    events.retry(event, wait)
+                await sleep(wait)
+                delay = wait
+                attempt += 1
+        except asyncio.CancelledError as e:
+            # e.g. a losing hedge: the request ends without giving up
+            if event is not None:
+                event.error = e
+            raise
+        except BaseException as e:
+            if event is not None and event.error is None:
+                events.give_up(event, e)
+            raise
+        finally:
+            if event is not None:
+                events.end(event)
+        return rv
+
+    def _deadline_error(self, method, url, deadline, event):
+        error = HubspotDeadlineError(
+            "deadline ran out for {} {} ({:.3f}s left)".format(
+                method.upper(), url, deadline.remaining()
+            )
+        )
+        self.logger.error(error.message)
+        if event is not None:
+            self._events.give_up(event, error)
+        return error
+
+    @maybe_sync
+    async def _send_hedged(self, method, url, policy, kwargs):
+        """
+        :meth:`_send` a read, and send it again if it is slower than the
+        endpoint's hedge delay; the first response wins, see :mod:`~.hedging`.
+        """
+        endpoint = endpoint_of(url, self._base_url)
+        delay = self._hedger.delay(endpoint)
+        started = time.monotonic()
+        if delay is None:
+            rv = await self._send(method, url, policy, kwargs)
+            self._hedger.record(endpoint, time.monotonic() - started)
+            return rv
+
+        first = start_background(self._send, method, url, policy, kwargs)
+        if await wait_first([first], delay) or not self._hedger.try_hedge():
+            rv = await wait_background(first)
+            self._hedger.record(endpoint, time.monotonic() - started)
+            return rv
+
+        self.logger.debug(
+            "hedging {} {} after {:.3f}s".format(method.upper(), url, delay)
+        )
+        hedge = start_background(self._send, method, url, policy, kwargs)
+        pending = [first, hedge]
+        while True:
+            task = (await wait_first(pending))[0]
+            pending.remove(task)
+            try:
+                rv = await wait_background(task)
+            except Exception:
+                if pending:
+                    # the other copy may still succeed
+                    continue
+                raise
+            for loser in pending:
+                cancel_background(loser)
+            self._hedger.record(
+                endpoint, time.monotonic() - started, hedge_won=task is hedge
+            )
+            return rv
+
     def get(self, url, params=None, **kwargs):
-        kwargs.setdefault("allow_redirects", True)
+        kwargs.setdefault("follow_redirects", True)
         return self.request("get", url, params=params, **kwargs)
 
     def post(self, url, data=None, json=None, **kwargs):
@@ -258,8 +1052,13 @@ class BaseHubspotClient(CrmClient):
 
 
     @maybe_sync
-    async def get_contact_by_email(self, email, hubspot_id=None, **kwargs):
+    async def get_contact_by_email(self, email, hubspot_id=None, properties=None, **kwargs):
         """
+        Args:
+            email (str): email of the contact
+            properties (iterable): contact properties to return, defaults to
+                ``CONTACT_PROPERTIES``
+
         Returned response example
         {'total': 1, 'results': [{'id': '9601', 'properties': {'createdate': '2019-12-18T19:49:03.109Z', 'firstname': 'Luca', 'hs_object_id': '9601', 'institution': 'The University of Chicago', 'lastmodifieddate': '2021-07-08T17:28:39.152Z', 'lastname': 'Graglia'}, 'createdAt': '2019-12-18T19:49:03.109Z', 'updatedAt': '2021-07-08T17:28:39.152Z', 'archived': False}]}
         """
@@ -271,14 +1070,109 @@ class BaseHubspotClient(CrmClient):
                     "operator": "EQ"
                 }]
             }],
-            "properties": ["firstname", "lastname", "institution"]
         }
+        data["properties"], projection = _projection(properties, CONTACT_PROPERTIES)
+        mirrored = self._mirrored("contact_by_email", email, data["properties"])
+        if mirrored is not None:
+            return self._typed_page(mirrored, Contact)
+        cache_args = (email.lower(),) + projection
+        hit, cached = self._cached("get_contact_by_email", *cache_args)
+        if hit:
+            return self._typed_page(cached, Contact)
+        if self._loader is not None and not kwargs and not projection:
+            # merged with concurrent lookups into one batch read
+            response_json = await self._loader.load(email)
+            self._cache_search("get_contact_by_email", cache_args, response_json, email=email)
+            return self._typed_page(response_json, Contact)
         response = await self.post(url=self._contacts_url + "/search", json=data, **kwargs)
-        return response.json
-        
+        if response.successful:
+            self._cache_search("get_contact_by_email", cache_args, response.json, email=email)
+        return self._typed_page(response.json, Contact)
+
+    @maybe_sync
+    async def get_contacts_by_emails(
+        self,
+        emails,
+        properties=CONTACT_PROPERTIES,
+        max_concurrency=BATCH_CONCURRENCY,
+        **kwargs
+    ):
+        """
+        Look up many contacts at once with Hubspot's batch read, using email as
+        the ID property. Emails are sent in chunks of ``BATCH_SIZE``, with at
+        most ``max_concurrency`` chunks in flight.
+
+        Args:
+            emails (iterable): email addresses to look up
+            properties (iterable): contact properties to return
+            max_concurrency (int): maximum number of concurrent batch requests
+
+        Return:
+            dict: every requested email mapped to its contact record, e.g.
+            {'luca@example.org': {'id': '9601', 'properties': {...}, ...},
+             'missing@example.org': None}
+            Emails with no contact in Hubspot map to ``None``.
+
+        Raises:
+            - HubspotError: if a batch request failed
+        """
+        contacts = await self._get_contacts_by_emails(
+            emails, properties, max_concurrency, **kwargs
+        )
+        if self._typed_results:
+            return {
+                email: Contact.from_json(contact) if contact is not None else None
+                for email, contact in contacts.items()
+            }
+        return contacts
+
+    @maybe_sync
+    async def _get_contacts_by_emails(
+        self,
+        emails,
+        properties=CONTACT_PROPERTIES,
+        max_concurrency=BATCH_CONCURRENCY,
+        **kwargs
+    ):
+        _anchor_deadline(kwargs)
+        emails = list(dict.fromkeys(emails))
+        properties = list(dict.fromkeys(list(properties) + ["email"]))
+        url = self._contacts_url + "/batch/read"
+
+        async def _read(chunk):
+            data = {
+                "idProperty": "email",
+                "inputs": [{"id": email} for email in chunk],
+                "properties": properties,
+            }
+            response = await self.post(url=url, json=data, **kwargs)
+            if not response.successful:
+                msg = "could not batch read contacts in Hubspot: {}".format(
+                    response.error_msg
+                )
+                self.logger.error(msg)
+                raise HubspotError(msg, response.code)
+            return response.json.get("results", [])
+
+        pages = await map_bounded(_read, chunked(emails, BATCH_SIZE), max_concurrency)
+
+        # Hubspot stores emails lowercased, so match case-insensitively
+        found = {}
+        for page in pages:
+            for contact in page:
+                email = (contact.get("properties") or {}).get("email")
+                if email:
+                    found[email.lower()] = contact
+        return {email: found.get(email.lower()) for email in emails}
+
     @maybe_sync
-    async def get_contacts_by_committee(self, committee, **kwargs):
+    async def get_contacts_by_committee(self, committee, properties=None, **kwargs):
         """
+        Args:
+            committee (str): committee, e.g. 'INSTRuCT Executive Committee Member'
+            properties (iterable): contact properties to return, defaults to
+                ``COMMITTEE_PROPERTIES``
+
         Returned response example
         {'total': 1, 'results': [{'id': '9601', 'properties': {'createdate': '2019-12-18T19:49:03.109Z', 'firstname': 'Luca', 'hs_object_id': '9601', 'institution': 'The University of Chicago', 'lastmodifieddate': '2021-07-08T17:28:39.152Z', 'lastname': 'Graglia'}, 'createdAt': '2019-12-18T19:49:03.109Z', 'updatedAt': '2021-07-08T17:28:39.152Z', 'archived': False}]}
         """
@@ -290,11 +1184,318 @@ class BaseHubspotClient(CrmClient):
                     "operator": "EQ"
                 }]
             }],
-            "properties": ["email", "disease_group_executive_committee"]
         }
+        data["properties"], projection = _projection(properties, COMMITTEE_PROPERTIES)
+        mirrored = self._mirrored("contacts_by_committee", committee, data["properties"])
+        if mirrored is not None:
+            return self._typed_page(mirrored, Contact)
+        cache_args = (committee,) + projection
+        hit, cached = self._cached("get_contacts_by_committee", *cache_args)
+        if hit:
+            return self._typed_page(cached, Contact)
         response = await self.post(url=self._contacts_url + "/search", json=data, **kwargs)
+        if response.successful:
+            self._cache_search(
+                "get_contacts_by_committee",
+                cache_args,
+                response.json,
+                committee=committee,
+            )
+        return self._typed_page(response.json, Contact)
+
+    @maybe_sync
+    async def _search_page(self, url, data, **kwargs):
+        response = await self.post(url=url, json=data, **kwargs)
+        if not response.successful:
+            msg = "could not search `{}` in Hubspot: {}".format(url, response.error_msg)
+            self.logger.error(msg)
+            raise HubspotError(msg, response.code)
         return response.json
 
+    @maybe_sync
+    async def iter_search(
+        self, object_type, filter_groups, properties, page_size=SEARCH_PAGE_SIZE, **kwargs
+    ):
+        """
+        Iterate lazily over every object matching a search, following the
+        ``paging.next.after`` cursors. The next page is requested while the
+        caller is still handling the current one, so at most two pages are
+        held in memory.
+
+        Hubspot refuses to page a single search past ``SEARCH_RESULT_LIMIT``
+        results, so objects are sorted by ``hs_object_id`` and, when the limit
+        is near, the search restarts with ``hs_object_id`` greater than the
+        last ID seen.
+
+        Args:
+            object_type (str): ``contacts`` or ``companies``
+            filter_groups (list): Hubspot ``filterGroups``
+            properties (iterable): properties to return
+            page_size (int): results per request, at most 100
+
+        Yield:
+            dict: one search result at a time, e.g.
+            {'id': '9601', 'properties': {...}, 'createdAt': ..., ...}
+            or a :class:`~.models.Contact`/:class:`~.models.Company` for
+            clients with ``typed_results``
+        """
+        _anchor_deadline(kwargs)
+        url = self._base_url + "/" + object_type + "/search"
+        properties = list(properties)
+        model = _MODELS.get(object_type) if self._typed_results else None
+        lower_bound = None
+        pending = start_background(
+            self._search_page,
+            url,
+            _search_body(filter_groups, properties, page_size),
+            **kwargs
+        )
+        try:
+            while pending is not None:
+                page = await wait_background(pending)
+                pending = None
+                results = page.get("results") or []
+                after = ((page.get("paging") or {}).get("next") or {}).get("after")
+                if after is not None and results:
+                    if int(after) + page_size > SEARCH_RESULT_LIMIT:
+                        lower_bound, after = results[-1]["id"], None
+                    data = _search_body(
+                        filter_groups, properties, page_size, lower_bound, after
+                    )
+                    pending = start_background(self._search_page, url, data, **kwargs)
+                for result in results:
+                    yield model.from_json(result) if model is not None else result
+        finally:
+            if pending is not None:
+                cancel_background(pending)
+
+    def iter_contacts_by_committee(
+        self,
+        committee,
+        properties=COMMITTEE_PROPERTIES,
+        **kwargs
+    ):
+        """
+        Iterate over every contact of a committee, see :meth:`iter_search`.
+        Unlike :meth:`get_contacts_by_committee` this isn't limited to the
+        first page of results.
+        """
+        filter_groups = [{
+            "filters": [{
+                "value": committee,
+                "propertyName": "disease_group_executive_committee",
+                "operator": "EQ"
+            }]
+        }]
+        return self.iter_search("contacts", filter_groups, properties, **kwargs)
+
+    def iter_commitees_info(self, committee, properties=COMPANY_PROPERTIES, **kwargs):
+        """
+        Iterate over every company matching a committee name, see
+        :meth:`iter_search`. Unlike :meth:`get_commitees_info` this isn't
+        limited to the first page of results.
+        """
+        filter_groups = [{
+            "filters": [{
+                "value": committee,
+                "propertyName": "name",
+                "operator": "EQ"
+            }]
+        }]
+        return self.iter_search("companies", filter_groups, properties, **kwargs)
+
+    @maybe_sync
+    async def _id_range(self, object_type, **kwargs):
+        """Return the lowest and highest ID of an object type, or ``None``."""
+        url = self._base_url + "/" + object_type + "/search"
+        ids = []
+        for direction in ("ASCENDING", "DESCENDING"):
+            data = {
+                "filterGroups": [],
+                "properties": ["hs_object_id"],
+                "sorts": [{"propertyName": "hs_object_id", "direction": direction}],
+                "limit": 1,
+            }
+            results = (await self._search_page(url, data, **kwargs)).get("results")
+            if not results:
+                return None
+            ids.append(int(results[0]["id"]))
+        return ids[0], ids[1]
+
+    @maybe_sync
+    async def export(
+        self,
+        object_type,
+        path,
+        properties=(),
+        format="ndjson",
+        partitions=4,
+        resume=True,
+        page_size=SEARCH_PAGE_SIZE,
+        **kwargs
+    ):
+        """
+        Write every object of a type to an NDJSON or CSV file, with constant
+        memory, paging through ``partitions`` ID ranges concurrently. Progress
+        is saved next to the file, and an interrupted export resumes when run
+        again with the same arguments; see :mod:`~.export`.
+
+        Args:
+            object_type (str): ``contacts`` or ``companies``
+            path (str): output file
+            properties (iterable): properties to export; NDJSON lines are
+                search results, CSV rows the ID and these properties
+            format (str): ``ndjson`` or ``csv``
+            partitions (int): ID ranges exported concurrently
+            resume (bool): pick up where an interrupted export stopped,
+                rather than start over
+            page_size (int): results per request, at most 100
+
+        Return:
+            int: number of objects exported
+
+        Raises:
+            - HubspotError: if a search failed; the progress made is kept
+        """
+        _anchor_deadline(kwargs)
+        job = ExportJob(path, object_type, properties, format, resume)
+        if not job.started:
+            bounds = await self._id_range(object_type, **kwargs)
+            ranges = split_range(bounds[0], bounds[1], partitions) if bounds else [(None, None)]
+            job.start(ranges)
+        typed = self._typed_results
+
+        async def _export_partition(index):
+            partition = job.partitions[index]
+            if partition["done"]:
+                return
+            with job.open_part(index) as f:
+                count = partition["count"]
+                filters = range_filters(
+                    partition["start"], partition["end"], partition["after"]
+                )
+                async for record in self.iter_search(
+                    object_type,
+                    [{"filters": filters}] if filters else [],
+                    job.properties,
+                    page_size=page_size,
+                    **kwargs
+                ):
+                    if typed:
+                        record = record.to_json()
+                    f.write(job.encode(record))
+                    count += 1
+                    if count % page_size == 0:
+                        job.progress(index, f, record["id"], count)
+                job.finish(index, f, count)
+
+        await map_bounded(
+            _export_partition, range(len(job.partitions)), len(job.partitions)
+        )
+        count = job.assemble()
+        self.logger.info("exported {} {} to {}".format(count, object_type, path))
+        return count
+
+    @maybe_sync
+    async def iter_changes(
+        self,
+        object_type,
+        checkpoint=None,
+        properties=(),
+        since=None,
+        overlap=DEFAULT_OVERLAP,
+        page_size=SEARCH_PAGE_SIZE,
+        **kwargs
+    ):
+        """
+        Iterate over the objects modified since the last sync, oldest change
+        first, see :mod:`~.changes`. The next page is requested while the
+        caller handles the current one. Every page is a new search starting at
+        the last modification time seen, rather than the next offset of one
+        search, so objects modified during the sync don't shift the pages and
+        get skipped, and no search is paged past ``SEARCH_RESULT_LIMIT``.
+
+        Args:
+            object_type (str): ``contacts`` or ``companies``
+            checkpoint (Checkpoint): where the watermark is loaded from and
+                saved to, see :class:`~.changes.FileCheckpoint`; without one
+                every call starts from ``since``
+            properties (iterable): properties to return, besides the
+                last-modified date
+            since: where to start without a saved watermark, as epoch
+                milliseconds, a ``datetime`` or a Hubspot timestamp string;
+                defaults to the beginning
+            overlap (float): seconds before the watermark to search again
+            page_size (int): results per request, at most 100
+
+        Yield:
+            dict: one modified object at a time, as :meth:`iter_search` does
+
+        Raises:
+            - HubspotError: if a search failed
+        """
+        _anchor_deadline(kwargs)
+        modified = MODIFIED_PROPERTY[object_type]
+        url = self._base_url + "/" + object_type + "/search"
+        properties = list(dict.fromkeys(list(properties) + [modified]))
+        model = _MODELS.get(object_type) if self._typed_results else None
+        state = checkpoint.load() if checkpoint is not None else None
+        if state:
+            watermark = Watermark.from_state(state, overlap)
+        else:
+            watermark = Watermark(timestamp_ms(since), overlap=overlap)
+
+        start = watermark.search_from()
+        pending = start_background(
+            self._search_page,
+            url,
+            _changes_body(modified, start, properties, page_size),
+            **kwargs
+        )
+        tie_after = None
+        dirty = False
+        try:
+            while pending is not None:
+                page = await wait_background(pending)
+                pending = None
+                results = page.get("results") or []
+                more = ((page.get("paging") or {}).get("next") or {}).get("after")
+                if tie_after is not None:
+                    # paging through the objects modified at ``start`` by ID
+                    if more is not None and results:
+                        tie_after = results[-1]["id"]
+                    else:
+                        start, tie_after = start + 1, None
+                    data = _changes_body(modified, start, properties, page_size, tie_after)
+                    pending = start_background(self._search_page, url, data, **kwargs)
+                elif more is not None and results:
+                    # search again from the last modification time seen rather
+                    # than page with offsets: an object modified meanwhile
+                    # moves to the end and would shift the following pages
+                    last = modified_ms(results[-1], modified)
+                    if last <= start:
+                        # a whole page modified at ``start``
+                        tie_after = "0"
+                    start = last
+                    data = _changes_body(modified, start, properties, page_size, tie_after)
+                    pending = start_background(self._search_page, url, data, **kwargs)
+                for result in results:
+                    result_modified = modified_ms(result, modified)
+                    if not watermark.is_new(result["id"], result_modified):
+                        continue
+                    yield model.from_json(result) if model is not None else result
+                    # the caller asked for the next one: this one is handled
+                    watermark.advance(result["id"], result_modified)
+                    dirty = True
+                if dirty and checkpoint is not None:
+                    checkpoint.save(watermark.to_state())
+                    dirty = False
+        finally:
+            if pending is not None:
+                cancel_background(pending)
+            if dirty and checkpoint is not None:
+                checkpoint.save(watermark.to_state())
+
     @maybe_sync
     async def create_contact(self, property_json):
         """
@@ -311,8 +1512,9 @@ class BaseHubspotClient(CrmClient):
             }
 
         Args:
-            property_json (dict):
-                dictionary of resource information (see the example above)
+            property_json (dict or str):
+                dictionary of resource information (see the example above),
+                or the same as a JSON string
 
         Return:
             dict: response JSON from hubspot
@@ -320,19 +1522,32 @@ class BaseHubspotClient(CrmClient):
             {'id': '60901', 'properties': {'createdate': '2021-07-28T20:52:30.963Z', 'hs_is_unworked': 'true', 'hs_object_id': '60901', 'lastmodifieddate': '2021-07-28T20:52:30.963Z'}, 'createdAt': '2021-07-28T20:52:30.963Z', 'updatedAt': '2021-07-28T20:52:30.963Z', 'archived': False}
 
         Raises:
+            - HubspotValidationError: if ``validate_properties`` is set and the
+              properties don't match Hubspot's definitions
+            - TypeError: if ``validate_properties`` is set and
+              ``property_json`` is neither a dict nor a JSON object string
             - HubspotError: if the operation failed (couldn't create contact)
         """
         path = self._contacts_url
+        if self._validate_properties:
+            errors = await self._property_errors(
+                "contacts", [_properties_of(property_json)]
+            )
+            if errors and errors[0]:
+                raise HubspotValidationError(errors[0])
 
         data = {}
         data["properties"] = property_json
 
         response = await self.post(url=path, json=data)
+        self._invalidate(contact_write_tags(property_json))
         if response.code == 409:
             # already exists; this is ok, but leave warning
             # hubspot response {'status': 'error', 'message': 'Contact already exists. Existing ID: 9601', 'correlationId': '1823bec6-d3ad-4a3d-bfb6-e2251a9a4b42', 'category': 'CONFLICT'}
             self.logger.warning(
-                "Contact `{}` already exists in Hubspot".format(property_json["email"])
+                "Contact `{}` already exists in Hubspot (existing ID: {})".format(
+                    property_json["email"], existing_id(response.error_msg)
+                )
             )
             return None
         if not response.successful:
@@ -341,6 +1556,15 @@ class BaseHubspotClient(CrmClient):
             )
             self.logger.error(msg)
             raise HubspotError(msg, response.code)
+        if self._mirror is not None:
+            self._mirror.apply_write(
+                "contacts",
+                response.json["id"],
+                dict(
+                    response.json.get("properties") or {},
+                    **_properties_of(property_json)
+                ),
+            )
         self.logger.debug("created resource {}".format(property_json["email"]))
         return response.json
 
@@ -352,23 +1576,413 @@ class BaseHubspotClient(CrmClient):
         {'id': '61051', 'properties': {'firstname': 'test', 'lastmodifieddate': '2021-07-28T21:34:44.133Z', 'lastname': 'Test'}, 'createdAt': '2021-07-28T21:31:48.144Z', 'updatedAt': '2021-07-28T21:34:44.133Z', 'archived': False}
         """
         url = self._contacts_url + "/" + str(contact_id)
+        if self._validate_properties:
+            errors = await self._property_errors(
+                "contacts", [_properties_of(property_json)]
+            )
+            if errors and errors[0]:
+                raise HubspotValidationError(errors[0])
 
         data = {}
         data["properties"] = property_json
        
         response = await self.patch(url=url, json=data)
+        self._invalidate(contact_write_tags(property_json, contact_id))
         if not response.successful:
             msg = "could not update contact `{}` in Hubspot: {}".format(
                 url, response.error_msg
             )
             self.logger.error(msg)
             raise HubspotError(msg, response.code)
+        if self._mirror is not None:
+            self._mirror.apply_write(
+                "contacts",
+                contact_id,
+                dict(
+                    response.json.get("properties") or {},
+                    **_properties_of(property_json)
+                ),
+            )
         self.logger.debug("updated contact {}".format(contact_id))
         return response.json
 
     @maybe_sync
-    async def get_commitees_info(self, committee, **kwargs):
+    async def create_contacts(
+        self, property_jsons, max_concurrency=BATCH_CONCURRENCY, **kwargs
+    ):
+        """
+        Create many contacts with Hubspot's batch create. Records are sent in
+        chunks of ``BATCH_SIZE`` with at most ``max_concurrency`` chunks in
+        flight. If Hubspot rejects a chunk because some of its contacts
+        already exist, they are looked up by email with one batch read and the
+        others are sent again; if it rejects a chunk because some records are
+        invalid (400), the chunk is split until they are isolated. Either way
+        one bad record doesn't fail the other 99; any other error fails the
+        whole chunk.
+
+        Args:
+            property_jsons (iterable): contact properties, as for
+                :meth:`create_contact`
+            max_concurrency (int): maximum number of concurrent batch requests
+
+        Return:
+            list: one :class:`~.batch.BatchRecordResult` per record, in input
+            order; a contact that already exists is a ``conflict`` whose ``id``
+            is the existing contact's ID
+        """
+        records = [
+            (property_json, {"properties": property_json}, _email_key(property_json))
+            for property_json in property_jsons
+        ]
+        return await self._batch_write(
+            self._contacts_url + "/batch/create",
+            records,
+            _email_of_result,
+            CREATED,
+            max_concurrency,
+            kwargs,
+        )
+
+    @maybe_sync
+    async def update_contacts(self, updates, max_concurrency=BATCH_CONCURRENCY, **kwargs):
+        """
+        Update many contacts by Hubspot ID with Hubspot's batch update. Chunking,
+        concurrency and per-record isolation work as in :meth:`create_contacts`.
+
+        Args:
+            updates (iterable): ``(contact_id, property_json)`` pairs
+            max_concurrency (int): maximum number of concurrent batch requests
+
+        Return:
+            list: one :class:`~.batch.BatchRecordResult` per update, in input
+            order
+        """
+        records = [
+            (
+                (contact_id, property_json),
+                {"id": str(contact_id), "properties": property_json},
+                str(contact_id),
+            )
+            for contact_id, property_json in updates
+        ]
+        return await self._batch_write(
+            self._contacts_url + "/batch/update",
+            records,
+            lambda result: result.get("id"),
+            UPDATED,
+            max_concurrency,
+            kwargs,
+        )
+
+    @maybe_sync
+    async def upsert_contacts(
+        self, property_jsons, max_concurrency=BATCH_CONCURRENCY, **kwargs
+    ):
+        """
+        Create or update many contacts keyed by email with Hubspot's batch
+        upsert. Chunking, concurrency and per-record isolation work as in
+        :meth:`create_contacts`.
+
+        Args:
+            property_jsons (iterable): contact properties; ``email`` is required
+            max_concurrency (int): maximum number of concurrent batch requests
+
+        Return:
+            list: one :class:`~.batch.BatchRecordResult` per record, in input
+            order, either ``created`` or ``updated``
+        """
+        records = [
+            (
+                property_json,
+                {
+                    "idProperty": "email",
+                    "id": property_json["email"],
+                    "properties": property_json,
+                },
+                _email_key(property_json),
+            )
+            for property_json in property_jsons
+        ]
+        return await self._batch_write(
+            self._contacts_url + "/batch/upsert",
+            records,
+            _email_of_result,
+            None,
+            max_concurrency,
+            kwargs,
+        )
+
+    @maybe_sync
+    async def _batch_write(self, url, records, key_of, status, max_concurrency, kwargs):
+        """
+        Send ``records`` (``(original, input, key)`` tuples) to a batch write
+        endpoint and match Hubspot's results back to them by key. ``status`` is
+        the status of a written record, or ``None`` to read it from the
+        ``new`` flag of upsert results. With ``validate_properties``, records
+        whose properties don't match Hubspot's definitions are errors that
+        aren't sent.
+        """
+        _anchor_deadline(kwargs)
+        rejected = {}
+        if self._validate_properties:
+            errors = await self._property_errors(
+                "contacts", [record[1].get("properties") or {} for record in records]
+            )
+            for index, record_errors in enumerate(errors or ()):
+                if record_errors:
+                    rejected[index] = BatchRecordResult(
+                        records[index][0], ERROR, error="; ".join(record_errors), code=400
+                    )
+
+        async def _existing_contacts(chunk):
+            emails = [record[2] for record in chunk if record[2] is not None]
+            try:
+                found = await self._get_contacts_by_emails(emails, ("email",), **kwargs)
+            except HubspotError:
+                return {}
+            return {email: contact["id"] for email, contact in found.items() if contact}
+
+        async def _write(chunk):
+            response = await self.post(
+                url=url, json={"inputs": [record[1] for record in chunk]}, **kwargs
+            )
+            if response.successful:
+                return _match_batch_results(chunk, response.json, key_of, status)
+
+            if len(chunk) > 1 and response.code == 409 and status == CREATED:
+                # Hubspot names one existing contact per 409: look them all up
+                # by email and send the others again, rather than split
+                existing = await _existing_contacts(chunk)
+                if existing:
+                    rest = [record for record in chunk if record[2] not in existing]
+                    written = iter((await _write(rest)) if rest else ())
+                    return [
+                        BatchRecordResult(
+                            record[0],
+                            CONFLICT,
+                            id=existing[record[2]],
+                            error=conflict_message(existing[record[2]]),
+                            code=409,
+                        )
+                        if record[2] in existing
+                        else next(written)
+                        for record in chunk
+                    ]
+
+            if len(chunk) > 1 and response.code == 400:
+                # a record failed validation: split the chunk until the records
+                # causing it are isolated; other errors (401, 403, 404...) are
+                # about the whole request and would fail every half again
+                middle = len(chunk) // 2
+                return (await _write(chunk[:middle])) + (await _write(chunk[middle:]))
+
+            if len(chunk) == 1 and response.code == 409:
+                return [
+                    BatchRecordResult(
+                        chunk[0][0],
+                        CONFLICT,
+                        id=existing_id(response.error_msg),
+                        error=response.error_msg,
+                        code=response.code,
+                    )
+                ]
+
+            self.logger.error(
+                "batch write to `{}` failed: {}".format(url, response.error_msg)
+            )
+            return [
+                BatchRecordResult(
+                    record[0], ERROR, error=response.error_msg, code=response.code
+                )
+                for record in chunk
+            ]
+
+        sent = [record for index, record in enumerate(records) if index not in rejected]
+        chunks = await map_bounded(_write, chunked(sent, BATCH_SIZE), max_concurrency)
+        written = iter([result for chunk in chunks for result in chunk])
+        results = [
+            rejected[index] if index in rejected else next(written)
+            for index in range(len(records))
+        ]
+        if self._mirror is not None:
+            for result in results:
+                if result.ok:
+                    self._mirror.apply_write(
+                        "contacts", result.id, (result.record or {}).get("properties") or {}
+                    )
+        if self._cache is not None:
+            tags = set()
+            for result in results:
+                properties = (result.record or {}).get("properties") or {}
+                tags.update(contact_write_tags(properties, result.id))
+            for _, data, _ in sent:
+                contact_id = None if "idProperty" in data else data.get("id")
+                tags.update(contact_write_tags(data.get("properties") or {}, contact_id))
+            self._invalidate(tags)
+        return results
+
+    @maybe_sync
+    async def get_associations(
+        self, from_type, to_type, ids, max_concurrency=BATCH_CONCURRENCY, **kwargs
+    ):
+        """
+        Return the objects associated with many objects at once, e.g. the
+        companies of contacts, with Hubspot's batch association reads: IDs
+        not cached are sent in chunks of ``ASSOCIATION_BATCH_SIZE``, with at
+        most ``max_concurrency`` chunks in flight. See :mod:`~.associations`.
+
+        Args:
+            from_type (str): ``contacts`` or ``companies``
+            to_type (str): ``companies`` or ``contacts``
+            ids (iterable): Hubspot IDs of ``from_type`` objects
+            max_concurrency (int): maximum number of concurrent batch requests
+
+        Return:
+            dict: every ID mapped to the IDs of its associated objects, e.g.
+            {'9601': ['6618904721'], '9602': []}
+
+        Raises:
+            - HubspotError: if a batch request failed
         """
+        _anchor_deadline(kwargs)
+        ids = list(dict.fromkeys(str(object_id) for object_id in ids))
+        cache = self._association_cache
+        if cache is not None:
+            associations, missing = cache.get_many(from_type, to_type, ids)
+        else:
+            associations, missing = {}, ids
+        url = "{}/{}/{}/batch/read".format(self._associations_url, from_type, to_type)
+
+        async def _read(chunk):
+            data = {"inputs": [{"id": object_id} for object_id in chunk]}
+            response = await self.post(url=url, json=data, **kwargs)
+            if not response.successful:
+                msg = "could not read the {} of {} in Hubspot: {}".format(
+                    to_type, from_type, response.error_msg
+                )
+                self.logger.error(msg)
+                raise HubspotError(msg, response.code)
+            found = association_results(response.json)
+            return {object_id: found.get(object_id, []) for object_id in chunk}
+
+        pages = await map_bounded(
+            _read, chunked(missing, ASSOCIATION_BATCH_SIZE), max_concurrency
+        )
+        for page in pages:
+            associations.update(page)
+            if cache is not None:
+                cache.set_many(from_type, to_type, page)
+        return {object_id: associations[object_id] for object_id in ids}
+
+    @maybe_sync
+    async def _read_by_ids(self, object_type, ids, properties, max_concurrency, **kwargs):
+        """Batch read objects by Hubspot ID; return those found by ID."""
+        url = self._base_url + "/" + object_type + "/batch/read"
+        properties = list(properties)
+
+        async def _read(chunk):
+            data = {
+                "inputs": [{"id": object_id} for object_id in chunk],
+                "properties": properties,
+            }
+            response = await self.post(url=url, json=data, **kwargs)
+            if not response.successful:
+                msg = "could not batch read {} in Hubspot: {}".format(
+                    object_type, response.error_msg
+                )
+                self.logger.error(msg)
+                raise HubspotError(msg, response.code)
+            return response.json.get("results") or []
+
+        pages = await map_bounded(_read, chunked(ids, BATCH_SIZE), max_concurrency)
+        return {record["id"]: record for page in pages for record in page}
+
+    @maybe_sync
+    async def get_contacts_with_companies(
+        self,
+        contacts,
+        properties=CONTACT_PROPERTIES,
+        company_properties=("name", "domain"),
+        max_concurrency=BATCH_CONCURRENCY,
+        **kwargs
+    ):
+        """
+        Return contacts joined with their associated companies, in two rounds
+        of concurrent batch requests: the associations, along with the
+        contacts given by ID, then the companies. See :mod:`~.associations`.
+
+        Args:
+            contacts (iterable): contact IDs, or contact records such as the
+                ``results`` of :meth:`get_contacts_by_committee`, which aren't
+                read again
+            properties (iterable): properties of the contacts given by ID
+            company_properties (iterable): company properties to return
+            max_concurrency (int): maximum number of concurrent batch requests
+                of each kind
+
+        Return:
+            list: the contacts, in order, each with a ``companies`` list of
+            company records, e.g.
+            {'id': '9601', 'properties': {...}, 'companies': [{'id': '6618904721',
+            'properties': {'name': 'INSTRuCT', ...}, ...}], ...}
+            or :class:`~.models.Contact` objects for clients with
+            ``typed_results``. Contact IDs not found in Hubspot are left out.
+
+        Raises:
+            - HubspotError: if a batch request failed
+        """
+        _anchor_deadline(kwargs)
+        entries = [_contact_entry(contact) for contact in contacts]
+        unread = list(dict.fromkeys(object_id for object_id, record in entries if record is None))
+        reading = None
+        if unread:
+            reading = start_background(
+                self._read_by_ids, "contacts", unread, properties, max_concurrency, **kwargs
+            )
+        try:
+            associations = await self.get_associations(
+                "contacts",
+                "companies",
+                [object_id for object_id, _ in entries],
+                max_concurrency,
+                **kwargs
+            )
+        except BaseException:
+            if reading is not None:
+                cancel_background(reading)
+            raise
+        read = await wait_background(reading) if reading is not None else {}
+
+        company_ids = list(
+            dict.fromkeys(company_id for ids in associations.values() for company_id in ids)
+        )
+        companies = await self._read_by_ids(
+            "companies", company_ids, company_properties, max_concurrency, **kwargs
+        )
+        joined = []
+        for object_id, record in entries:
+            record = record if record is not None else read.get(object_id)
+            if record is None:
+                continue
+            record = dict(
+                record,
+                companies=[
+                    companies[company_id]
+                    for company_id in associations[object_id]
+                    if company_id in companies
+                ],
+            )
+            joined.append(Contact.from_json(record) if self._typed_results else record)
+        return joined
+
+    @maybe_sync
+    async def get_commitees_info(self, committee, properties=None, **kwargs):
+        """
+        Args:
+            committee (str): name of the committee's company
+            properties (iterable): company properties to return, defaults to
+                ``COMPANY_PROPERTIES``
+
         Returned response example
         {'total': 1, 'results': [{'id': '6618904721', 'properties': {'approval_committees': 'INSTRuCT Executive Committee Member', 'createdate': '2021-07-22T18:30:31.713Z', 'hs_lastmodifieddate': '2021-07-22T20:56:05.763Z', 'hs_object_id': '6618904721'}, 'createdAt': '2021-07-22T18:30:31.713Z', 'updatedAt': '2021-07-22T20:56:05.763Z', 'archived': False}]}
         """
@@ -380,10 +1994,19 @@ class BaseHubspotClient(CrmClient):
                     "operator": "EQ"
                 }]
             }],
-            "properties": ["approval_committees"]
         }
+        data["properties"], projection = _projection(properties, COMPANY_PROPERTIES)
+        mirrored = self._mirrored("companies_by_name", committee, data["properties"])
+        if mirrored is not None:
+            return self._typed_page(mirrored, Company)
+        cache_args = (committee,) + projection
+        hit, cached = self._cached("get_commitees_info", *cache_args)
+        if hit:
+            return self._typed_page(cached, Company)
         response =  await self.post(url=self._companies_url + "/search", json=data, **kwargs)
-        return response.json
+        if response.successful:
+            self._cache_search("get_commitees_info", cache_args, response.json)
+        return self._typed_page(response.json, Company)
 
         # if response.code == 404:
         #     return None
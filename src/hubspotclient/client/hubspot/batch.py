@@ -0,0 +1,62 @@
+"""
+Per-record results for the batch write methods of
+:class:`~.base.BaseHubspotClient` (``create_contacts``, ``update_contacts``
+and ``upsert_contacts``).
+"""
+
+import re
+
+
+CREATED = "created"
+UPDATED = "updated"
+CONFLICT = "conflict"
+ERROR = "error"
+
+# Hubspot reports the contact a create collided with only in the message, e.g.
+# 'Contact already exists. Existing ID: 9601'
+_EXISTING_ID_RE = re.compile(r"Existing ID: (\d+)")
+
+
+def existing_id(message):
+    """Return the existing contact ID mentioned in a 409 message, if any."""
+    match = _EXISTING_ID_RE.search(message or "")
+    return match.group(1) if match else None
+
+
+def conflict_message(contact_id):
+    """Hubspot's 409 message for a create colliding with contact ``contact_id``."""
+    return "Contact already exists. Existing ID: {}".format(contact_id)
+
+
+class BatchRecordResult(object):
+    """
+    Outcome of one record of a batch write.
+
+    Attributes:
+        input: the record as it was passed in by the caller
+        status (str): one of ``created``, ``updated``, ``conflict``, ``error``
+        id (str): Hubspot ID of the contact that was written, or, for a
+            conflict, of the contact that already exists
+        record (dict): the contact as returned by Hubspot, if written
+        error (str): error message for conflicts and errors
+        code (int): HTTP status code of the failed request, if any
+    """
+
+    __slots__ = ("input", "status", "id", "record", "error", "code")
+
+    def __init__(self, input, status, id=None, record=None, error=None, code=None):
+        self.input = input
+        self.status = status
+        self.id = id
+        self.record = record
+        self.error = error
+        self.code = code
+
+    @property
+    def ok(self):
+        return self.status in (CREATED, UPDATED)
+
+    def __repr__(self):
+        return "BatchRecordResult(status={!r}, id={!r}, error={!r})".format(
+            self.status, self.id, self.error
+        )
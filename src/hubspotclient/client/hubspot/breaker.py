@@ -0,0 +1,209 @@
+"""
+Circuit breakers for the Hubspot clients.
+
+Each client keeps one :class:`CircuitBreaker` per endpoint group (e.g.
+``contacts/search``, ``contacts/batch``, ``contacts/objects``), shared by all
+its threads and tasks. A breaker watches the outcome of the requests of the
+last ``window`` seconds and opens when, over at least ``min_requests`` of
+them, the share of failures (connection errors, timeouts and 5xx) or of slow
+responses crosses its threshold. While open, requests of the group fail at
+once with :class:`~.errors.HubspotCircuitOpenError` instead of waiting for
+Hubspot to time out. After ``open_seconds`` the breaker is half-open: up to
+``half_open_probes`` requests go through, and it closes once that many have
+succeeded, or opens again on the first failure.
+"""
+
+import threading
+import time
+from collections import deque
+
+from .errors import HubspotCircuitOpenError
+from .events import endpoint_of
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def endpoint_group(url, base_url):
+    """
+    Return the group of a request URL: the object type, or the other CRM
+    API, and ``search``, ``batch`` or ``objects``, e.g. ``contacts/search``
+    or ``associations/batch``.
+    """
+    parts = endpoint_of(url, base_url).split("/")
+    if "search" in parts[1:]:
+        kind = "search"
+    elif "batch" in parts[1:]:
+        kind = "batch"
+    else:
+        kind = "objects"
+    return parts[0] + "/" + kind
+
+
+class CircuitBreaker(object):
+    """
+    Breaker of one endpoint group; thread-safe.
+
+    Args:
+        window (float): seconds of history considered
+        min_requests (int): outcomes needed in the window before tripping
+        failure_rate (float): share of failed requests that trips the breaker
+        slow_call_seconds (float): requests taking longer are slow
+        slow_rate (float): share of slow requests that trips the breaker
+        open_seconds (float): time spent open before probing Hubspot again
+        half_open_probes (int): requests let through, and successes needed to
+            close, while half-open
+    """
+
+    def __init__(
+        self,
+        name,
+        window=30.0,
+        min_requests=20,
+        failure_rate=0.5,
+        slow_call_seconds=5.0,
+        slow_rate=0.8,
+        open_seconds=15.0,
+        half_open_probes=3,
+    ):
+        self.name = name
+        self.window = window
+        self.min_requests = min_requests
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self._lock = threading.Lock()
+        self._outcomes = deque()
+        self._failures = 0
+        self._slow = 0
+        self._state = CLOSED
+        self._opened_at = None
+        self._probes = 0
+        self._probe_successes = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    def _trim(self, now):
+        horizon = now - self.window
+        outcomes = self._outcomes
+        while outcomes and outcomes[0][0] < horizon:
+            _, failed, slow = outcomes.popleft()
+            self._failures -= failed
+            self._slow -= slow
+
+    def _open(self, now):
+        self._state = OPEN
+        self._opened_at = now
+        self._probes = 0
+        self._probe_successes = 0
+        self.times_opened += 1
+
+    def acquire(self):
+        """
+        Let a request through, or raise
+        :class:`~.errors.HubspotCircuitOpenError`. Every call that returns
+        must be followed by :meth:`record` or :meth:`release`.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._state == OPEN:
+                retry_in = self._opened_at + self.open_seconds - now
+                if retry_in > 0:
+                    self.rejected += 1
+                    raise HubspotCircuitOpenError(self.name, retry_in)
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN:
+                if self._probes >= self.half_open_probes:
+                    self.rejected += 1
+                    raise HubspotCircuitOpenError(self.name, 0.0)
+                self._probes += 1
+
+    def release(self):
+        """Forget a request let through by :meth:`acquire` that was abandoned."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def record(self, failed, elapsed):
+        """Record the outcome of a request let through by :meth:`acquire`."""
+        slow = self.slow_call_seconds is not None and elapsed >= self.slow_call_seconds
+        with self._lock:
+            now = time.monotonic()
+            if self._state == HALF_OPEN:
+                if failed or slow:
+                    self._open(now)
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    self._failures = self._slow = 0
+                return
+            if self._state == OPEN:
+                # sent before the breaker opened
+                return
+            self._outcomes.append((now, int(failed), int(slow)))
+            self._failures += failed
+            self._slow += slow
+            self._trim(now)
+            total = len(self._outcomes)
+            if total >= self.min_requests and (
+                self._failures >= self.failure_rate * total
+                or self._slow >= self.slow_rate * total
+            ):
+                self._open(now)
+
+    def status(self):
+        """
+        Return e.g. {'state': 'closed', 'requests': 42, 'failure_rate': 0.05,
+        'slow_rate': 0.0, 'retry_in': 0.0, 'times_opened': 1, 'rejected': 12}
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            total = len(self._outcomes)
+            retry_in = 0.0
+            state = self._state
+            if state == OPEN:
+                retry_in = max(0.0, self._opened_at + self.open_seconds - now)
+                if not retry_in:
+                    state = HALF_OPEN
+            return {
+                "state": state,
+                "requests": total,
+                "failure_rate": self._failures / float(total) if total else 0.0,
+                "slow_rate": self._slow / float(total) if total else 0.0,
+                "retry_in": retry_in,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
+
+
+class CircuitBreakers(object):
+    """
+    The breakers of one client, created per endpoint group on first use with
+    the given :class:`CircuitBreaker` options.
+    """
+
+    def __init__(self, base_url, **options):
+        self._base_url = base_url
+        self._options = options
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+    def for_url(self, url):
+        group = endpoint_group(url, self._base_url)
+        breaker = self._breakers.get(group)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(group)
+                if breaker is None:
+                    breaker = self._breakers[group] = CircuitBreaker(group, **self._options)
+        return breaker
+
+    def status(self):
+        return {group: breaker.status() for group, breaker in sorted(self._breakers.items())}
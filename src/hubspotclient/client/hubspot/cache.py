@@ -0,0 +1,237 @@
+"""
+Opt-in response cache for the read methods of
+:class:`~.base.BaseHubspotClient`.
+
+A :class:`ResponseCache` keeps each cached read for a per-method TTL, caches
+"not found" results for a shorter TTL, and drops entries when the client
+writes a contact they may include. Entries are tagged (``contact:<id>``,
+``email:<email>``, ``committee:<name>``) so that writes can invalidate them
+without knowing their keys.
+
+Storage is delegated to a :class:`CacheBackend`. :class:`InMemoryCacheBackend`
+is a bounded LRU in the current process; a backend shared between processes
+(e.g. Redis) only has to implement the same four methods.
+"""
+
+import abc
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import six
+
+
+# seconds each read stays cached, by client method
+DEFAULT_TTLS = {
+    "get_contact_by_email": 60,
+    "get_contacts_by_committee": 300,
+    "get_commitees_info": 3600,
+}
+# seconds a "not found" result stays cached
+DEFAULT_NEGATIVE_TTL = 30
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class CacheBackend(six.with_metaclass(abc.ABCMeta)):
+    """
+    Storage for a :class:`ResponseCache`. Values are JSON-compatible; keys and
+    tags are strings.
+    """
+
+    @abc.abstractmethod
+    def get(self, key):
+        """Return the value stored for ``key``, or ``None``."""
+
+    @abc.abstractmethod
+    def set(self, key, value, ttl, tags=()):
+        """Store ``value`` for ``ttl`` seconds, tagged with ``tags``."""
+
+    @abc.abstractmethod
+    def invalidate_tags(self, tags):
+        """Remove every entry tagged with any of ``tags``; return how many."""
+
+    @abc.abstractmethod
+    def clear(self):
+        """Remove every entry."""
+
+    def stats(self):
+        """Return backend counters such as evictions, if the backend has any."""
+        return {}
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Thread-safe in-process backend with TTL expiry and LRU eviction once
+    ``max_entries`` entries are stored.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+        self._evictions = 0
+        self._expirations = 0
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                self._expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl, tags=()):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self._max_entries:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def invalidate_tags(self, tags):
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    removed += 1
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+
+class ResponseCache(object):
+    """
+    Args:
+        backend (CacheBackend): defaults to an :class:`InMemoryCacheBackend`
+        ttls (dict): seconds to cache each method's results, merged over
+            ``DEFAULT_TTLS``; a TTL of 0 disables caching for that method
+        negative_ttl (int): seconds to cache "not found" results
+    """
+
+    def __init__(self, backend=None, ttls=None, negative_ttl=DEFAULT_NEGATIVE_TTL):
+        self.backend = backend if backend is not None else InMemoryCacheBackend()
+        self._ttls = dict(DEFAULT_TTLS)
+        self._ttls.update(ttls or {})
+        self._negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+        }
+
+    @staticmethod
+    def key(method, *args):
+        return method + ":" + json.dumps(args, sort_keys=True, separators=(",", ":"))
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+
+    def enabled(self, method):
+        return self._ttls.get(method, 0) > 0
+
+    def get(self, method, *args):
+        """
+        Return ``(True, value)`` for a cached call, or ``(False, None)``. The
+        value is a copy the caller may modify.
+        """
+        if not self.enabled(method):
+            return False, None
+        entry = self.backend.get(self.key(method, *args))
+        if entry is None:
+            self._count("misses")
+            return False, None
+        self._count("negative_hits" if entry["negative"] else "hits")
+        return True, copy.deepcopy(entry["value"])
+
+    def set(self, method, args, value, tags=(), negative=False):
+        if not self.enabled(method):
+            return
+        ttl = self._negative_ttl if negative else self._ttls[method]
+        if ttl <= 0:
+            return
+        self.backend.set(
+            self.key(method, *args),
+            {"value": copy.deepcopy(value), "negative": negative},
+            ttl,
+            tags,
+        )
+
+    def invalidate(self, tags):
+        removed = self.backend.invalidate_tags(list(tags))
+        self._count("invalidations", removed)
+        return removed
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        """
+        Return the cache counters, e.g.
+        {'hits': 10, 'negative_hits': 2, 'misses': 4, 'invalidations': 1,
+         'entries': 3, 'evictions': 0, 'expirations': 1}
+        """
+        with self._lock:
+            stats = dict(self._counters)
+        stats.update(self.backend.stats())
+        return stats
+
+
+def contact_tags(contacts, email=None, committee=None):
+    """Tags for a cached read that returned ``contacts``."""
+    tags = ["contact:{}".format(contact.get("id")) for contact in contacts]
+    if email:
+        tags.append("email:{}".format(email.lower()))
+    if committee:
+        tags.append("committee:{}".format(committee))
+    return tags
+
+
+def contact_write_tags(property_json, contact_id=None):
+    """Tags of the cached reads a write of ``property_json`` may change."""
+    tags = []
+    if contact_id is not None:
+        tags.append("contact:{}".format(contact_id))
+    if not isinstance(property_json, dict):
+        return tags
+    if property_json.get("email"):
+        tags.append("email:{}".format(property_json["email"].lower()))
+    # a multiple checkboxes property, values are separated by ';'
+    committees = property_json.get("disease_group_executive_committee") or ""
+    for committee in committees.split(";"):
+        if committee:
+            tags.append("committee:{}".format(committee))
+    return tags
@@ -3,6 +3,8 @@ Define the HubspotClient class for interfacing with the Hubspot service for
 hubspot.
 """
 
+import contextvars
+
 import httpx
 
 try:
@@ -11,18 +13,17 @@ except ImportError:
     import urllib
 
 from .base import BaseHubspotClient
+from .fanout import DEFAULT_MAX_WORKERS, FanOut
 from pcdcutils.environment import is_env_enabled
 
 
-class SyncClient(httpx.Client):
-    async def __aenter__(self):
-        return self.__enter__()
+# kept for backwards compatibility, the sync client now uses httpx.Client as is
+SyncClient = httpx.Client
 
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        self.__exit__(exc_type, exc_val, exc_tb)
 
-    async def request(self, *args, **kwargs):
-        return super().request(*args, **kwargs)
+def _call_in_env(env, kwargs, fn, args, call_kwargs):
+    env.restore(kwargs)
+    return fn(*args, **call_kwargs)
 
 
 class HubspotClient(BaseHubspotClient):
@@ -30,8 +31,81 @@ class HubspotClient(BaseHubspotClient):
     A singleton class for interfacing with the hubspot engine, "Hubspot".
     """
 
-    client_cls = SyncClient
+    client_cls = httpx.Client
+    synchronous = True
+
+    def __init__(self, *args, fanout_workers=DEFAULT_MAX_WORKERS, **kwargs):
+        """
+        Takes the arguments of :class:`~.base.BaseHubspotClient`, and:
+
+        Args:
+            fanout_workers (int): threads running the calls of :meth:`map`
+                and :meth:`submit`
+        """
+        super(HubspotClient, self).__init__(*args, **kwargs)
+        self._fanout = FanOut(fanout_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Close the pooled connections and stop the fan-out threads; both are
+        started again if the client is used afterwards.
+        """
+        self._fanout.shutdown()
+        super(HubspotClient, self).close()
+
+    def _in_caller_context(self, method):
+        """
+        Return ``method`` (a client method or its name) wrapped to run with the
+        caller's context variables and ``context()`` settings, in any thread.
+        """
+        fn = getattr(self, method) if isinstance(method, str) else method
+        context = contextvars.copy_context()
+        kwargs = self._env.current()
+
+        def _call(*args, **call_kwargs):
+            return context.copy().run(
+                _call_in_env, self._env, kwargs, fn, args, call_kwargs
+            )
+
+        return _call
+
+    def submit(self, method, *args, **kwargs):
+        """
+        Start ``method(*args, **kwargs)`` on the client's fan-out threads, see
+        :mod:`~.fanout`.
+
+        Args:
+            method: a client method, e.g. ``hubspot.get_contact_by_email``, or
+                its name
+
+        Return:
+            concurrent.futures.Future: the call's result or exception
+        """
+        return self._fanout.submit(self._in_caller_context(method), *args, **kwargs)
+
+    def map(self, method, items, max_workers=None):
+        """
+        Call ``method`` once per item on the client's fan-out threads, with at
+        most ``max_workers`` calls in flight, see :mod:`~.fanout`.
 
+        Args:
+            method: a client method, e.g. ``hubspot.get_contact_by_email``, or
+                its name
+            items (iterable): the arguments of each call, a tuple or a single
+                value
+            max_workers (int): calls in flight, at most ``fanout_workers``
+
+        Return:
+            list: one :class:`~.fanout.CallResult` per item, in order; a call
+            that raised has its exception in ``error``
+        """
+        return self._fanout.map(self._in_caller_context(method), items, max_workers)
 
     def get_contacts_by_committee(self, committee, **kwargs):
         """
@@ -72,6 +146,18 @@ class HubspotClient(BaseHubspotClient):
         return super(HubspotClient, self).get_contacts_by_committee(committee, **kwargs)
 
 
+    def iter_contacts_by_committee(self, committee, **kwargs):
+        """
+        if DEBUG, iterate over test data, otherwise, call the base method
+        """
+        if is_env_enabled('HUBSPOT_DEBUG'):
+            return iter(self.get_contacts_by_committee(committee)["results"])
+
+        ### NORMAL HANDLING
+
+        return super(HubspotClient, self).iter_contacts_by_committee(committee, **kwargs)
+
+
     def get_contact_by_email(self, email, hubspot_id=None, **kwargs):
         """
         if DEBUG, return test data, otherwise, call the base method
@@ -112,6 +198,22 @@ class HubspotClient(BaseHubspotClient):
         return super(HubspotClient, self).get_contact_by_email(email, hubspot_id, **kwargs)
 
 
+    def get_contacts_by_emails(self, emails, **kwargs):
+        """
+        if DEBUG, return test data, otherwise, call the base method
+        """
+        if is_env_enabled('HUBSPOT_DEBUG'):
+            data = {}
+            for email in emails:
+                results = self.get_contact_by_email(email)["results"]
+                data[email] = results[0] if results else None
+            return data
+
+        ### Normal Handling
+
+        return super(HubspotClient, self).get_contacts_by_emails(emails, **kwargs)
+
+
     def update_contact(self, contact_id, property_json):
         """
         if DEBUG, return test data, otherwise, call the base method
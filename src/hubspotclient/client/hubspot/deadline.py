@@ -0,0 +1,88 @@
+"""
+End-to-end time budgets for client calls.
+
+A :class:`Deadline` is an absolute point in time by which a call, with all
+its requests, retries and waits, must be done. It is set for a block with
+``client.context(deadline=2.5)`` or for one call with ``deadline=2.5``
+(seconds from now, or a ``Deadline``), and reaches every request made
+inside: the chunks of batch calls, the pages of ``iter_*`` methods and the
+calls of ``map``/``submit``/``as_completed``. Nested deadlines never extend
+the enclosing one.
+
+Before each attempt the request's timeout is cut to the time left; once
+that is less than ``MIN_ATTEMPT_SECONDS``, no attempt or retry is made and
+:class:`~.errors.HubspotDeadlineError` is raised.
+"""
+
+import time
+from datetime import datetime
+
+
+# shortest time left worth sending an attempt in, in seconds
+MIN_ATTEMPT_SECONDS = 0.05
+
+
+class Deadline(object):
+    """
+    Args:
+        expires (float): ``time.monotonic()`` value at which the budget is spent
+    """
+
+    __slots__ = ("expires",)
+
+    def __init__(self, expires):
+        self.expires = expires
+
+    @classmethod
+    def after(cls, seconds):
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self):
+        """Seconds left, negative once expired."""
+        return self.expires - time.monotonic()
+
+    def fits(self, seconds):
+        """Whether waiting ``seconds`` still leaves time for an attempt."""
+        return self.remaining() - seconds >= MIN_ATTEMPT_SECONDS
+
+    def __repr__(self):
+        return "Deadline(remaining={:.3f}s)".format(self.remaining())
+
+
+def as_deadline(value):
+    """
+    Return a :class:`Deadline` from ``None``, a ``Deadline``, a number of
+    seconds from now or an aware ``datetime``.
+    """
+    if value is None or isinstance(value, Deadline):
+        return value
+    if isinstance(value, datetime):
+        return Deadline.after(value.timestamp() - time.time())
+    return Deadline.after(float(value))
+
+
+def earliest(*deadlines):
+    """Return the earliest of some deadlines, ignoring ``None``s."""
+    deadlines = [deadline for deadline in deadlines if deadline is not None]
+    if not deadlines:
+        return None
+    return min(deadlines, key=lambda deadline: deadline.expires)
+
+
+def cap_timeout(timeout, seconds):
+    """Return ``timeout`` (seconds or an ``httpx.Timeout``) cut to ``seconds``."""
+    if timeout is None:
+        return seconds
+    if isinstance(timeout, (int, float)):
+        return min(timeout, seconds)
+    import httpx
+
+    def _cap(value):
+        return seconds if value is None else min(value, seconds)
+
+    return httpx.Timeout(
+        connect=_cap(timeout.connect),
+        read=_cap(timeout.read),
+        write=_cap(timeout.write),
+        pool=_cap(timeout.pool),
+    )
@@ -18,3 +18,58 @@ class HubspotUnhealthyError(InternalError, HubspotError):
         self.message = message or "could not reach Hubspot service"
         self.code = 500
         self.json = {"error": self.message, "code": self.code}
+
+
+class HubspotCircuitOpenError(HubspotUnhealthyError):
+    """
+    Exception raised without contacting Hubspot because the circuit breaker of
+    the endpoint group is open, see :mod:`~.breaker`.
+    """
+
+    def __init__(self, group, retry_in):
+        super(HubspotCircuitOpenError, self).__init__(
+            "Hubspot circuit for `{}` is open; retry in {:.1f}s".format(group, retry_in)
+        )
+        self.group = group
+        self.retry_in = retry_in
+
+
+class HubspotDeadlineError(HubspotUnhealthyError):
+    """
+    Exception raised when the time budget of a call, see :mod:`~.deadline`,
+    ran out before Hubspot answered.
+    """
+
+    def __init__(self, message=None):
+        super(HubspotDeadlineError, self).__init__(
+            message or "the deadline ran out before Hubspot answered"
+        )
+        self.code = 504
+        self.json = {"error": self.message, "code": self.code}
+
+
+class HubspotDailyLimitError(HubspotError):
+    """
+    Exception raised without contacting Hubspot because the account's daily
+    request limit is used up, see :mod:`~.ratelimit`.
+    """
+
+    def __init__(self, daily_max=None, retry_in=None):
+        super(HubspotDailyLimitError, self).__init__(
+            "Hubspot daily request limit{} is used up; checking again in {:.0f}s".format(
+                " of {}".format(daily_max) if daily_max else "", retry_in or 0
+            ),
+            429,
+        )
+        self.retry_in = retry_in
+
+
+class HubspotValidationError(HubspotError):
+    """
+    Exception raised without contacting Hubspot because the properties of a
+    write don't match Hubspot's property definitions, see :mod:`~.schema`.
+    """
+
+    def __init__(self, errors):
+        super(HubspotValidationError, self).__init__("; ".join(errors), 400)
+        self.errors = errors
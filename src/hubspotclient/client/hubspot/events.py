@@ -0,0 +1,222 @@
+"""
+Hooks into the lifecycle of the requests of :class:`~.base.BaseHubspotClient`.
+
+Listeners subclass :class:`EventListener` and override the callbacks they
+need; they are passed to the client with ``listeners=[...]`` or
+:meth:`~.base.BaseHubspotClient.add_listener`. For every request sent to
+Hubspot the client calls:
+
+- ``on_request_start`` before the first attempt
+- ``on_response`` for the response of every attempt
+- ``on_retry`` when the request is about to be sent again
+- ``on_give_up`` when it fails for good: an exception, or retries exhausted
+- ``on_request_end`` after the last attempt, whatever its outcome, even if
+  the request was cancelled
+
+and ``on_cache_hit`` when a read is answered by the response cache. Identical
+reads coalesced into one request (see :mod:`~.singleflight`) produce one set
+of events.
+
+A client without listeners skips all of this. Listeners are called on the
+thread or task making the request and must be quick and thread-safe;
+exceptions they raise are logged and ignored.
+
+See :class:`~.metrics.MetricsCollector` and
+:class:`~.tracing.OpenTelemetryListener` for built-in listeners.
+"""
+
+import re
+import time
+from urllib.parse import urlsplit
+
+
+_ID_SEGMENT_RE = re.compile(r"^(\d+|[^/]+@[^/]+)$")
+_CRM_PREFIX_RE = re.compile(r"^crm/v\d+/(objects/)?")
+
+
+def endpoint_of(url, base_url):
+    """
+    Return the endpoint of a request URL relative to the client's base URL,
+    with object IDs and emails replaced by ``{id}``, e.g.
+    ``contacts/search`` or ``contacts/{id}``. URLs of the other CRM APIs are
+    relative to the CRM root, e.g. ``associations/contacts/companies/batch/read``
+    or ``properties/contacts``.
+    """
+    if url.startswith(base_url):
+        url = url[len(base_url):].split("?", 1)[0]
+    else:
+        url = _CRM_PREFIX_RE.sub("", urlsplit(url).path.lstrip("/"))
+    url = url.strip("/")
+    return "/".join(
+        "{id}" if _ID_SEGMENT_RE.match(segment) else segment
+        for segment in url.split("/")
+    )
+
+
+class RequestEvent(object):
+    """
+    State of one request, passed to every callback of a listener.
+
+    Attributes:
+        method (str): HTTP method, upper case
+        url (str): request URL, without query parameters
+        endpoint (str): see :func:`endpoint_of`
+        started (float): ``time.perf_counter()`` when the request started
+        attempt (int): number of the current attempt, starting at 1
+        status (int): status code of the last response, if any
+        elapsed (float): seconds taken by the last attempt
+        duration (float): seconds since the start, set on ``on_request_end``
+        request_bytes (int): size of the last request body
+        response_bytes (int): size of the last response body
+        retry_after (float): seconds waited before the next attempt, set on
+            ``on_retry``
+        rate_limit_remaining (int): ``X-HubSpot-RateLimit-Remaining`` of the
+            last response, if reported
+        error: exception that ended the request, set on ``on_give_up``, or
+            the ``CancelledError`` of a cancelled request, which ends without
+            giving up
+        extra (dict): free for listeners to keep their own state in
+    """
+
+    __slots__ = (
+        "method",
+        "url",
+        "endpoint",
+        "started",
+        "attempt",
+        "status",
+        "elapsed",
+        "duration",
+        "request_bytes",
+        "response_bytes",
+        "retry_after",
+        "rate_limit_remaining",
+        "error",
+        "extra",
+        "_attempt_started",
+    )
+
+    def __init__(self, method, url, endpoint):
+        self.method = method.upper()
+        self.url = url
+        self.endpoint = endpoint
+        self.started = self._attempt_started = time.perf_counter()
+        self.attempt = 1
+        self.status = None
+        self.elapsed = None
+        self.duration = None
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.retry_after = None
+        self.rate_limit_remaining = None
+        self.error = None
+        self.extra = {}
+
+    def __repr__(self):
+        return "RequestEvent({} {}, attempt={}, status={})".format(
+            self.method, self.endpoint, self.attempt, self.status
+        )
+
+
+class EventListener(object):
+    """Base class of listeners; every callback does nothing by default."""
+
+    def on_request_start(self, event):
+        pass
+
+    def on_response(self, event):
+        pass
+
+    def on_retry(self, event):
+        pass
+
+    def on_give_up(self, event):
+        pass
+
+    def on_request_end(self, event):
+        pass
+
+    def on_cache_hit(self, method, args):
+        """
+        A read answered from the response cache.
+
+        Args:
+            method (str): client method, e.g. ``get_contact_by_email``
+            args (tuple): its cache key arguments
+        """
+
+
+class Listeners(object):
+    """The listeners of one client, and the client side of the callbacks."""
+
+    def __init__(self, base_url, logger, listeners=()):
+        self._base_url = base_url
+        self._logger = logger
+        self._listeners = tuple(listeners)
+
+    def __bool__(self):
+        return bool(self._listeners)
+
+    def __iter__(self):
+        return iter(self._listeners)
+
+    def with_listener(self, listener):
+        return Listeners(self._base_url, self._logger, self._listeners + (listener,))
+
+    def without_listener(self, listener):
+        return Listeners(
+            self._base_url,
+            self._logger,
+            tuple(other for other in self._listeners if other is not listener),
+        )
+
+    def _emit(self, name, *args):
+        for listener in self._listeners:
+            try:
+                getattr(listener, name)(*args)
+            except Exception:
+                self._logger.exception(
+                    "Hubspot event listener {!r} failed".format(listener)
+                )
+
+    def start(self, method, url):
+        event = RequestEvent(method, url, endpoint_of(url, self._base_url))
+        self._emit("on_request_start", event)
+        return event
+
+    def response(self, event, response):
+        now = time.perf_counter()
+        event.elapsed = now - event._attempt_started
+        event.status = response.status_code
+        try:
+            event.request_bytes = len(response.request.content)
+        except RuntimeError:
+            # a response built without a request, e.g. by a test transport
+            event.request_bytes = 0
+        event.response_bytes = len(response.content)
+        remaining = response.headers.get("X-HubSpot-RateLimit-Remaining")
+        if remaining is not None and remaining.isdigit():
+            event.rate_limit_remaining = int(remaining)
+        self._emit("on_response", event)
+
+    def retry(self, event, retry_after):
+        event.retry_after = retry_after
+        self._emit("on_retry", event)
+        event.attempt += 1
+
+    def sending(self, event):
+        """Mark the start of an attempt, just before it is sent."""
+        event._attempt_started = time.perf_counter()
+
+    def give_up(self, event, error=None):
+        event.error = error
+        if error is not None and event.elapsed is None:
+            event.elapsed = time.perf_counter() - event._attempt_started
+        self._emit("on_give_up", event)
+
+    def end(self, event):
+        event.duration = time.perf_counter() - event.started
+        self._emit("on_request_end", event)
+
+    def cache_hit(self, method, args):
+        self._emit("on_cache_hit", method, args)
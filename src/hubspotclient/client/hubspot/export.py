@@ -0,0 +1,173 @@
+"""
+Bulk export of every contact or company to an NDJSON or CSV file.
+
+:meth:`~.base.BaseHubspotClient.export` splits the ``hs_object_id`` range of
+an object type into partitions, pages through each partition with
+:meth:`~.base.BaseHubspotClient.iter_search` (several partitions at a time)
+and writes every object to a part file as it arrives, so memory use doesn't
+grow with the size of the export. The parts are then joined into the output
+file.
+
+An :class:`ExportJob` keeps the progress of every partition, the last ID and
+the size of its part file, in a :class:`~.changes.FileCheckpoint` next to the
+output. An interrupted export run again with the same arguments truncates
+each part to its last checkpoint and carries on from there.
+"""
+
+import csv
+import io
+import json
+import os
+import shutil
+import threading
+
+from .changes import FileCheckpoint
+
+
+FORMATS = ("ndjson", "csv")
+
+
+def split_range(low, high, partitions):
+    """
+    Split the IDs from ``low`` to ``high`` into ``partitions`` ranges
+    ``(start, end)``, start included and end excluded. The first range is
+    open at the start and the last one at the end (``None``), so that
+    objects created during the export aren't left out.
+    """
+    partitions = max(1, min(partitions, high - low + 1))
+    step = (high - low + 1) / float(partitions)
+    bounds = [low + int(round(step * i)) for i in range(1, partitions)]
+    starts = [None] + bounds
+    ends = bounds + [None]
+    return list(zip(starts, ends))
+
+
+def range_filters(start, end, after=None):
+    """Search filters selecting the IDs of a range, past ``after`` if given."""
+    filters = []
+    if after is not None:
+        filters.append({"propertyName": "hs_object_id", "operator": "GT", "value": after})
+    elif start is not None:
+        filters.append({"propertyName": "hs_object_id", "operator": "GTE", "value": start})
+    if end is not None:
+        filters.append({"propertyName": "hs_object_id", "operator": "LT", "value": end})
+    return filters
+
+
+class ExportJob(object):
+    """
+    Output files and progress of one export; thread-safe.
+
+    Args:
+        path (str): output file
+        object_type (str): ``contacts`` or ``companies``
+        properties (list): properties exported, the CSV columns after ``id``
+        format (str): ``ndjson`` or ``csv``
+        resume (bool): pick up the progress saved by an interrupted export
+            with the same arguments
+    """
+
+    def __init__(self, path, object_type, properties, format="ndjson", resume=True):
+        if format not in FORMATS:
+            raise ValueError("format must be one of {}".format(", ".join(FORMATS)))
+        self.path = path
+        self.format = format
+        self.properties = list(properties)
+        self._meta = {
+            "object_type": object_type,
+            "properties": self.properties,
+            "format": format,
+        }
+        self._checkpoint = FileCheckpoint(path + ".checkpoint")
+        self._lock = threading.Lock()
+        self._state = self._checkpoint.load() if resume else None
+        if self._state is not None and self._state.get("meta") != self._meta:
+            self._state = None
+
+    @property
+    def started(self):
+        """Whether the partitions are known, from :meth:`start` or a checkpoint."""
+        return self._state is not None
+
+    @property
+    def partitions(self):
+        return self._state["partitions"]
+
+    def start(self, ranges):
+        """Plan a new export of the ID ``ranges`` from :func:`split_range`."""
+        self._state = {
+            "meta": self._meta,
+            "partitions": [
+                {"start": start, "end": end, "after": None, "offset": 0, "count": 0, "done": False}
+                for start, end in ranges
+            ],
+        }
+        self._save()
+
+    def _save(self):
+        with self._lock:
+            self._checkpoint.save(self._state)
+
+    def part_path(self, index):
+        return "{}.part{}".format(self.path, index)
+
+    def open_part(self, index):
+        """
+        Open the part file of a partition for writing, truncated to the size
+        saved with its last progress.
+        """
+        partition = self.partitions[index]
+        path = self.part_path(index)
+        if not partition["offset"] or not os.path.exists(path):
+            partition.update(after=None, offset=0, count=0)
+            return open(path, "wb")
+        f = open(path, "r+b")
+        f.truncate(partition["offset"])
+        f.seek(partition["offset"])
+        return f
+
+    def encode(self, record):
+        """Return one exported object as bytes, e.g. an NDJSON line."""
+        if self.format == "ndjson":
+            return (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        properties = record.get("properties") or {}
+        row = io.StringIO()
+        csv.writer(row).writerow(
+            [record["id"]] + [properties.get(name, "") for name in self.properties]
+        )
+        return row.getvalue().encode("utf-8")
+
+    def progress(self, index, f, after, count):
+        """Save that a partition's part file ``f`` is complete up to ID ``after``."""
+        f.flush()
+        os.fsync(f.fileno())
+        with self._lock:
+            self.partitions[index].update(after=after, offset=f.tell(), count=count)
+        self._save()
+
+    def finish(self, index, f, count):
+        f.flush()
+        os.fsync(f.fileno())
+        with self._lock:
+            self.partitions[index].update(offset=f.tell(), count=count, done=True)
+        self._save()
+
+    def assemble(self):
+        """
+        Join the part files into the output file, then remove them and the
+        checkpoint. Return the number of objects exported.
+        """
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as out:
+            if self.format == "csv":
+                row = io.StringIO()
+                csv.writer(row).writerow(["id"] + self.properties)
+                out.write(row.getvalue().encode("utf-8"))
+            for index in range(len(self.partitions)):
+                with open(self.part_path(index), "rb") as part:
+                    shutil.copyfileobj(part, out)
+        os.replace(tmp, self.path)
+        for index in range(len(self.partitions)):
+            os.unlink(self.part_path(index))
+        os.unlink(self._checkpoint.path)
+        return sum(partition["count"] for partition in self.partitions)
@@ -0,0 +1,1041 @@
+"""
+An in-memory stand-in for the Hubspot CRM objects API, to exercise and
+measure the clients without a Hubspot account.
+
+:class:`FakeHubspot` keeps contacts and companies in memory and answers the
+endpoints the clients use: single object create/read/update/archive, listing,
+``/search`` with filter groups, sorts and ``after`` paging (including the
+10,000 result limit), and the batch read/create/update/upsert/archive
+endpoints, with Hubspot's 409 conflicts and 207 multi-status responses, the
+property definitions of the properties API and batch reads of associations
+between contacts and companies. It can
+add latency, enforce rate limits and inject 429 and 5xx responses, and can be
+seeded with a generated dataset of any size.
+
+It works as an ``httpx`` transport, for sync and async clients alike::
+
+    fake = FakeHubspot(latency=0.05).seed(contacts=10000)
+    hubspot = HubspotClient(hubspot_auth_token="fake", transport=fake.transport())
+
+and is itself an ASGI application, which can be served with uvicorn::
+
+    python -m hubspotclient.client.hubspot.fake --contacts 10000 --port 8000
+
+for clients created with ``hubspot_base_url="http://127.0.0.1:8000/crm/v3/objects/"``.
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import parse_qs
+
+import httpx
+
+
+API_PREFIX = "/crm/v3/objects/"
+PROPERTIES_PREFIX = "/crm/v3/properties/"
+ASSOCIATIONS_PREFIX = "/crm/v3/associations/"
+OBJECT_TYPES = ("contacts", "companies")
+SINGULAR = {"contacts": "contact", "companies": "company"}
+# properties returned when a request doesn't list any
+DEFAULT_PROPERTIES = {
+    "contacts": (
+        "createdate",
+        "email",
+        "firstname",
+        "hs_object_id",
+        "lastmodifieddate",
+        "lastname",
+    ),
+    "companies": ("createdate", "domain", "hs_lastmodifieddate", "hs_object_id", "name"),
+}
+MODIFIED_PROPERTY = {"contacts": "lastmodifieddate", "companies": "hs_lastmodifieddate"}
+BATCH_LIMIT = 100
+SEARCH_LIMIT = 100
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_RESULT_LIMIT = 10000
+# seeded objects are created one minute apart from this date (2020-01-01)
+SEED_EPOCH = 1577836800.0
+
+COMMITTEES = ("INSTRuCT", "INRG", "MaGIC", "NODAL", "ALL", "HIBISCUS", "INTERACT", "CARPI")
+FIRST_NAMES = (
+    "Luca", "Debra", "Samuel", "Maria", "Akira", "Fatima", "John", "Olga", "Priya", "Tomas"
+)
+LAST_NAMES = (
+    "Graglia", "Venckus", "Cohn", "Rossi", "Tanaka", "Haddad", "Smith", "Ivanova", "Patel", "Novak"
+)
+INSTITUTIONS = (
+    "The University of Chicago",
+    "St. Jude Children's Research Hospital",
+    "Children's Hospital of Philadelphia",
+    "Great Ormond Street Hospital",
+    "Princess Maxima Center",
+)
+
+_ISO_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T")
+
+
+def format_timestamp(seconds):
+    """Format epoch seconds the way Hubspot does, e.g. '2021-07-28T20:52:30.963Z'."""
+    moment = datetime.fromtimestamp(seconds, timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + "{:03d}Z".format(moment.microsecond // 1000)
+
+
+def _sort_key(value):
+    """
+    Comparable key of a property value: numbers, and timestamps as epoch
+    milliseconds, compare numerically, anything else case-insensitively.
+    """
+    if value is None:
+        return (2, "")
+    if isinstance(value, bool):
+        value = str(value).lower()
+    if isinstance(value, (int, float)):
+        return (0, float(value))
+    text = str(value)
+    try:
+        return (0, float(text))
+    except ValueError:
+        pass
+    if _ISO_RE.match(text):
+        try:
+            moment = datetime.fromisoformat(text.replace("Z", "+00:00"))
+            return (0, moment.timestamp() * 1000)
+        except ValueError:
+            pass
+    return (1, text.lower())
+
+
+def matches_filter(properties, filter):
+    """Whether an object's ``properties`` pass one search filter."""
+    operator = filter.get("operator", "EQ")
+    actual = properties.get(filter.get("propertyName"))
+    if operator == "HAS_PROPERTY":
+        return actual not in (None, "")
+    if operator == "NOT_HAS_PROPERTY":
+        return actual in (None, "")
+    if operator in ("IN", "NOT_IN"):
+        values = {_sort_key(value) for value in filter.get("values") or ()}
+        found = actual is not None and _sort_key(actual) in values
+        return found if operator == "IN" else not found
+    if actual in (None, ""):
+        return operator == "NEQ"
+    if operator in ("CONTAINS_TOKEN", "NOT_CONTAINS_TOKEN"):
+        token = str(filter.get("value", "")).strip("*").lower()
+        found = token in str(actual).lower()
+        return found if operator == "CONTAINS_TOKEN" else not found
+    key = _sort_key(actual)
+    if operator == "BETWEEN":
+        return _sort_key(filter.get("value")) <= key <= _sort_key(filter.get("highValue"))
+    value = _sort_key(filter.get("value"))
+    if operator == "EQ":
+        return key == value
+    if operator == "NEQ":
+        return key != value
+    if operator == "LT":
+        return key < value
+    if operator == "LTE":
+        return key <= value
+    if operator == "GT":
+        return key > value
+    if operator == "GTE":
+        return key >= value
+    raise ValueError("unsupported operator {}".format(operator))
+
+
+def generate_dataset(contacts=1000, companies=len(COMMITTEES), seed=0):
+    """
+    Generate property dicts for ``contacts`` contacts and ``companies``
+    committee companies; the same arguments always give the same dataset.
+    About half of the contacts sit on one of the committees.
+
+    Return:
+        tuple: (list of contact properties, list of company properties)
+    """
+    rng = random.Random(seed)
+    names = [
+        COMMITTEES[i] if i < len(COMMITTEES) else "Committee {}".format(i)
+        for i in range(companies)
+    ]
+    company_properties = [
+        {
+            "name": name,
+            "domain": "{}.example.org".format(name.lower().replace(" ", "-")),
+            "approval_committees": "{} Executive Committee Member".format(name),
+        }
+        for name in names
+    ]
+    contact_properties = []
+    for i in range(contacts):
+        firstname = rng.choice(FIRST_NAMES)
+        lastname = rng.choice(LAST_NAMES)
+        properties = {
+            "email": "{}.{}{}@example.org".format(firstname, lastname, i).lower(),
+            "firstname": firstname,
+            "lastname": lastname,
+            "institution": rng.choice(INSTITUTIONS),
+        }
+        if names and rng.random() < 0.5:
+            properties["disease_group_executive_committee"] = rng.choice(names)
+        contact_properties.append(properties)
+    return contact_properties, company_properties
+
+
+def property_definition(name, type="string", field_type="text", options=None):
+    """A property definition in the shape of Hubspot's properties API."""
+    return {
+        "name": name,
+        "label": name.replace("_", " ").capitalize(),
+        "type": type,
+        "fieldType": field_type,
+        "options": [
+            {"label": value, "value": value, "displayOrder": i, "hidden": False}
+            for i, value in enumerate(options or ())
+        ],
+        "calculated": False,
+        "modificationMetadata": {"readOnlyValue": name.startswith("hs_")},
+    }
+
+
+def default_definitions():
+    """Definitions of the properties the generated datasets use, by object type."""
+    timestamps = {
+        "contacts": ("createdate", "lastmodifieddate"),
+        "companies": ("createdate", "hs_lastmodifieddate"),
+    }
+    definitions = {
+        "contacts": [
+            property_definition("email"),
+            property_definition("firstname"),
+            property_definition("lastname"),
+            property_definition("institution"),
+            property_definition(
+                "disease_group_executive_committee", "enumeration", "checkbox", COMMITTEES
+            ),
+        ],
+        "companies": [
+            property_definition("name"),
+            property_definition("domain"),
+            property_definition("approval_committees"),
+        ],
+    }
+    for object_type, names in timestamps.items():
+        definitions[object_type].extend(
+            property_definition(name, "datetime", "date") for name in names
+        )
+        definitions[object_type].append(property_definition("hs_object_id", "number", "number"))
+    return {
+        object_type: {definition["name"]: definition for definition in items}
+        for object_type, items in definitions.items()
+    }
+
+
+class _Error(Exception):
+    def __init__(self, status, message, category, context=None):
+        self.status = status
+        self.message = message
+        self.category = category
+        self.context = context
+
+
+class FakeHubspot(object):
+    """
+    In-memory Hubspot CRM objects API. Thread-safe; one instance can serve
+    any number of clients through :meth:`transport` and as an ASGI app.
+
+    Args:
+        latency (float): seconds added to every response
+        jitter (float): up to this many more seconds, picked at random
+        rate_limit_rate (float): fraction of requests answered with a 429
+        error_rate (float): fraction of requests answered with ``error_status``
+        error_status (int): status code of injected errors
+        retry_after (float): ``Retry-After`` of injected and enforced 429s
+        rate_limit (tuple): ``(max_requests, interval_seconds)`` to enforce like
+            Hubspot's rolling interval limit, reported in
+            ``X-HubSpot-RateLimit-*`` headers; not enforced by default
+        search_rate_limit (int): search requests allowed per second; not
+            enforced by default
+        seed: seed of the random faults and latency jitter
+    """
+
+    def __init__(
+        self,
+        latency=0.0,
+        jitter=0.0,
+        rate_limit_rate=0.0,
+        error_rate=0.0,
+        error_status=503,
+        retry_after=1.0,
+        rate_limit=None,
+        search_rate_limit=None,
+        seed=None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.rate_limit = rate_limit
+        self.search_rate_limit = search_rate_limit
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._objects = {object_type: {} for object_type in OBJECT_TYPES}
+        self._definitions = default_definitions()
+        # (from type, to type) -> from ID -> associated IDs
+        self._associations = {
+            (from_type, to_type): collections.defaultdict(set)
+            for from_type in OBJECT_TYPES
+            for to_type in OBJECT_TYPES
+            if from_type != to_type
+        }
+        self._emails = {}
+        self._next_id = 1001
+        self._last_time = 0.0
+        self._scripted = collections.deque()
+        self._sent = collections.deque()
+        self._searches = collections.deque()
+        self.calls = collections.Counter()
+
+    # -- data -----------------------------------------------------------------
+
+    def seed(self, contacts=0, companies=len(COMMITTEES), seed=0):
+        """
+        Add a dataset from :func:`generate_dataset`. Objects get consecutive IDs
+        and creation times one minute apart starting on 2020-01-01; committee
+        members are associated with their committee's company.
+
+        Return:
+            FakeHubspot: ``self``
+        """
+        contact_properties, company_properties = generate_dataset(contacts, companies, seed)
+        companies_by_name = {}
+        with self._lock:
+            moment = SEED_EPOCH
+            for object_type, records in (
+                ("companies", company_properties),
+                ("contacts", contact_properties),
+            ):
+                for properties in records:
+                    record = self.add(object_type, properties, created_at=moment)
+                    moment += 60
+                    if object_type == "companies":
+                        companies_by_name[properties["name"]] = record["id"]
+                    elif properties.get("disease_group_executive_committee") in companies_by_name:
+                        self.associate(
+                            "contacts",
+                            record["id"],
+                            "companies",
+                            companies_by_name[properties["disease_group_executive_committee"]],
+                        )
+        return self
+
+    def add(self, object_type, properties, created_at=None):
+        """
+        Store an object directly, bypassing conflict checks, and return it in
+        Hubspot's JSON shape.
+
+        Args:
+            object_type (str): ``contacts`` or ``companies``
+            properties (dict): its properties
+            created_at (float): creation time in epoch seconds, defaults to now
+        """
+        with self._lock:
+            record = self._insert(object_type, properties, created_at)
+            return self._render(object_type, record, None)
+
+    def get(self, object_type, object_id):
+        """Return a stored object with all its properties, or ``None``."""
+        with self._lock:
+            record = self._objects[object_type].get(str(object_id))
+            if record is None:
+                return None
+            return self._render(object_type, record, list(record["properties"]))
+
+    def associate(self, from_type, from_id, to_type, to_id):
+        """Associate two objects, in both directions."""
+        with self._lock:
+            self._associations[(from_type, to_type)][str(from_id)].add(str(to_id))
+            self._associations[(to_type, from_type)][str(to_id)].add(str(from_id))
+
+    def define_property(self, object_type, name, type="string", field_type="text", options=None):
+        """Add or replace a property definition, see :func:`property_definition`."""
+        with self._lock:
+            self._definitions[object_type][name] = property_definition(
+                name, type, field_type, options
+            )
+
+    def records(self, object_type):
+        """Return every stored object of a type, with all its properties."""
+        with self._lock:
+            return [
+                self._render(object_type, record, list(record["properties"]))
+                for record in self._objects[object_type].values()
+            ]
+
+    def count(self, object_type):
+        with self._lock:
+            return len(self._objects[object_type])
+
+    def clear(self):
+        """Remove all objects and forget the call counts and scripted responses."""
+        with self._lock:
+            for objects in self._objects.values():
+                objects.clear()
+            self._emails.clear()
+            self._scripted.clear()
+            self.calls.clear()
+
+    def fail_next(self, status, count=1, retry_after=None):
+        """
+        Answer the next ``count`` requests with ``status`` (and a
+        ``Retry-After`` header, if given) instead of handling them.
+        """
+        with self._lock:
+            for _ in range(count):
+                self._scripted.append((status, retry_after))
+
+    def _now(self):
+        # strictly increasing, so that every write moves lastmodifieddate
+        now = max(time.time(), self._last_time + 0.001)
+        self._last_time = now
+        return now
+
+    def _insert(self, object_type, properties, created_at=None):
+        if created_at is None:
+            created_at = self._now()
+        object_id = str(self._next_id)
+        self._next_id += 1
+        timestamp = format_timestamp(created_at)
+        record = {
+            "id": object_id,
+            "properties": {
+                key: value for key, value in properties.items() if value is not None
+            },
+            "createdAt": timestamp,
+            "updatedAt": timestamp,
+            "archived": False,
+        }
+        record["properties"].update(
+            {
+                "hs_object_id": object_id,
+                "createdate": timestamp,
+                MODIFIED_PROPERTY[object_type]: timestamp,
+            }
+        )
+        self._objects[object_type][object_id] = record
+        self._index(object_type, record)
+        return record
+
+    def _update(self, object_type, record, properties):
+        timestamp = format_timestamp(self._now())
+        self._unindex(object_type, record)
+        for key, value in properties.items():
+            if value in (None, ""):
+                record["properties"].pop(key, None)
+            else:
+                record["properties"][key] = value
+        record["properties"][MODIFIED_PROPERTY[object_type]] = timestamp
+        record["updatedAt"] = timestamp
+        self._index(object_type, record)
+        return record
+
+    def _archive(self, object_type, record):
+        self._unindex(object_type, record)
+        del self._objects[object_type][record["id"]]
+
+    def _index(self, object_type, record):
+        email = record["properties"].get("email")
+        if object_type == "contacts" and email:
+            self._emails[email.lower()] = record["id"]
+
+    def _unindex(self, object_type, record):
+        email = record["properties"].get("email")
+        if object_type == "contacts" and email:
+            self._emails.pop(email.lower(), None)
+
+    def _find(self, object_type, object_id, id_property=None):
+        if id_property in (None, "hs_object_id"):
+            return self._objects[object_type].get(str(object_id))
+        if object_type == "contacts" and id_property == "email":
+            found = self._emails.get(str(object_id).lower())
+            return self._objects[object_type].get(found) if found else None
+        key = _sort_key(object_id)
+        for record in self._objects[object_type].values():
+            if _sort_key(record["properties"].get(id_property)) == key:
+                return record
+        return None
+
+    def _conflict(self, object_type, properties, object_id=None):
+        """Raise a 409 if ``properties`` would duplicate a contact's email."""
+        email = properties.get("email")
+        if object_type != "contacts" or not email:
+            return
+        existing = self._emails.get(email.lower())
+        if existing is not None and existing != object_id:
+            raise _Error(
+                409,
+                "Contact already exists. Existing ID: {}".format(existing),
+                "CONFLICT",
+            )
+
+    def _render(self, object_type, record, properties):
+        """
+        ``record`` in Hubspot's JSON shape with the requested ``properties``
+        (the default ones if ``None``) plus those Hubspot always returns.
+        """
+        stored = record["properties"]
+        if properties is None:
+            names = set(DEFAULT_PROPERTIES[object_type])
+        else:
+            names = set(properties)
+            names.update(("createdate", "hs_object_id", MODIFIED_PROPERTY[object_type]))
+        return {
+            "id": record["id"],
+            "properties": {name: stored[name] for name in sorted(names) if name in stored},
+            "createdAt": record["createdAt"],
+            "updatedAt": record["updatedAt"],
+            "archived": record["archived"],
+        }
+
+    # -- requests -------------------------------------------------------------
+
+    def transport(self):
+        """Return an ``httpx`` transport, for sync or async clients, served by this fake."""
+        return FakeHubspotTransport(self)
+
+    def handle(self, method, path, query_string="", body=b""):
+        """
+        Answer one request.
+
+        Return:
+            tuple: (status code, headers dict, body bytes, seconds to wait
+            before responding)
+        """
+        method = method.upper()
+        query = parse_qs(query_string)
+        delay = self.latency
+        with self._lock:
+            if self.jitter:
+                delay += self._random.uniform(0, self.jitter)
+            try:
+                route, handler, args = self._route(method, path)
+                self.calls[method + " " + route] += 1
+                headers = self._limit(route)
+                data = json.loads(body) if body else {}
+                status, response = handler(query, data, *args)
+            except _Error as e:
+                headers = getattr(e, "headers", None)
+                status, response = e.status, self._error_json(e)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                headers = {}
+                status, response = 400, self._error_json(
+                    _Error(400, "Invalid input JSON: {}".format(e), "VALIDATION_ERROR")
+                )
+        headers = dict(headers or {})
+        if response is None:
+            return status, headers, b"", delay
+        headers["Content-Type"] = "application/json;charset=utf-8"
+        return status, headers, json.dumps(response).encode("utf-8"), delay
+
+    @staticmethod
+    def _error_json(error):
+        data = {
+            "status": "error",
+            "message": error.message,
+            "correlationId": str(uuid.uuid4()),
+            "category": error.category,
+        }
+        if error.context:
+            data["context"] = error.context
+        return data
+
+    def _limit(self, route):
+        """Apply scripted, injected and enforced failures; return rate-limit headers."""
+        if self._scripted:
+            status, retry_after = self._scripted.popleft()
+            headers = {}
+            if retry_after is not None:
+                headers["Retry-After"] = _format_seconds(retry_after)
+            raise _ScriptedError(status, headers)
+        headers = {}
+        now = time.monotonic()
+        if self.rate_limit:
+            limit, interval = self.rate_limit
+            while self._sent and self._sent[0] <= now - interval:
+                self._sent.popleft()
+            headers = {
+                "X-HubSpot-RateLimit-Max": str(limit),
+                "X-HubSpot-RateLimit-Interval-Milliseconds": str(int(interval * 1000)),
+            }
+            if len(self._sent) >= limit:
+                headers["X-HubSpot-RateLimit-Remaining"] = "0"
+                raise _RateLimited(headers, "TEN_SECONDLY_ROLLING", self.retry_after)
+            self._sent.append(now)
+            headers["X-HubSpot-RateLimit-Remaining"] = str(limit - len(self._sent))
+        if self.search_rate_limit and route.endswith("/search"):
+            while self._searches and self._searches[0] <= now - 1.0:
+                self._searches.popleft()
+            if len(self._searches) >= self.search_rate_limit:
+                raise _RateLimited(headers, "SECONDLY", self.retry_after)
+            self._searches.append(now)
+        if self.rate_limit_rate and self._random.random() < self.rate_limit_rate:
+            raise _RateLimited(headers, "SECONDLY", self.retry_after)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise _ScriptedError(self.error_status, headers)
+        return headers
+
+    def _route(self, method, path):
+        if path.startswith(PROPERTIES_PREFIX) and method == "GET":
+            object_type = path[len(PROPERTIES_PREFIX):].strip("/")
+            if object_type in OBJECT_TYPES:
+                return "properties/" + object_type, self._list_properties, (object_type,)
+        if path.startswith(ASSOCIATIONS_PREFIX) and method == "POST":
+            parts = path[len(ASSOCIATIONS_PREFIX):].strip("/").split("/")
+            if len(parts) == 4 and tuple(parts[:2]) in self._associations and parts[2:] == [
+                "batch",
+                "read",
+            ]:
+                route = "associations/{}/{}/batch/read".format(*parts[:2])
+                return route, self._batch_read_associations, tuple(parts[:2])
+        if not path.startswith(API_PREFIX):
+            raise _Error(404, "Unknown path {}".format(path), "OBJECT_NOT_FOUND")
+        parts = path[len(API_PREFIX):].strip("/").split("/")
+        object_type = parts[0]
+        if object_type not in OBJECT_TYPES:
+            raise _Error(404, "Unknown object type {}".format(object_type), "OBJECT_NOT_FOUND")
+        rest = parts[1:]
+        if not rest:
+            if method == "GET":
+                return object_type, self._list, (object_type,)
+            if method == "POST":
+                return object_type, self._create, (object_type,)
+        elif rest == ["search"] and method == "POST":
+            return object_type + "/search", self._search, (object_type,)
+        elif len(rest) == 2 and rest[0] == "batch" and method == "POST":
+            handler = getattr(self, "_batch_" + rest[1], None)
+            if handler is not None:
+                return object_type + "/batch/" + rest[1], handler, (object_type,)
+        elif len(rest) == 1:
+            handler = {"GET": self._read, "PATCH": self._patch, "DELETE": self._delete}.get(method)
+            if handler is not None:
+                return object_type + "/{id}", handler, (object_type, rest[0])
+        raise _Error(404, "No route for {} {}".format(method, path), "OBJECT_NOT_FOUND")
+
+    @staticmethod
+    def _properties(query):
+        names = []
+        for value in query.get("properties", ()):
+            names.extend(name for name in value.split(",") if name)
+        return names or None
+
+    def _not_found(self, object_type, object_id):
+        return _Error(
+            404,
+            "Object {} of type {} not found".format(object_id, object_type),
+            "OBJECT_NOT_FOUND",
+        )
+
+    def _list_properties(self, query, data, object_type):
+        return 200, {"results": list(self._definitions[object_type].values())}
+
+    def _batch_read_associations(self, query, data, from_type, to_type):
+        started = format_timestamp(time.time())
+        associations = self._associations[(from_type, to_type)]
+        association_type = "{}_to_{}".format(SINGULAR[from_type], SINGULAR[to_type])
+        results, errors = [], []
+        for item in self._inputs(data):
+            from_id = str(item["id"])
+            to_ids = sorted(associations.get(from_id) or (), key=int)
+            if to_ids:
+                results.append({
+                    "from": {"id": from_id},
+                    "to": [{"id": to_id, "type": association_type} for to_id in to_ids],
+                })
+            else:
+                errors.append({
+                    "status": "error",
+                    "category": "OBJECT_NOT_FOUND",
+                    "subCategory": "crm.associations.NO_ASSOCIATIONS_FOUND",
+                    "message": "No {} is associated with {} {}.".format(
+                        SINGULAR[to_type], SINGULAR[from_type], from_id
+                    ),
+                    "context": {"fromObjectId": [from_id]},
+                })
+        response = {
+            "status": "COMPLETE",
+            "results": results,
+            "startedAt": started,
+            "completedAt": format_timestamp(time.time()),
+        }
+        if not errors:
+            return 200, response
+        response["numErrors"] = len(errors)
+        response["errors"] = errors
+        return 207, response
+
+    # single objects
+
+    def _create(self, query, data, object_type):
+        properties = data.get("properties") or {}
+        self._conflict(object_type, properties)
+        record = self._insert(object_type, properties)
+        return 201, self._render(object_type, record, list(properties))
+
+    def _read(self, query, data, object_type, object_id):
+        id_property = (query.get("idProperty") or [None])[0]
+        record = self._find(object_type, object_id, id_property)
+        if record is None:
+            raise self._not_found(object_type, object_id)
+        return 200, self._render(object_type, record, self._properties(query))
+
+    def _patch(self, query, data, object_type, object_id):
+        id_property = (query.get("idProperty") or [None])[0]
+        record = self._find(object_type, object_id, id_property)
+        if record is None:
+            raise self._not_found(object_type, object_id)
+        properties = data.get("properties") or {}
+        self._conflict(object_type, properties, record["id"])
+        self._update(object_type, record, properties)
+        return 200, self._render(object_type, record, list(properties))
+
+    def _delete(self, query, data, object_type, object_id):
+        record = self._find(object_type, object_id)
+        if record is not None:
+            self._archive(object_type, record)
+        return 204, None
+
+    def _list(self, query, data, object_type):
+        limit = int((query.get("limit") or [SEARCH_DEFAULT_LIMIT])[0])
+        after = int((query.get("after") or [0])[0])
+        objects = self._objects[object_type]
+        ids = sorted(int(object_id) for object_id in objects if int(object_id) > after)
+        page = ids[:limit]
+        properties = self._properties(query)
+        response = {
+            "results": [
+                self._render(object_type, objects[str(object_id)], properties)
+                for object_id in page
+            ]
+        }
+        if len(ids) > limit:
+            response["paging"] = {"next": {"after": str(page[-1])}}
+        return 200, response
+
+    # search
+
+    def _search(self, query, data, object_type):
+        limit = int(data.get("limit") or SEARCH_DEFAULT_LIMIT)
+        after = int(data.get("after") or 0)
+        if limit > SEARCH_LIMIT:
+            raise _Error(
+                400, "limit must be no more than {}".format(SEARCH_LIMIT), "VALIDATION_ERROR"
+            )
+        if after + limit > SEARCH_RESULT_LIMIT:
+            raise _Error(
+                400,
+                "Search can't page past {} results".format(SEARCH_RESULT_LIMIT),
+                "VALIDATION_ERROR",
+            )
+        groups = [group.get("filters") or [] for group in data.get("filterGroups") or []]
+        text = (data.get("query") or "").lower()
+        found = []
+        for record in self._candidates(object_type, groups):
+            properties = record["properties"]
+            if groups and not any(
+                all(matches_filter(properties, f) for f in filters) for filters in groups
+            ):
+                continue
+            if text and not any(text in str(value).lower() for value in properties.values()):
+                continue
+            found.append(record)
+
+        sorts = data.get("sorts") or [{"propertyName": "hs_object_id", "direction": "ASCENDING"}]
+        found.sort(key=lambda record: int(record["id"]))
+        for sort in reversed(sorts):
+            if isinstance(sort, str):
+                # Hubspot also takes "name" and "-name"
+                sort = {
+                    "propertyName": sort.lstrip("-"),
+                    "direction": "DESCENDING" if sort.startswith("-") else "ASCENDING",
+                }
+            name = sort.get("propertyName")
+            found.sort(
+                key=lambda record: _sort_key(record["properties"].get(name)),
+                reverse=sort.get("direction") == "DESCENDING",
+            )
+
+        page = found[after:after + limit]
+        response = {
+            "total": len(found),
+            "results": [
+                self._render(object_type, record, data.get("properties")) for record in page
+            ],
+        }
+        if after + limit < len(found):
+            response["paging"] = {"next": {"after": str(after + limit)}}
+        return 200, response
+
+    def _candidates(self, object_type, groups):
+        """
+        Objects that may match: looked up by ID or email when every filter
+        group pins one of them with EQ, otherwise all of them.
+        """
+        objects = self._objects[object_type]
+        if not groups:
+            return list(objects.values())
+        candidates = []
+        for filters in groups:
+            for f in filters:
+                if f.get("operator", "EQ") != "EQ":
+                    continue
+                if f.get("propertyName") == "hs_object_id":
+                    record = objects.get(str(f.get("value")))
+                    break
+                if f.get("propertyName") == "email" and object_type == "contacts":
+                    record = self._find(object_type, f.get("value"), "email")
+                    break
+            else:
+                return list(objects.values())
+            if record is not None and record not in candidates:
+                candidates.append(record)
+        return candidates
+
+    # batches
+
+    @staticmethod
+    def _inputs(data):
+        inputs = data.get("inputs") or []
+        if len(inputs) > BATCH_LIMIT:
+            raise _Error(
+                400,
+                "Batch requests are limited to {} inputs".format(BATCH_LIMIT),
+                "VALIDATION_ERROR",
+            )
+        return inputs
+
+    @staticmethod
+    def _batch_response(status, results, missing, object_type, started):
+        response = {
+            "status": "COMPLETE",
+            "results": results,
+            "startedAt": started,
+            "completedAt": format_timestamp(time.time()),
+        }
+        if not missing:
+            return status, response
+        response["numErrors"] = 1
+        response["errors"] = [
+            {
+                "status": "error",
+                "category": "OBJECT_NOT_FOUND",
+                "message": "Could not get some {} objects, they may be deleted or not exist.".format(
+                    object_type[:-1].upper()
+                ),
+                "context": {"ids": missing},
+            }
+        ]
+        return 207, response
+
+    def _batch_read(self, query, data, object_type):
+        started = format_timestamp(time.time())
+        id_property = data.get("idProperty")
+        results, missing = [], []
+        for item in self._inputs(data):
+            record = self._find(object_type, item["id"], id_property)
+            if record is None:
+                missing.append(item["id"])
+            else:
+                results.append(self._render(object_type, record, data.get("properties")))
+        return self._batch_response(200, results, missing, object_type, started)
+
+    def _batch_create(self, query, data, object_type):
+        started = format_timestamp(time.time())
+        inputs = self._inputs(data)
+        seen = set()
+        for item in inputs:
+            properties = item.get("properties") or {}
+            # the whole batch is rejected if one of its records conflicts
+            self._conflict(object_type, properties)
+            email = (properties.get("email") or "").lower()
+            if object_type == "contacts" and email:
+                if email in seen:
+                    raise _Error(409, "Duplicate email {} in batch".format(email), "CONFLICT")
+                seen.add(email)
+        results = [
+            self._render(
+                object_type,
+                self._insert(object_type, item.get("properties") or {}),
+                list(item.get("properties") or {}),
+            )
+            for item in inputs
+        ]
+        return self._batch_response(201, results, [], object_type, started)
+
+    def _batch_update(self, query, data, object_type):
+        started = format_timestamp(time.time())
+        id_property = data.get("idProperty")
+        results, missing = [], []
+        for item in self._inputs(data):
+            record = self._find(object_type, item["id"], id_property)
+            if record is None:
+                missing.append(str(item["id"]))
+                continue
+            properties = item.get("properties") or {}
+            self._conflict(object_type, properties, record["id"])
+            self._update(object_type, record, properties)
+            results.append(self._render(object_type, record, list(properties)))
+        return self._batch_response(200, results, missing, object_type, started)
+
+    def _batch_upsert(self, query, data, object_type):
+        started = format_timestamp(time.time())
+        results = []
+        for item in self._inputs(data):
+            properties = dict(item.get("properties") or {})
+            id_property = item.get("idProperty") or data.get("idProperty")
+            record = self._find(object_type, item["id"], id_property)
+            if record is None:
+                if id_property not in (None, "hs_object_id"):
+                    properties.setdefault(id_property, item["id"])
+                self._conflict(object_type, properties)
+                record, new = self._insert(object_type, properties), True
+            else:
+                self._conflict(object_type, properties, record["id"])
+                self._update(object_type, record, properties)
+                new = False
+            result = self._render(object_type, record, list(properties))
+            result["new"] = new
+            results.append(result)
+        return self._batch_response(200, results, [], object_type, started)
+
+    def _batch_archive(self, query, data, object_type):
+        for item in self._inputs(data):
+            record = self._find(object_type, item["id"])
+            if record is not None:
+                self._archive(object_type, record)
+        return 204, None
+
+    # -- ASGI -----------------------------------------------------------------
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+        status, headers, content, delay = self.handle(
+            scope["method"], scope["path"], scope.get("query_string", b"").decode("latin-1"), body
+        )
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in headers.items()
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": content})
+
+
+def _format_seconds(seconds):
+    return str(int(seconds)) if float(seconds).is_integer() else str(seconds)
+
+
+class _ScriptedError(_Error):
+    def __init__(self, status, headers):
+        super(_ScriptedError, self).__init__(
+            status, "Injected failure", "RATE_LIMITS" if status == 429 else "INTERNAL_ERROR"
+        )
+        self.headers = headers
+
+
+class _RateLimited(_ScriptedError):
+    def __init__(self, headers, policy, retry_after):
+        headers = dict(headers)
+        headers["Retry-After"] = _format_seconds(retry_after)
+        super(_RateLimited, self).__init__(429, headers)
+        self.message = "You have reached your {} limit.".format(policy.lower().replace("_", " "))
+        self.policy = policy
+
+
+class FakeHubspotTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """``httpx`` transport answering requests from a :class:`FakeHubspot`."""
+
+    def __init__(self, fake):
+        self.fake = fake
+
+    def _respond(self, request):
+        status, headers, content, delay = self.fake.handle(
+            request.method,
+            request.url.path,
+            request.url.query.decode("ascii"),
+            request.content,
+        )
+        return httpx.Response(status, headers=headers, content=content), delay
+
+    def handle_request(self, request):
+        request.read()
+        response, delay = self._respond(request)
+        if delay > 0:
+            time.sleep(delay)
+        return response
+
+    async def handle_async_request(self, request):
+        await request.aread()
+        response, delay = self._respond(request)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Hubspot CRM API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--contacts", type=int, default=1000)
+    parser.add_argument("--companies", type=int, default=len(COMMITTEES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("serving the fake Hubspot API requires uvicorn")
+    fake = FakeHubspot(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    ).seed(args.contacts, args.companies, args.seed)
+    uvicorn.run(fake, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Bounded fan-out of independent calls for the synchronous client.
+
+:meth:`~.client.HubspotClient.map` and :meth:`~.client.HubspotClient.submit`
+run client calls on a thread pool owned by the client, so the calls share
+its connection pool, rate limiter, cache and circuit breakers::
+
+    results = hubspot.map(hubspot.get_contact_by_email, emails, max_workers=8)
+    for result in results:
+        if result.ok:
+            ...  # result.value
+        else:
+            ...  # result.error
+
+Results come back in input order, one :class:`CallResult` per input, and a
+call that raises doesn't stop the others. Calls see the ``client.context()``
+settings in effect where they were submitted.
+"""
+
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+DEFAULT_MAX_WORKERS = 16
+
+
+class CallResult(object):
+    """
+    Outcome of one call of a fan-out.
+
+    Attributes:
+        args (tuple): positional arguments of the call
+        value: what the call returned, if it succeeded
+        error (Exception): what it raised otherwise
+        index (int): position of the call's input
+    """
+
+    __slots__ = ("args", "value", "error", "index")
+
+    def __init__(self, args, value=None, error=None, index=None):
+        self.args = args
+        self.value = value
+        self.error = error
+        self.index = index
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def get(self):
+        """Return the value, or raise the error, of the call."""
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def __repr__(self):
+        if self.error is not None:
+            return "CallResult({!r}, error={!r})".format(self.args, self.error)
+        return "CallResult({!r}, ok)".format(self.args)
+
+
+def call_args(item):
+    """Positional arguments of one fan-out input: a tuple, or a single value."""
+    return item if isinstance(item, tuple) else (item,)
+
+
+class FanOut(object):
+    """
+    Thread pool of one client, created on first use and re-created in forked
+    child processes. Calls made from one of its own threads run inline, so a
+    fanned-out call can fan out again without waiting for a free thread.
+
+    Args:
+        max_workers (int): threads in the pool, the most calls running at
+            once across all fan-outs of the client
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._local = threading.local()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="hubspot-fanout"
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    @property
+    def in_worker(self):
+        """Whether the current thread is one of the pool's."""
+        return getattr(self._local, "worker", False)
+
+    def _run(self, fn, args, kwargs):
+        self._local.worker = True
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._local.worker = False
+
+    def submit(self, fn, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` on the pool; return its ``Future``."""
+        return self._get_executor().submit(self._run, fn, args, kwargs)
+
+    def map(self, fn, items, max_workers=None):
+        """
+        Call ``fn`` with the arguments of every item (see :func:`call_args`),
+        with at most ``max_workers`` calls in flight, and return a
+        :class:`CallResult` per item, in order.
+        """
+        calls = [call_args(item) for item in items]
+        results = [None] * len(calls)
+        limit = max(1, min(max_workers or self.max_workers, self.max_workers))
+        if self.in_worker or limit == 1 or len(calls) <= 1:
+            for index, args in enumerate(calls):
+                results[index] = self._call(fn, args, index)
+            return results
+
+        pending = {}
+        for index, args in enumerate(calls):
+            if len(pending) >= limit:
+                self._collect(pending, results)
+            pending[self.submit(self._call, fn, args, index)] = index
+        while pending:
+            self._collect(pending, results)
+        return results
+
+    @staticmethod
+    def _call(fn, args, index):
+        try:
+            return CallResult(args, value=fn(*args), index=index)
+        except Exception as e:
+            return CallResult(args, error=e, index=index)
+
+    @staticmethod
+    def _collect(pending, results):
+        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+        for future in done:
+            results[pending.pop(future)] = future.result()
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and self._pid == os.getpid():
+            executor.shutdown(wait=wait)
@@ -0,0 +1,126 @@
+"""
+Hedged requests for idempotent reads.
+
+With hedging enabled, a read (GET, search or batch read) that hasn't been
+answered within its endpoint's hedge delay is sent a second time; the first
+response to arrive is used and the other request is cancelled (async
+client) or its response dropped (sync client, where each hedged read runs on
+a background thread). The delay adapts to the ``quantile`` of the latencies
+recently observed on the endpoint, e.g. the p95, within ``min_delay`` and
+``max_delay``. Hedges are capped at ``max_fraction`` of the reads, so that they
+can't eat much of the rate-limit budget.
+"""
+
+import threading
+from collections import deque
+
+
+DEFAULT_QUANTILE = 0.95
+DEFAULT_MAX_FRACTION = 0.05
+
+
+class _Latencies(object):
+    __slots__ = ("samples", "threshold", "pending")
+
+    def __init__(self, size):
+        self.samples = deque(maxlen=size)
+        self.threshold = None
+        self.pending = 0
+
+
+class Hedger(object):
+    """
+    Decides when to hedge the reads of one client; thread-safe.
+
+    Args:
+        quantile (float): latency quantile used as the hedge delay
+        max_fraction (float): at most this share of reads is hedged
+        min_delay (float): shortest hedge delay, in seconds
+        max_delay (float): longest hedge delay, in seconds
+        min_samples (int): latencies observed on an endpoint before hedging it
+        window (int): number of recent latencies kept per endpoint
+        max_burst (int): hedges that may be sent in a row after a quiet period
+    """
+
+    # recompute an endpoint's delay after this many new samples
+    REFRESH = 16
+
+    def __init__(
+        self,
+        quantile=DEFAULT_QUANTILE,
+        max_fraction=DEFAULT_MAX_FRACTION,
+        min_delay=0.02,
+        max_delay=2.0,
+        min_samples=20,
+        window=200,
+        max_burst=5,
+    ):
+        self.quantile = quantile
+        self.max_fraction = max_fraction
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.max_burst = max_burst
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._tokens = 0.0
+        self._reads = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+
+    def delay(self, endpoint):
+        """
+        Return how long to wait for a read of ``endpoint`` before hedging it,
+        or ``None`` while too few of its latencies have been observed.
+        """
+        with self._lock:
+            self._reads += 1
+            self._tokens = min(float(self.max_burst), self._tokens + self.max_fraction)
+            latencies = self._endpoints.get(endpoint)
+            if latencies is None:
+                return None
+            return latencies.threshold
+
+    def try_hedge(self):
+        """Take a hedge from the budget; return whether one was left."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self._hedges += 1
+            return True
+
+    def record(self, endpoint, seconds, hedge_won=False):
+        """Record the time a read of ``endpoint`` took to be answered."""
+        with self._lock:
+            latencies = self._endpoints.get(endpoint)
+            if latencies is None:
+                latencies = self._endpoints[endpoint] = _Latencies(self.window)
+            latencies.samples.append(seconds)
+            latencies.pending += 1
+            if hedge_won:
+                self._hedge_wins += 1
+            if len(latencies.samples) >= self.min_samples and (
+                latencies.threshold is None or latencies.pending >= self.REFRESH
+            ):
+                ordered = sorted(latencies.samples)
+                value = ordered[min(len(ordered) - 1, int(self.quantile * len(ordered)))]
+                latencies.threshold = min(self.max_delay, max(self.min_delay, value))
+                latencies.pending = 0
+
+    def stats(self):
+        """
+        Return e.g. {'reads': 1000, 'hedges': 31, 'hedge_wins': 24,
+        'delays': {'contacts/search': 0.18}}
+        """
+        with self._lock:
+            return {
+                "reads": self._reads,
+                "hedges": self._hedges,
+                "hedge_wins": self._hedge_wins,
+                "delays": {
+                    endpoint: latencies.threshold
+                    for endpoint, latencies in sorted(self._endpoints.items())
+                },
+            }
@@ -0,0 +1,170 @@
+"""
+DataLoader-style micro-batching of single contact lookups.
+
+With a :class:`ContactLoader` enabled, concurrent calls of
+``get_contact_by_email`` (from threads of the sync client or tasks of the
+async one) made within ``window`` seconds of each other are merged into one
+batch read. A batch is sent in the background once its window closes, or
+right away by the caller that fills it, and every caller gets back its own
+contact in the usual search response shape. If the caller sending a batch is
+cancelled, the other callers of the batch look their emails up again.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+
+from ...utils import (
+    cancel_background,
+    maybe_sync,
+    sleep,
+    start_background,
+    wait_future,
+)
+
+
+DEFAULT_WINDOW = 0.005
+DEFAULT_MAX_BATCH_SIZE = 100
+
+
+class _DispatchCancelled(Exception):
+    """The caller sending a batch was cancelled."""
+
+
+class _Batch(object):
+    __slots__ = ("futures", "created", "taken", "timer")
+
+    def __init__(self):
+        self.futures = {}
+        self.created = time.monotonic()
+        self.taken = False
+        self.timer = None
+
+
+class ContactLoader(object):
+    """
+    Args:
+        client (BaseHubspotClient): client sending the batch reads
+        window (float): seconds to wait for more lookups before sending a batch
+        max_batch_size (int): send a batch as soon as it has this many emails
+    """
+
+    def __init__(self, client, window=DEFAULT_WINDOW, max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+        self._client = client
+        self.synchronous = client.synchronous
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._lock = threading.Lock()
+        self._batch = None
+        self._counters = {
+            "lookups": 0,
+            "keys": 0,
+            "batches": 0,
+            "flushed_full": 0,
+            "flushed_window": 0,
+            "max_batch_size": 0,
+            "total_wait": 0.0,
+            "total_request_time": 0.0,
+        }
+
+    @maybe_sync
+    async def load(self, email):
+        """Return the search-shaped response for one email."""
+        key = email.lower()
+        with self._lock:
+            self._counters["lookups"] += 1
+        while True:
+            with self._lock:
+                batch = self._batch
+                opener = batch is None
+                if opener:
+                    batch = self._batch = _Batch()
+                future = batch.futures.get(key)
+                if future is None:
+                    future = batch.futures[key] = Future()
+                full = len(batch.futures) >= self._max_batch_size
+                if full:
+                    self._take(batch)
+
+            if full:
+                if batch.timer is not None:
+                    cancel_background(batch.timer)
+                await self._dispatch(batch, "flushed_full")
+            elif opener:
+                batch.timer = start_background(self._dispatch_after_window, batch)
+            try:
+                return await wait_future(future)
+            except _DispatchCancelled:
+                # the caller that sent it was cancelled, not this one: load again
+                continue
+
+    @maybe_sync
+    async def _dispatch_after_window(self, batch):
+        await sleep(self._window)
+        if self._claim(batch):
+            try:
+                await self._dispatch(batch, "flushed_window")
+            except Exception:
+                # already handed to every caller through its future
+                pass
+
+    def _take(self, batch):
+        batch.taken = True
+        if self._batch is batch:
+            self._batch = None
+
+    def _claim(self, batch):
+        with self._lock:
+            if batch.taken:
+                return False
+            self._take(batch)
+            return True
+
+    @maybe_sync
+    async def _dispatch(self, batch, reason):
+        started = time.monotonic()
+        try:
+            contacts = await self._client._get_contacts_by_emails(list(batch.futures))
+        except asyncio.CancelledError:
+            for future in batch.futures.values():
+                future.set_exception(_DispatchCancelled())
+            raise
+        except BaseException as e:
+            for future in batch.futures.values():
+                future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                counters = self._counters
+                counters["batches"] += 1
+                counters["keys"] += len(batch.futures)
+                counters[reason] += 1
+                counters["max_batch_size"] = max(
+                    counters["max_batch_size"], len(batch.futures)
+                )
+                counters["total_wait"] += started - batch.created
+                counters["total_request_time"] += time.monotonic() - started
+
+        for key, future in batch.futures.items():
+            contact = contacts.get(key)
+            future.set_result(
+                {"total": 1, "results": [contact]} if contact else {"total": 0, "results": []}
+            )
+
+    def stats(self):
+        """
+        Return batching stats, e.g.
+        {'lookups': 120, 'keys': 118, 'batches': 3, 'flushed_full': 1,
+         'flushed_window': 2, 'max_batch_size': 100, 'mean_batch_size': 39.3,
+         'mean_wait': 0.005, 'mean_request_time': 0.12}
+        ``keys`` counts distinct emails per batch, ``mean_wait`` is the time from
+        a batch's first lookup until it is sent.
+        """
+        with self._lock:
+            stats = dict(self._counters)
+        batches = stats["batches"] or 1
+        stats["mean_batch_size"] = stats["keys"] / batches
+        stats["mean_wait"] = stats.pop("total_wait") / batches
+        stats["mean_request_time"] = stats.pop("total_request_time") / batches
+        return stats
@@ -0,0 +1,275 @@
+"""
+Request metrics for the Hubspot clients, in Prometheus text format.
+
+A :class:`MetricsCollector` is an :class:`~.events.EventListener` that
+aggregates, per endpoint and method, a latency histogram of every attempt,
+response counts by status, errors, retries and give-ups, bytes sent and
+received, plus cache hits per client method and the last rate-limit headroom
+reported by Hubspot::
+
+    metrics = MetricsCollector()
+    hubspot = HubspotClient(hubspot_auth_token="...", listeners=[metrics])
+    ...
+    print(metrics.to_prometheus())
+
+One collector can be shared by several clients.
+"""
+
+import threading
+from collections import defaultdict
+
+from .events import EventListener
+
+
+# upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram(object):
+    """Cumulative histogram with fixed bucket bounds, as Prometheus has them."""
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self):
+        """Return ``(bound, count of values <= bound)`` pairs, ending with +Inf."""
+        total = 0
+        pairs = []
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            pairs.append((bound, total))
+        pairs.append((float("inf"), self.count))
+        return pairs
+
+    def quantile(self, q):
+        """Estimate a quantile as the upper bound of the bucket holding it."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels):
+    return "{" + ",".join(
+        '{}="{}"'.format(name, _escape(value)) for name, value in sorted(labels.items())
+    ) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+class MetricsCollector(EventListener):
+    """
+    Aggregates request events; see the module documentation.
+
+    Args:
+        buckets (tuple): upper bounds of the latency histogram buckets
+        namespace (str): prefix of the Prometheus metric names
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, namespace="hubspot"):
+        self._buckets = tuple(sorted(buckets))
+        self._namespace = namespace
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._latency = {}
+            self._responses = defaultdict(int)
+            self._errors = defaultdict(int)
+            self._retries = defaultdict(int)
+            self._give_ups = defaultdict(int)
+            self._sent_bytes = defaultdict(int)
+            self._received_bytes = defaultdict(int)
+            self._cache_hits = defaultdict(int)
+            self._rate_limit_remaining = None
+
+    # -- listener callbacks ---------------------------------------------------
+
+    def on_response(self, event):
+        key = (event.endpoint, event.method)
+        with self._lock:
+            histogram = self._latency.get(key)
+            if histogram is None:
+                histogram = self._latency[key] = Histogram(self._buckets)
+            histogram.observe(event.elapsed)
+            self._responses[key + (event.status,)] += 1
+            if event.status >= 400:
+                self._errors[key + (str(event.status),)] += 1
+            self._sent_bytes[key] += event.request_bytes
+            self._received_bytes[key] += event.response_bytes
+            if event.rate_limit_remaining is not None:
+                self._rate_limit_remaining = event.rate_limit_remaining
+
+    def on_retry(self, event):
+        with self._lock:
+            self._retries[(event.endpoint, event.method)] += 1
+
+    def on_give_up(self, event):
+        key = (event.endpoint, event.method)
+        with self._lock:
+            self._give_ups[key] += 1
+            if event.error is not None:
+                self._errors[key + (type(event.error).__name__,)] += 1
+
+    def on_cache_hit(self, method, args):
+        with self._lock:
+            self._cache_hits[method] += 1
+
+    # -- export ---------------------------------------------------------------
+
+    def snapshot(self):
+        """
+        Return the aggregates as a dict, e.g.
+        {'requests': {'POST contacts/search': {'count': 12, 'p50': 0.05,
+         'p95': 0.1, 'p99': 0.25, 'statuses': {200: 11, 429: 1},
+         'retries': 1, 'give_ups': 0, 'sent_bytes': 2400,
+         'received_bytes': 18000}}, 'errors': {'POST contacts/search 429': 1},
+         'cache_hits': {'get_contact_by_email': 3}, 'rate_limit_remaining': 87}
+        Latency quantiles are the upper bounds of their histogram buckets.
+        """
+        with self._lock:
+            requests = {}
+            keys = set(self._latency) | set(self._retries) | set(self._give_ups)
+            for endpoint, method in sorted(keys):
+                key = (endpoint, method)
+                histogram = self._latency.get(key) or Histogram(self._buckets)
+                requests["{} {}".format(method, endpoint)] = {
+                    "count": histogram.count,
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95),
+                    "p99": histogram.quantile(0.99),
+                    "statuses": {
+                        status: count
+                        for (e, m, status), count in self._responses.items()
+                        if (e, m) == key
+                    },
+                    "retries": self._retries.get(key, 0),
+                    "give_ups": self._give_ups.get(key, 0),
+                    "sent_bytes": self._sent_bytes.get(key, 0),
+                    "received_bytes": self._received_bytes.get(key, 0),
+                }
+            return {
+                "requests": requests,
+                "errors": {
+                    "{} {} {}".format(method, endpoint, error): count
+                    for (endpoint, method, error), count in sorted(self._errors.items())
+                },
+                "cache_hits": dict(self._cache_hits),
+                "rate_limit_remaining": self._rate_limit_remaining,
+            }
+
+    def to_prometheus(self):
+        """Return the metrics in the Prometheus text exposition format."""
+        name = self._namespace + "_"
+        lines = []
+
+        def _family(metric, kind, help_text):
+            lines.append("# HELP {}{} {}".format(name, metric, help_text))
+            lines.append("# TYPE {}{} {}".format(name, metric, kind))
+
+        def _counter(metric, help_text, values, label_names):
+            _family(metric, "counter", help_text)
+            for key, value in sorted(values.items(), key=lambda item: str(item[0])):
+                key = key if isinstance(key, tuple) else (key,)
+                labels = _labels(**dict(zip(label_names, key)))
+                lines.append("{}{}{} {}".format(name, metric, labels, _number(value)))
+
+        with self._lock:
+            _family(
+                "request_duration_seconds",
+                "histogram",
+                "Duration of Hubspot request attempts.",
+            )
+            for (endpoint, method), histogram in sorted(self._latency.items()):
+                for bound, count in histogram.cumulative():
+                    lines.append(
+                        "{}request_duration_seconds_bucket{} {}".format(
+                            name,
+                            _labels(endpoint=endpoint, method=method, le=_number(bound)),
+                            count,
+                        )
+                    )
+                labels = _labels(endpoint=endpoint, method=method)
+                lines.append(
+                    "{}request_duration_seconds_sum{} {!r}".format(name, labels, histogram.sum)
+                )
+                lines.append(
+                    "{}request_duration_seconds_count{} {}".format(
+                        name, labels, histogram.count
+                    )
+                )
+            endpoint_method = ("endpoint", "method")
+            _counter(
+                "responses_total",
+                "Hubspot responses by status code.",
+                self._responses,
+                endpoint_method + ("status",),
+            )
+            _counter(
+                "errors_total",
+                "Failed Hubspot requests by status code or exception.",
+                self._errors,
+                endpoint_method + ("error",),
+            )
+            _counter(
+                "retries_total", "Hubspot requests sent again.", self._retries, endpoint_method
+            )
+            _counter(
+                "give_ups_total",
+                "Hubspot requests that failed for good.",
+                self._give_ups,
+                endpoint_method,
+            )
+            _counter(
+                "request_bytes_total",
+                "Bytes sent to Hubspot in request bodies.",
+                self._sent_bytes,
+                endpoint_method,
+            )
+            _counter(
+                "response_bytes_total",
+                "Bytes received from Hubspot in response bodies.",
+                self._received_bytes,
+                endpoint_method,
+            )
+            _counter(
+                "cache_hits_total",
+                "Reads answered by the response cache.",
+                self._cache_hits,
+                ("method",),
+            )
+            if self._rate_limit_remaining is not None:
+                _family(
+                    "rate_limit_remaining",
+                    "gauge",
+                    "Requests left in Hubspot's current rate-limit interval.",
+                )
+                lines.append("{}rate_limit_remaining {}".format(name, self._rate_limit_remaining))
+        return "\n".join(lines) + "\n"
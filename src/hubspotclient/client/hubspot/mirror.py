@@ -0,0 +1,388 @@
+"""
+Local mirror of the Hubspot contacts and companies, in SQLite.
+
+A :class:`Mirror` keeps a copy of every contact and company, with the
+properties the client's read methods return, indexed by email, committee
+membership (``disease_group_executive_committee``) and company name. It is
+filled by :meth:`~.base.BaseHubspotClient.refresh_mirror`: the first refresh
+loads everything, later ones only fetch the changes since the last one (see
+:mod:`~.changes`). Each page of changes is written in one transaction
+together with its sync watermark, so an interrupted refresh resumes where it
+stopped.
+
+A client created with ``mirror=`` answers ``get_contact_by_email``,
+``get_contacts_by_committee`` and ``get_commitees_info`` from the mirror as
+long as it was refreshed within ``max_staleness`` seconds, and asks Hubspot
+when the mirror is stale or has no match. With ``offline=True`` the mirror
+answers every read, however old, and Hubspot is never asked::
+
+    mirror = Mirror("hubspot.sqlite", max_staleness=600)
+    hubspot = HubspotClient(hubspot_auth_token="...", mirror=mirror)
+    hubspot.refresh_mirror()  # e.g. from a periodic job
+    hubspot.get_contacts_by_committee("INRG")  # served locally
+
+Objects deleted in Hubspot don't show up as changes; a refresh with
+``full=True`` reloads everything and drops them.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from .changes import Checkpoint, MODIFIED_PROPERTY, modified_ms
+
+
+# properties mirrored by default: those returned by the client's read methods
+DEFAULT_PROPERTIES = {
+    "contacts": (
+        "email",
+        "firstname",
+        "lastname",
+        "institution",
+        "disease_group_executive_committee",
+    ),
+    "companies": ("name", "approval_committees"),
+}
+# properties Hubspot returns with every search result
+ALWAYS_RETURNED = {
+    "contacts": ("createdate", "hs_object_id", "lastmodifieddate"),
+    "companies": ("createdate", "hs_lastmodifieddate", "hs_object_id"),
+}
+DEFAULT_MAX_STALENESS = 300
+# results of a search without a limit, as Hubspot returns them
+SEARCH_DEFAULT_LIMIT = 10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    id INTEGER PRIMARY KEY,
+    email TEXT COLLATE NOCASE,
+    modified INTEGER NOT NULL,
+    synced_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contacts_email ON contacts (email);
+CREATE TABLE IF NOT EXISTS committee_members (
+    committee TEXT NOT NULL COLLATE NOCASE,
+    contact_id INTEGER NOT NULL,
+    PRIMARY KEY (committee, contact_id)
+);
+CREATE INDEX IF NOT EXISTS committee_members_contact ON committee_members (contact_id);
+CREATE TABLE IF NOT EXISTS companies (
+    id INTEGER PRIMARY KEY,
+    name TEXT COLLATE NOCASE,
+    modified INTEGER NOT NULL,
+    synced_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS companies_name ON companies (name);
+CREATE TABLE IF NOT EXISTS sync_state (
+    object_type TEXT PRIMARY KEY,
+    state TEXT,
+    refreshed_at REAL
+);
+"""
+
+
+def _committees(properties):
+    """Committees of a contact; checkbox properties hold ';'-separated values."""
+    value = properties.get("disease_group_executive_committee")
+    if not value:
+        return []
+    return [committee.strip() for committee in value.split(";") if committee.strip()]
+
+
+class _MirrorCheckpoint(Checkpoint):
+    """Saves the watermark of one object type along with its staged changes."""
+
+    def __init__(self, mirror, object_type):
+        self._mirror = mirror
+        self._object_type = object_type
+
+    def load(self):
+        return self._mirror._load_state(self._object_type)
+
+    def save(self, state):
+        self._mirror._commit(self._object_type, state)
+
+
+class Mirror(object):
+    """
+    SQLite mirror of contacts and companies; see the module documentation.
+    Thread-safe: one connection is shared behind a lock.
+
+    Args:
+        path (str): SQLite database file, or ``":memory:"``
+        max_staleness (float): seconds after a refresh during which reads are
+            served from the mirror
+        offline (bool): serve every read from the mirror, however stale
+        properties (dict): properties to mirror per object type, defaults to
+            ``DEFAULT_PROPERTIES``
+    """
+
+    def __init__(
+        self,
+        path=":memory:",
+        max_staleness=DEFAULT_MAX_STALENESS,
+        offline=False,
+        properties=None,
+    ):
+        self.path = path
+        self.max_staleness = max_staleness
+        self.offline = offline
+        self.properties = dict(DEFAULT_PROPERTIES)
+        self.properties.update(
+            (object_type, tuple(names)) for object_type, names in (properties or {}).items()
+        )
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._staged = {"contacts": [], "companies": []}
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # -- filling ---------------------------------------------------------------
+
+    def checkpoint(self, object_type):
+        """Return the :class:`~.changes.Checkpoint` of an object type's refresh."""
+        return _MirrorCheckpoint(self, object_type)
+
+    def stage(self, object_type, result):
+        """Queue a search result to be written with the next checkpoint save."""
+        with self._lock:
+            self._staged[object_type].append(result)
+
+    def _load_state(self, object_type):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT state FROM sync_state WHERE object_type = ?", (object_type,)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    def _commit(self, object_type, state):
+        with self._lock:
+            staged, self._staged[object_type] = self._staged[object_type], []
+            with self._transaction():
+                self._write(object_type, staged, time.time())
+                self._db.execute(
+                    "INSERT INTO sync_state (object_type, state) VALUES (?, ?)"
+                    " ON CONFLICT (object_type) DO UPDATE SET state = excluded.state",
+                    (object_type, json.dumps(state)),
+                )
+
+    @contextmanager
+    def _transaction(self):
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _write(self, object_type, results, synced_at):
+        modified_property = MODIFIED_PROPERTY[object_type]
+        rows = []
+        members = []
+        for result in results:
+            properties = result.get("properties") or {}
+            key = properties.get("email" if object_type == "contacts" else "name")
+            rows.append(
+                (
+                    int(result["id"]),
+                    key,
+                    modified_ms(result, modified_property),
+                    synced_at,
+                    json.dumps(result),
+                )
+            )
+            if object_type == "contacts":
+                members.extend(
+                    (committee, int(result["id"])) for committee in _committees(properties)
+                )
+        column = "email" if object_type == "contacts" else "name"
+        self._db.executemany(
+            "INSERT OR REPLACE INTO {} (id, {}, modified, synced_at, data)"
+            " VALUES (?, ?, ?, ?, ?)".format(object_type, column),
+            rows,
+        )
+        if object_type == "contacts":
+            self._db.executemany(
+                "DELETE FROM committee_members WHERE contact_id = ?",
+                [(row[0],) for row in rows],
+            )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO committee_members (committee, contact_id)"
+                " VALUES (?, ?)",
+                members,
+            )
+
+    def mark_refreshed(self, object_type, refreshed_at=None):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO sync_state (object_type, refreshed_at) VALUES (?, ?)"
+                " ON CONFLICT (object_type) DO UPDATE"
+                " SET refreshed_at = excluded.refreshed_at",
+                (object_type, time.time() if refreshed_at is None else refreshed_at),
+            )
+
+    def reset(self, object_type):
+        """
+        Forget the sync watermark of an object type, so that the next refresh
+        loads every object again. The mirrored objects keep being served
+        until :meth:`prune` drops those the reload didn't see.
+        """
+        with self._lock:
+            self._db.execute(
+                "UPDATE sync_state SET state = NULL WHERE object_type = ?", (object_type,)
+            )
+
+    def prune(self, object_type, synced_before):
+        """Drop the objects not written since ``synced_before`` (epoch seconds)."""
+        with self._lock, self._transaction():
+            if object_type == "contacts":
+                self._db.execute(
+                    "DELETE FROM committee_members WHERE contact_id IN"
+                    " (SELECT id FROM contacts WHERE synced_at < ?)",
+                    (synced_before,),
+                )
+            return self._db.execute(
+                "DELETE FROM {} WHERE synced_at < ?".format(object_type), (synced_before,)
+            ).rowcount
+
+    def apply_write(self, object_type, object_id, properties):
+        """
+        Merge the properties the client just wrote to an object into its
+        mirrored copy; a new object is added, so later reads can find it.
+        """
+        object_id = str(object_id)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM {} WHERE id = ?".format(object_type), (int(object_id),)
+            ).fetchone()
+            if row is not None:
+                result = json.loads(row[0])
+            else:
+                result = {"id": object_id, "properties": {}, "archived": False}
+            mirrored = self.properties[object_type] + ALWAYS_RETURNED[object_type]
+            result["properties"].update(
+                (name, value) for name, value in properties.items() if name in mirrored
+            )
+            with self._transaction():
+                self._write(object_type, [result], time.time())
+
+    # -- reading ---------------------------------------------------------------
+
+    def refreshed_at(self, object_type):
+        """Epoch seconds of the last complete refresh of an object type, or ``None``."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT refreshed_at FROM sync_state WHERE object_type = ?", (object_type,)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def is_fresh(self, object_type):
+        if self.offline:
+            return True
+        refreshed_at = self.refreshed_at(object_type)
+        return refreshed_at is not None and time.time() - refreshed_at <= self.max_staleness
+
+    def _search(self, object_type, query, args, properties, order="id"):
+        """
+        Return the objects selected by ``query`` (the ``FROM`` and ``WHERE``
+        clauses of a select, sorted by the object ID column ``order``) as a
+        Hubspot search response,
+        or ``None`` if the mirror can't answer: stale, not mirroring one of
+        ``properties``, or, unless offline, no match.
+        """
+        if not set(properties) <= set(self.properties[object_type]):
+            return None
+        if not self.is_fresh(object_type):
+            with self._lock:
+                self._stale += 1
+            return None
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT data {} ORDER BY {} LIMIT ?".format(query, order),
+                args + (SEARCH_DEFAULT_LIMIT + 1,),
+            ).fetchall()
+            total = len(rows)
+            if total > SEARCH_DEFAULT_LIMIT:
+                total = self._db.execute(
+                    "SELECT COUNT(*) {}".format(query), args
+                ).fetchone()[0]
+            if not rows and not self.offline:
+                self._misses += 1
+                return None
+            self._hits += 1
+        returned = set(properties) | set(ALWAYS_RETURNED[object_type])
+        results = []
+        for (data,) in rows[:SEARCH_DEFAULT_LIMIT]:
+            result = json.loads(data)
+            result["properties"] = {
+                name: value
+                for name, value in result["properties"].items()
+                if name in returned
+            }
+            results.append(result)
+        response = {"total": total, "results": results}
+        if total > SEARCH_DEFAULT_LIMIT:
+            response["paging"] = {"next": {"after": str(SEARCH_DEFAULT_LIMIT)}}
+        return response
+
+    def contact_by_email(self, email, properties):
+        return self._search(
+            "contacts",
+            "FROM contacts WHERE email = ?",
+            (email,),
+            properties,
+        )
+
+    def contacts_by_committee(self, committee, properties):
+        return self._search(
+            "contacts",
+            "FROM committee_members JOIN contacts ON id = contact_id WHERE committee = ?",
+            (committee,),
+            properties,
+            order="contact_id",
+        )
+
+    def companies_by_name(self, name, properties):
+        return self._search(
+            "companies",
+            "FROM companies WHERE name = ?",
+            (name,),
+            properties,
+        )
+
+    def stats(self):
+        """
+        Return e.g. {'contacts': 10000, 'companies': 8, 'hits': 950,
+        'misses': 3, 'stale': 0, 'age': {'contacts': 12.5, 'companies': 12.4}}
+        """
+        now = time.time()
+        with self._lock:
+            counts = {
+                object_type: self._db.execute(
+                    "SELECT COUNT(*) FROM {}".format(object_type)
+                ).fetchone()[0]
+                for object_type in ("contacts", "companies")
+            }
+            ages = {
+                object_type: now - refreshed_at
+                for object_type, refreshed_at in self._db.execute(
+                    "SELECT object_type, refreshed_at FROM sync_state"
+                    " WHERE refreshed_at IS NOT NULL"
+                )
+            }
+            counts.update(hits=self._hits, misses=self._misses, stale=self._stale, age=ages)
+            return counts
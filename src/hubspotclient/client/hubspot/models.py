@@ -0,0 +1,206 @@
+"""
+Compact typed results, returned instead of Hubspot's JSON dicts by clients
+created with ``typed_results=True``.
+
+Objects use ``__slots__`` and keep their properties as a tuple of values
+alongside a tuple of property names that is interned and shared by every
+object with the same set of properties, so holding many thousands of contacts
+costs a fraction of the equivalent nested dicts. Timestamps are kept as
+Hubspot's strings and parsed into ``datetime`` only when read.
+"""
+
+import sys
+import threading
+from datetime import datetime
+
+
+_names_lock = threading.Lock()
+_names = {}
+
+
+def _shared_names(names):
+    """Return the one shared, interned tuple for this sequence of names."""
+    key = tuple(names)
+    shared = _names.get(key)
+    if shared is None:
+        with _names_lock:
+            shared = _names.setdefault(key, tuple(sys.intern(name) for name in key))
+    return shared
+
+
+def parse_timestamp(value):
+    """Parse a Hubspot timestamp such as '2021-07-28T20:52:30.963Z'."""
+    if value is None or isinstance(value, datetime):
+        return value
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+
+class HubspotObject(object):
+    """
+    A Hubspot CRM object. Properties are available through :meth:`get`,
+    ``obj["name"]`` and :attr:`properties`.
+    """
+
+    __slots__ = ("id", "_names", "_values", "_created_at", "_updated_at", "archived")
+
+    def __init__(self, id, properties=None, created_at=None, updated_at=None, archived=False):
+        properties = properties or {}
+        self.id = id
+        self._names = _shared_names(properties)
+        self._values = tuple(properties.values())
+        self._created_at = created_at
+        self._updated_at = updated_at
+        self.archived = archived
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            data.get("id"),
+            data.get("properties"),
+            data.get("createdAt"),
+            data.get("updatedAt"),
+            data.get("archived", False),
+        )
+
+    def to_json(self):
+        """Return the object in Hubspot's JSON shape."""
+        return {
+            "id": self.id,
+            "properties": self.properties,
+            "createdAt": self._created_at,
+            "updatedAt": self._updated_at,
+            "archived": self.archived,
+        }
+
+    @property
+    def properties(self):
+        """The properties as a new dict."""
+        return dict(zip(self._names, self._values))
+
+    def get(self, name, default=None):
+        try:
+            return self._values[self._names.index(name)]
+        except ValueError:
+            return default
+
+    def __getitem__(self, name):
+        try:
+            return self._values[self._names.index(name)]
+        except ValueError:
+            raise KeyError(name)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    # the raw strings are kept so that to_json() round-trips exactly
+    @property
+    def created_at(self):
+        return parse_timestamp(self._created_at)
+
+    @property
+    def updated_at(self):
+        return parse_timestamp(self._updated_at)
+
+    def __eq__(self, other):
+        if not isinstance(other, HubspotObject):
+            return NotImplemented
+        return type(self) is type(other) and self.to_json() == other.to_json()
+
+    def __hash__(self):
+        return hash((type(self), self.id))
+
+    def __repr__(self):
+        return "{}(id={!r}, properties={!r})".format(
+            type(self).__name__, self.id, self.properties
+        )
+
+
+class Contact(HubspotObject):
+    """
+    A contact. ``companies`` holds its associated :class:`Company` objects
+    when they were joined, see ``get_contacts_with_companies``, and is
+    ``None`` otherwise.
+    """
+
+    __slots__ = ("companies",)
+
+    def __init__(
+        self,
+        id,
+        properties=None,
+        created_at=None,
+        updated_at=None,
+        archived=False,
+        companies=None,
+    ):
+        super(Contact, self).__init__(id, properties, created_at, updated_at, archived)
+        self.companies = companies
+
+    @classmethod
+    def from_json(cls, data):
+        contact = super(Contact, cls).from_json(data)
+        if data.get("companies") is not None:
+            contact.companies = [Company.from_json(company) for company in data["companies"]]
+        return contact
+
+    def to_json(self):
+        data = super(Contact, self).to_json()
+        if self.companies is not None:
+            data["companies"] = [company.to_json() for company in self.companies]
+        return data
+
+    @property
+    def email(self):
+        return self.get("email")
+
+
+class Company(HubspotObject):
+    __slots__ = ()
+
+    @property
+    def name(self):
+        return self.get("name")
+
+
+class SearchPage(object):
+    """
+    One page of search results.
+
+    Attributes:
+        total (int): number of objects matching the search
+        results (list): :class:`Contact` or :class:`Company` objects
+        after (str): cursor of the next page, or ``None``
+    """
+
+    __slots__ = ("total", "results", "after")
+
+    def __init__(self, total, results, after=None):
+        self.total = total
+        self.results = results
+        self.after = after
+
+    @classmethod
+    def from_json(cls, data, model):
+        after = ((data.get("paging") or {}).get("next") or {}).get("after")
+        return cls(
+            int(data.get("total") or 0),
+            [model.from_json(result) for result in data.get("results") or ()],
+            after,
+        )
+
+    def to_json(self):
+        data = {"total": self.total, "results": [r.to_json() for r in self.results]}
+        if self.after is not None:
+            data["paging"] = {"next": {"after": self.after}}
+        return data
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self):
+        return len(self.results)
+
+    def __repr__(self):
+        return "SearchPage(total={!r}, results={!r})".format(self.total, self.results)
@@ -0,0 +1,219 @@
+"""
+Client-side rate limiting for the Hubspot API.
+
+Hubspot enforces a limit per rolling 10 second interval and a daily limit per
+account, and reports both in ``X-HubSpot-RateLimit-*`` response headers. The
+CRM search endpoints have their own, lower, per-second limit that isn't
+reported at all. A :class:`RateLimiter` keeps token buckets for these limits,
+seeds them from the headers of every response and stops all requests for the
+``Retry-After`` period of a 429. Once the daily limit is used up, requests
+fail fast with ``HubspotDailyLimitError``, except for one request a minute
+that checks whether Hubspot has reset it.
+
+One limiter is shared by every client (sync or async, in any thread) that uses
+the same Hubspot token, see :func:`shared_rate_limiter`.
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from .errors import HubspotDailyLimitError
+
+
+# Hubspot's lowest limits (free and starter private apps); the interval bucket
+# is re-seeded from the response headers as soon as one is seen
+DEFAULT_INTERVAL_MAX = 100
+DEFAULT_INTERVAL_SECONDS = 10.0
+# CRM search endpoints are limited to 5 requests per second per account
+SEARCH_PER_SECOND = 5
+# wait after a 429 without a usable Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
+# with the daily limit used up, let one request through this often to learn
+# from its headers whether the limit has been reset (at midnight, account time)
+DAILY_RECHECK_SECONDS = 60.0
+
+
+def _int_header(headers, name):
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def parse_retry_after(value, now=None):
+    """Return the number of seconds to wait from a ``Retry-After`` header."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - (now or time.time()))
+
+
+class TokenBucket(object):
+    """
+    A token bucket holding up to ``capacity`` tokens, refilled at
+    ``capacity / period`` tokens per second. Not thread-safe on its own; the
+    :class:`RateLimiter` serializes access.
+    """
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity, period):
+        self.capacity = float(capacity)
+        self.rate = capacity / float(period)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now):
+        """
+        Take a token, going into debt if there is none, and return how long the
+        caller has to wait before using it.
+        """
+        self._refill(now)
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def configure(self, capacity, period, now):
+        self._refill(now)
+        self.capacity = float(capacity)
+        self.rate = capacity / float(period)
+        self.tokens = min(self.tokens, self.capacity)
+
+    def observe_remaining(self, remaining, now):
+        """Lower the tokens to what Hubspot says is left for everyone."""
+        self._refill(now)
+        self.tokens = min(self.tokens, float(remaining))
+
+    def available(self, now):
+        self._refill(now)
+        return max(0.0, self.tokens)
+
+
+class RateLimiter(object):
+    """
+    Token-bucket rate limiter for one Hubspot account.
+
+    Call :meth:`acquire` before sending a request and sleep for the returned
+    number of seconds, then pass the response to :meth:`update`.
+    """
+
+    def __init__(
+        self,
+        interval_max=DEFAULT_INTERVAL_MAX,
+        interval_seconds=DEFAULT_INTERVAL_SECONDS,
+        search_per_second=SEARCH_PER_SECOND,
+    ):
+        self._lock = threading.Lock()
+        self._interval = TokenBucket(interval_max, interval_seconds)
+        self._search = TokenBucket(search_per_second, 1.0)
+        self._blocked_until = 0.0
+        self._daily_max = None
+        self._daily_remaining = None
+        self._daily_recheck_at = 0.0
+
+    def acquire(self, search=False):
+        """
+        Reserve capacity for one request and return the number of seconds to
+        wait before sending it.
+
+        Raises:
+            - HubspotDailyLimitError: if the daily limit is used up
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._daily_remaining is not None and self._daily_remaining <= 0:
+                if now < self._daily_recheck_at:
+                    raise HubspotDailyLimitError(
+                        self._daily_max, self._daily_recheck_at - now
+                    )
+                self._daily_recheck_at = now + DAILY_RECHECK_SECONDS
+            wait = self._interval.reserve(now)
+            if search:
+                wait = max(wait, self._search.reserve(now))
+            if self._daily_remaining is not None:
+                self._daily_remaining -= 1
+                if self._daily_remaining == 0:
+                    self._daily_recheck_at = now + DAILY_RECHECK_SECONDS
+            return max(wait, self._blocked_until - now)
+
+    def update(self, code, headers):
+        """Seed the limits from the headers of a response."""
+        interval_max = _int_header(headers, "X-HubSpot-RateLimit-Max")
+        remaining = _int_header(headers, "X-HubSpot-RateLimit-Remaining")
+        interval_ms = _int_header(headers, "X-HubSpot-RateLimit-Interval-Milliseconds")
+        daily_max = _int_header(headers, "X-HubSpot-RateLimit-Daily")
+        daily_remaining = _int_header(headers, "X-HubSpot-RateLimit-Daily-Remaining")
+        retry_after = None
+        if code == 429:
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+            if retry_after is None:
+                retry_after = DEFAULT_RETRY_AFTER
+
+        with self._lock:
+            now = time.monotonic()
+            if interval_max:
+                period = interval_ms / 1000.0 if interval_ms else self._interval_period()
+                if interval_max != self._interval.capacity or period != self._interval_period():
+                    self._interval.configure(interval_max, period, now)
+            if remaining is not None:
+                self._interval.observe_remaining(remaining, now)
+            if daily_max is not None:
+                self._daily_max = daily_max
+            if daily_remaining is not None:
+                if daily_remaining <= 0 and (
+                    self._daily_remaining is None or self._daily_remaining > 0
+                ):
+                    self._daily_recheck_at = now + DAILY_RECHECK_SECONDS
+                self._daily_remaining = daily_remaining
+            if retry_after is not None:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+        return retry_after
+
+    def _interval_period(self):
+        return self._interval.capacity / self._interval.rate
+
+    def status(self):
+        """
+        Return the current headroom, e.g.
+        {'interval_max': 100, 'interval_seconds': 10.0,
+         'interval_remaining': 87, 'search_remaining': 5,
+         'daily_max': 250000, 'daily_remaining': 249871, 'blocked_for': 0.0}
+        ``daily_*`` are ``None`` until Hubspot has reported them.
+        """
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "interval_max": int(self._interval.capacity),
+                "interval_seconds": self._interval_period(),
+                "interval_remaining": int(self._interval.available(now)),
+                "search_remaining": int(self._search.available(now)),
+                "daily_max": self._daily_max,
+                "daily_remaining": self._daily_remaining,
+                "blocked_for": max(0.0, self._blocked_until - now),
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def shared_rate_limiter(token):
+    """Return the process-wide :class:`RateLimiter` for a Hubspot token."""
+    with _limiters_lock:
+        limiter = _limiters.get(token)
+        if limiter is None:
+            limiter = _limiters[token] = RateLimiter()
+        return limiter
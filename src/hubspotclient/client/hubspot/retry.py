@@ -0,0 +1,253 @@
+"""
+Retries of failed Hubspot requests.
+
+A :class:`RetryPolicy` decides whether a failed attempt is sent again and
+after how long. It is set per client (``retry=`` argument of the client) and
+can be replaced or adjusted per call, or for a block of calls with
+``client.context(retry=...)``.
+
+Only requests that are safe to send twice are retried after an error that
+may have reached Hubspot (5xx, read errors and timeouts): GET, PUT and
+DELETE, searches and batch reads. Every request may be retried after a 429
+or a connect error, since Hubspot never processed it.
+
+Waits follow "decorrelated jitter" (each wait is random between the base
+delay and three times the previous one, capped), or the ``Retry-After`` of
+the response if it is longer. All policies share, by default, a process-wide
+:class:`RetryBudget` limiting retries to a fraction of recent requests, so
+that retries can't multiply the load on Hubspot while it is failing. No
+retry is sent that couldn't start before the deadline of the call, see
+:mod:`~.deadline`.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+
+import httpx
+
+from .ratelimit import parse_retry_after
+
+
+RETRYABLE_STATUSES = frozenset([429, 500, 502, 503, 504])
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+
+def is_idempotent(method, url):
+    """
+    Whether sending a request twice has the same effect as sending it once:
+    idempotent HTTP methods, and the POSTs of searches and batch reads.
+    """
+    method = method.upper()
+    if method in IDEMPOTENT_METHODS:
+        return True
+    return method == "POST" and url.endswith(("/search", "/batch/read"))
+
+
+class RetryBudget(object):
+    """
+    Caps retries at ``ratio`` of the requests sent over the last ``window``
+    seconds, plus ``min_per_second`` so that a quiet process can still retry.
+    Thread-safe; shared by all clients by default, see :func:`shared_retry_budget`.
+    """
+
+    def __init__(self, ratio=0.2, min_per_second=1.0, window=10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        self._lock = threading.Lock()
+        self._requests = deque()
+        self._retries = deque()
+
+    def _trim(self, now):
+        horizon = now - self.window
+        for times in (self._requests, self._retries):
+            while times and times[0] < horizon:
+                times.popleft()
+
+    def record_request(self):
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_spend(self):
+        """Take one retry from the budget; return whether there was one left."""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            allowed = self.min_per_second * self.window + self.ratio * len(self._requests)
+            if len(self._retries) >= allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+    def status(self):
+        with self._lock:
+            self._trim(time.monotonic())
+            return {
+                "requests": len(self._requests),
+                "retries": len(self._retries),
+                "allowed": int(
+                    self.min_per_second * self.window + self.ratio * len(self._requests)
+                ),
+            }
+
+
+_budget = RetryBudget()
+
+
+def shared_retry_budget():
+    """Return the process-wide :class:`RetryBudget`."""
+    return _budget
+
+
+class RetryPolicy(object):
+    """
+    When and how to retry a failed request.
+
+    Args:
+        max_attempts (int): attempts in total, including the first one
+        statuses (iterable): response status codes to retry
+        connect_errors (bool): retry when the connection can't be opened
+        read_errors (bool): retry when the connection fails or times out
+            after the request was sent (safe requests only)
+        base_delay (float): shortest wait between attempts, in seconds
+        max_delay (float): longest wait picked by the backoff, in seconds
+        total_timeout (float): give up rather than wait past this many
+            seconds since the first attempt
+        respect_retry_after (bool): wait at least the ``Retry-After`` of a
+            response
+        budget: ``True`` (default) for the process-wide
+            :class:`RetryBudget`, a ``RetryBudget``, or ``None`` for no budget
+        retry_unsafe (bool): also retry non-idempotent requests after errors
+            that may have reached Hubspot
+    """
+
+    def __init__(
+        self,
+        max_attempts=4,
+        statuses=RETRYABLE_STATUSES,
+        connect_errors=True,
+        read_errors=True,
+        base_delay=0.25,
+        max_delay=10.0,
+        total_timeout=30.0,
+        respect_retry_after=True,
+        budget=True,
+        retry_unsafe=False,
+    ):
+        self.max_attempts = max_attempts
+        self.statuses = frozenset(statuses)
+        self.connect_errors = connect_errors
+        self.read_errors = read_errors
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.total_timeout = total_timeout
+        self.respect_retry_after = respect_retry_after
+        self.budget = shared_retry_budget() if budget is True else budget
+        self.retry_unsafe = retry_unsafe
+
+    _OPTIONS = (
+        "max_attempts",
+        "statuses",
+        "connect_errors",
+        "read_errors",
+        "base_delay",
+        "max_delay",
+        "total_timeout",
+        "respect_retry_after",
+        "budget",
+        "retry_unsafe",
+    )
+    # keyword arguments of the ``backoff`` package that ``retry`` used to take
+    _LEGACY_OPTIONS = {"max_tries": "max_attempts", "max_time": "total_timeout"}
+
+    def replace(self, **kwargs):
+        """Return a copy of the policy with some options changed."""
+        options = {name: getattr(self, name) for name in self._OPTIONS}
+        for name, value in kwargs.items():
+            name = self._LEGACY_OPTIONS.get(name, name)
+            if name not in options:
+                raise TypeError("unknown retry option {!r}".format(name))
+            options[name] = value
+        return RetryPolicy(**options)
+
+    def backoff(self, previous):
+        """Return the next wait after waiting ``previous`` seconds last time."""
+        upper = max(self.base_delay, previous * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+    def is_retryable(self, method, url, response=None, error=None):
+        """Whether this outcome of an attempt may be retried at all."""
+        if error is not None:
+            if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+                # nothing reached Hubspot
+                return self.connect_errors
+            if not isinstance(error, httpx.TransportError):
+                return False
+            return self.read_errors and (self.retry_unsafe or is_idempotent(method, url))
+        if response.status_code not in self.statuses:
+            return False
+        if response.status_code == 429:
+            # rejected before being processed
+            return True
+        return self.retry_unsafe or is_idempotent(method, url)
+
+    def next_wait(
+        self, method, url, attempt, started, previous, response=None, error=None, deadline=None
+    ):
+        """
+        Return how many seconds to wait before sending a failed request again,
+        or ``None`` to give up.
+
+        Args:
+            attempt (int): number of the attempt that failed, from 1
+            started (float): ``time.monotonic()`` of the first attempt
+            previous (float): the previous wait, 0 before the first retry
+            response: the response of the attempt, if there was one
+            error: the exception raised by the attempt otherwise
+            deadline (Deadline): give up unless another attempt fits before it
+        """
+        if attempt >= self.max_attempts:
+            return None
+        if not self.is_retryable(method, url, response=response, error=error):
+            return None
+        wait = self.backoff(previous)
+        if self.respect_retry_after and response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                wait = max(wait, retry_after)
+        if time.monotonic() - started + wait > self.total_timeout:
+            return None
+        if deadline is not None and not deadline.fits(wait):
+            return None
+        if self.budget is not None and not self.budget.try_spend():
+            return None
+        return wait
+
+    def __repr__(self):
+        return "RetryPolicy(max_attempts={}, statuses={}, total_timeout={})".format(
+            self.max_attempts, sorted(self.statuses), self.total_timeout
+        )
+
+
+def resolve_policy(default, retry):
+    """
+    Return the policy for one request from the client's ``default`` and the
+    ``retry`` argument of the call: ``True`` for the default, ``False`` or
+    ``None`` for none, a :class:`RetryPolicy`, or a dict of options to change
+    on the default.
+    """
+    if retry is True:
+        return default
+    if not retry:
+        return None
+    if isinstance(retry, RetryPolicy):
+        return retry
+    if isinstance(retry, dict):
+        return (default or RetryPolicy()).replace(**retry)
+    raise TypeError(
+        "retry must be a bool, a dict or a RetryPolicy, not {!r}".format(retry)
+    )
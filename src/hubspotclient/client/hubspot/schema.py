@@ -0,0 +1,115 @@
+"""
+Property definitions of contacts and companies, to check writes locally.
+
+:meth:`~.base.BaseHubspotClient.get_property_schema` reads the definitions of
+an object type from Hubspot's properties API and keeps them in a
+:class:`SchemaCache` for ``schema_ttl`` seconds. Clients created with
+``validate_properties=True`` check the properties of every contact they
+create or update against them, and reject unknown properties and values
+that aren't options of an enumeration without a round trip to Hubspot.
+
+Definitions are looked up again before a write is rejected if they are
+older than ``RECHECK_AFTER`` seconds, so that a property just added in
+Hubspot doesn't fail writes until the cache expires.
+"""
+
+import threading
+import time
+
+
+DEFAULT_SCHEMA_TTL = 3600
+# rejected writes look the definitions up again if they are older than this
+RECHECK_AFTER = 60
+
+
+class PropertySchema(object):
+    """
+    Property definitions of one object type.
+
+    Args:
+        object_type (str): ``contacts`` or ``companies``
+        definitions (list): Hubspot property definitions, e.g.
+            {'name': 'email', 'type': 'string', 'fieldType': 'text', ...}
+    """
+
+    def __init__(self, object_type, definitions):
+        self.object_type = object_type
+        self.definitions = {
+            definition["name"]: definition for definition in definitions
+        }
+        self.fetched = time.monotonic()
+        self._options = {}
+        for name, definition in self.definitions.items():
+            if definition.get("type") == "enumeration":
+                self._options[name] = [
+                    option["value"] for option in definition.get("options") or ()
+                ]
+
+    @classmethod
+    def from_json(cls, object_type, response_json):
+        return cls(object_type, response_json.get("results") or [])
+
+    @property
+    def age(self):
+        return time.monotonic() - self.fetched
+
+    def __contains__(self, name):
+        return name in self.definitions
+
+    def options(self, name):
+        """Allowed values of an enumeration property, or ``None``."""
+        return self._options.get(name)
+
+    def errors(self, property_json):
+        """
+        Return what is wrong with the properties of a write, as messages;
+        empty if nothing is.
+        """
+        errors = []
+        for name, value in property_json.items():
+            if name not in self.definitions:
+                errors.append("unknown property `{}` of {}".format(name, self.object_type))
+                continue
+            options = self._options.get(name)
+            if options is None or value in (None, ""):
+                continue
+            if self.definitions[name].get("fieldType") == "checkbox":
+                # multiple values, ';'-separated
+                values = str(value).split(";")
+            else:
+                values = [str(value)]
+            for one in values:
+                if one not in options:
+                    errors.append(
+                        "`{}` is not an option of `{}` ({})".format(
+                            one, name, ", ".join(options)
+                        )
+                    )
+        return errors
+
+
+class SchemaCache(object):
+    """
+    Thread-safe :class:`PropertySchema` per object type, for ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl=DEFAULT_SCHEMA_TTL):
+        self.ttl = ttl
+        self._schemas = {}
+        self._lock = threading.Lock()
+
+    def get(self, object_type):
+        """Return the cached schema of an object type, or ``None`` if expired."""
+        with self._lock:
+            schema = self._schemas.get(object_type)
+        if schema is None or schema.age > self.ttl:
+            return None
+        return schema
+
+    def set(self, schema):
+        with self._lock:
+            self._schemas[schema.object_type] = schema
+
+    def clear(self):
+        with self._lock:
+            self._schemas.clear()
@@ -0,0 +1,92 @@
+"""
+Coalescing of identical in-flight reads.
+
+When several callers (threads of the sync client or tasks of the async one)
+send the same idempotent read at the same time, only the first one goes to
+Hubspot; the others wait for it and get the same response or exception. A
+waiting caller may give up after a timeout of its own, e.g. its deadline,
+without cancelling the shared request.
+"""
+
+import asyncio
+import json
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from ...utils import maybe_sync, wait_future
+
+
+def flight_key(method, url, params=None, json_body=None):
+    """Key identifying identical requests: method, URL, params and JSON body."""
+    return (
+        method.upper(),
+        url,
+        json.dumps(params, sort_keys=True, separators=(",", ":"), default=str),
+        json.dumps(json_body, sort_keys=True, separators=(",", ":"), default=str),
+    )
+
+
+class _LeaderCancelled(Exception):
+    """The call shared with the waiting callers was cancelled."""
+
+
+class FlightTimeout(Exception):
+    """A caller waiting for a call in flight ran out of time."""
+
+
+class SingleFlight(object):
+    """Registry of the requests in flight for one client."""
+
+    def __init__(self, synchronous=False):
+        self.synchronous = synchronous
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    @maybe_sync
+    async def do(self, key, fn, timeout=None):
+        """
+        Return ``await fn()``, unless a call with the same ``key`` is already in
+        flight, in which case its outcome is shared.
+
+        Raises:
+            - FlightTimeout: if the call in flight took more than ``timeout``
+              seconds; it keeps running for the other callers
+        """
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = self._calls[key] = Future()
+                    future.set_running_or_notify_cancel()
+                else:
+                    self.coalesced += 1
+            if leader:
+                break
+            try:
+                return await wait_future(future, timeout)
+            except FutureTimeoutError:
+                if future.done():
+                    # the shared call itself raised it
+                    raise
+                raise FlightTimeout() from None
+            except _LeaderCancelled:
+                # the caller that sent it was cancelled, not this one: send again
+                continue
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
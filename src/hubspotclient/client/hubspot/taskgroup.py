@@ -0,0 +1,136 @@
+"""
+Structured concurrency for the async client.
+
+A :class:`TaskGroup` runs client calls as tasks with at most
+``max_concurrency`` of them in flight, and never lets one outlive the
+``async with`` block that started it::
+
+    async with hubspot.task_group(max_concurrency=8) as group:
+        for email in emails:
+            group.spawn(hubspot.get_contact_by_email, email)
+        async for task in group.as_completed():
+            handle(task.result())
+
+In fail-fast mode (the default) the first call to raise cancels the others,
+whose requests are abandoned mid-flight, and the block raises that error.
+Otherwise every call runs to completion and the errors stay on their tasks.
+The block waits for the calls when it ends normally; an exception leaving it,
+or :meth:`TaskGroup.cancel`, cancels whatever is still running.
+
+:meth:`~.async_client.HubspotClient.map` and
+:meth:`~.async_client.HubspotClient.as_completed` cover the common case of
+one method called with many arguments.
+"""
+
+import asyncio
+
+
+DEFAULT_MAX_CONCURRENCY = 10
+
+
+class TaskGroup(object):
+    """
+    Args:
+        max_concurrency (int): calls running at once; the others wait
+        fail_fast (bool): cancel every call when one raises, and raise its
+            error when the block exits
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, fail_fast=True):
+        self.max_concurrency = max_concurrency
+        self.fail_fast = fail_fast
+        self._semaphore = None
+        self._tasks = []
+        self._error = None
+        self._closed = False
+
+    async def __aenter__(self):
+        self._semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.cancel()
+        try:
+            await self.wait()
+        except asyncio.CancelledError:
+            # the calls must not outlive the block, even if it is cancelled
+            self.cancel()
+            raise
+        finally:
+            self._closed = True
+        for task in self._tasks:
+            if not task.cancelled():
+                # retrieved, so asyncio doesn't log the errors as unhandled
+                task.exception()
+        if exc_type is None and self._error is not None:
+            raise self._error
+
+    @property
+    def tasks(self):
+        """The tasks spawned so far, in order."""
+        return list(self._tasks)
+
+    def spawn(self, fn, *args, **kwargs):
+        """
+        Schedule ``await fn(*args, **kwargs)`` once a slot is free, and return
+        its ``asyncio.Task``.
+        """
+        if self._semaphore is None or self._closed:
+            raise RuntimeError("spawn() must be called inside `async with TaskGroup()`")
+        if self._error is not None:
+            raise RuntimeError("the task group was cancelled by a failed call")
+        task = asyncio.ensure_future(self._run(fn, args, kwargs))
+        self._tasks.append(task)
+        return task
+
+    async def _run(self, fn, args, kwargs):
+        async with self._semaphore:
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                if self.fail_fast and self._error is None:
+                    # before the slot is freed, so that no other call starts
+                    self._error = e
+                    self.cancel()
+                raise
+
+    def cancel(self):
+        """Cancel every call that hasn't finished."""
+        current = asyncio.current_task()
+        for task in self._tasks:
+            if not task.done() and task is not current:
+                task.cancel()
+
+    async def wait(self):
+        """Wait for every call to finish, or be cancelled."""
+        while True:
+            pending = [task for task in self._tasks if not task.done()]
+            if not pending:
+                return
+            await asyncio.wait(pending)
+
+    async def as_completed(self):
+        """
+        Yield the spawned tasks as they finish, fastest first; cancelled
+        tasks are skipped. In fail-fast mode the first error is raised
+        instead of yielding its task.
+        """
+        remaining = set()
+        spawned = 0
+        while True:
+            # including the tasks spawned while iterating
+            remaining.update(self._tasks[spawned:])
+            spawned = len(self._tasks)
+            if not remaining:
+                break
+            done, _ = await asyncio.wait(remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                remaining.discard(task)
+                if task.cancelled():
+                    continue
+                if self.fail_fast and task.exception() is not None:
+                    raise task.exception()
+                yield task
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,84 @@
+"""
+OpenTelemetry spans for the requests of the Hubspot clients.
+
+:class:`OpenTelemetryListener` is an :class:`~.events.EventListener` opening
+one client span per request sent to Hubspot, with the attempts, retries and
+the outcome recorded on it. It requires the ``opentelemetry-api`` package::
+
+    hubspot = HubspotClient(
+        hubspot_auth_token="...", listeners=[OpenTelemetryListener()]
+    )
+"""
+
+from .events import EventListener
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+
+class OpenTelemetryListener(EventListener):
+    """
+    Args:
+        tracer: OpenTelemetry tracer to use, defaults to the global tracer
+            provider's tracer for this module
+    """
+
+    def __init__(self, tracer=None):
+        if trace is None:
+            raise ImportError(
+                "OpenTelemetryListener requires the opentelemetry-api package"
+            )
+        self._tracer = tracer or trace.get_tracer(__name__)
+
+    def on_request_start(self, event):
+        event.extra["otel_span"] = self._tracer.start_span(
+            "HubSpot {} {}".format(event.method, event.endpoint),
+            kind=trace.SpanKind.CLIENT,
+            attributes={
+                "http.method": event.method,
+                "http.url": event.url,
+                "hubspot.endpoint": event.endpoint,
+            },
+        )
+
+    def on_response(self, event):
+        span = event.extra.get("otel_span")
+        if span is not None:
+            span.add_event(
+                "response",
+                {
+                    "attempt": event.attempt,
+                    "http.status_code": event.status,
+                    "elapsed": event.elapsed,
+                },
+            )
+
+    def on_retry(self, event):
+        span = event.extra.get("otel_span")
+        if span is not None:
+            span.add_event(
+                "retry", {"attempt": event.attempt, "retry_after": event.retry_after or 0.0}
+            )
+
+    def on_give_up(self, event):
+        span = event.extra.get("otel_span")
+        if span is None:
+            return
+        if event.error is not None:
+            span.record_exception(event.error)
+        span.set_status(trace.Status(trace.StatusCode.ERROR, "gave up"))
+
+    def on_request_end(self, event):
+        span = event.extra.pop("otel_span", None)
+        if span is None:
+            return
+        span.set_attribute("hubspot.attempts", event.attempt)
+        if event.status is not None:
+            span.set_attribute("http.status_code", event.status)
+            if event.status >= 400 and event.error is None:
+                span.set_status(trace.Status(trace.StatusCode.ERROR))
+        span.set_attribute("http.request_content_length", event.request_bytes)
+        span.set_attribute("http.response_content_length", event.response_bytes)
+        span.end()
@@ -0,0 +1,98 @@
+"""
+Connection pooling for the Hubspot clients.
+
+Each :class:`~.base.BaseHubspotClient` owns one :class:`ConnectionPool`, which
+lazily creates a single long-lived ``httpx`` client so that keep-alive
+connections (and the TLS sessions behind them) to api.hubapi.com are reused
+across calls instead of being renegotiated for every request.
+"""
+
+import os
+import threading
+import weakref
+
+import httpx
+
+
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0
+)
+
+# every live pool, so that children created by ``fork()`` (e.g. gunicorn
+# workers) can drop the connections they inherited from their parent
+_pools = weakref.WeakSet()
+
+
+def _reset_pools_after_fork():
+    for pool in list(_pools):
+        pool._forget()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+
+class ConnectionPool(object):
+    """
+    Lazily created, fork-aware holder of one ``httpx`` client.
+
+    Args:
+        client_cls: ``httpx.Client``-like class to instantiate
+        http2 (bool): negotiate HTTP/2 when the server supports it (requires
+            the ``h2`` package)
+        limits (httpx.Limits): connection pool limits and keep-alive expiry
+        client_kwargs: passed through to ``client_cls``, e.g. ``transport``
+    """
+
+    def __init__(self, client_cls, http2=False, limits=None, **client_kwargs):
+        self._client_cls = client_cls
+        self._client_kwargs = dict(client_kwargs)
+        self._client_kwargs["http2"] = http2
+        self._client_kwargs["limits"] = limits or DEFAULT_LIMITS
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+        _pools.add(self)
+
+    @property
+    def client(self):
+        """
+        Return the pooled client, creating it on first use and again in a
+        forked child process, where the parent's connections must not be
+        shared.
+        """
+        client = self._client
+        if client is not None and self._pid == os.getpid():
+            return client
+        with self._lock:
+            if self._client is None or self._pid != os.getpid():
+                self._client = self._client_cls(**self._client_kwargs)
+                self._pid = os.getpid()
+            return self._client
+
+    @property
+    def is_open(self):
+        return self._client is not None and self._pid == os.getpid()
+
+    def _forget(self):
+        # sockets inherited from the parent are left for the parent to close;
+        # closing them here would tear down its TLS sessions
+        self._client = None
+        self._pid = None
+
+    def _detach(self):
+        with self._lock:
+            client, self._client = self._client, None
+            owned = self._pid == os.getpid()
+            self._pid = None
+        return client if owned else None
+
+    def close(self):
+        client = self._detach()
+        if client is not None:
+            client.close()
+
+    async def aclose(self):
+        client = self._detach()
+        if client is not None:
+            await client.aclose()
@@ -0,0 +1,144 @@
+"""
+Synchronous twins of coroutine functions, generated from their source.
+
+In the spirit of the `unasync <https://github.com/python-trio/unasync>`_
+project, but at runtime so that there is a single source: the async
+implementation is parsed, ``async def``/``async for``/``async with`` become
+their plain counterparts, ``await`` is dropped, and names with a synchronous
+equivalent are swapped for it:
+
+- attributes and names in ``RENAMES`` (e.g. ``aclose`` becomes ``close``)
+- module-level helpers carrying a ``_sync_version`` attribute (see
+  :func:`sync_version`), e.g. ``sleep(x)`` becomes ``sleep._sync_version(x)``
+
+Functions to transform must not be closures and must not use zero-argument
+``super()``, since they are recompiled outside their class body. Their source
+must be installed: the synchronous client can't be used from an install
+holding only ``.pyc`` files, and says so on its first call.
+"""
+
+import ast
+import functools
+import inspect
+import textwrap
+import threading
+import types
+
+
+RENAMES = {
+    "aclose": "close",
+    "__aenter__": "__enter__",
+    "__aexit__": "__exit__",
+    "__aiter__": "__iter__",
+    "__anext__": "__next__",
+    "StopAsyncIteration": "StopIteration",
+}
+
+
+def sync_version(sync_fn):
+    """Declare ``sync_fn`` as the synchronous equivalent of a helper."""
+
+    def decorator(async_fn):
+        async_fn._sync_version = sync_fn
+        return async_fn
+
+    return decorator
+
+
+class _Unasync(ast.NodeTransformer):
+    def __init__(self, namespace):
+        self._namespace = namespace
+
+    def _replace(self, node, cls):
+        node = self.generic_visit(node)
+        fields = {field: getattr(node, field, None) for field in cls._fields}
+        return ast.copy_location(cls(**fields), node)
+
+    def visit_AsyncFunctionDef(self, node):
+        return self._replace(node, ast.FunctionDef)
+
+    def visit_AsyncFor(self, node):
+        return self._replace(node, ast.For)
+
+    def visit_AsyncWith(self, node):
+        return self._replace(node, ast.With)
+
+    def visit_Await(self, node):
+        return self.visit(node.value)
+
+    def visit_Attribute(self, node):
+        node = self.generic_visit(node)
+        node.attr = RENAMES.get(node.attr, node.attr)
+        return node
+
+    def visit_Name(self, node):
+        if node.id in RENAMES:
+            node.id = RENAMES[node.id]
+            return node
+        if isinstance(node.ctx, ast.Load) and hasattr(
+            self._namespace.get(node.id), "_sync_version"
+        ):
+            return ast.copy_location(
+                ast.Attribute(value=node, attr="_sync_version", ctx=ast.Load()), node
+            )
+        return node
+
+
+def unasync_function(fn):
+    """Return the synchronous twin of the coroutine function ``fn``."""
+    if fn.__code__.co_freevars:
+        raise TypeError(
+            "cannot generate a synchronous version of {}: it uses {}".format(
+                fn.__qualname__, ", ".join(fn.__code__.co_freevars)
+            )
+        )
+    try:
+        source = inspect.getsource(fn)
+    except (OSError, TypeError) as e:
+        raise RuntimeError(
+            "cannot generate a synchronous version of {}: its source code is not"
+            " available ({}). The synchronous client is generated from the"
+            " source of the async one; install hubspotclient with its .py files,"
+            " or use the async client".format(fn.__qualname__, e)
+        ) from e
+    tree = ast.parse(textwrap.dedent(source))
+    # keep the line numbers of the async source in tracebacks
+    ast.increment_lineno(tree, fn.__code__.co_firstlineno - 1)
+    tree.body[0].decorator_list = []
+    tree = ast.fix_missing_locations(_Unasync(fn.__globals__).visit(tree))
+
+    namespace = {}
+    exec(compile(tree, fn.__code__.co_filename, "exec"), fn.__globals__, namespace)
+    sync_fn = namespace[fn.__name__]
+    sync_fn.__qualname__ = fn.__qualname__
+    sync_fn.__module__ = fn.__module__
+    return sync_fn
+
+
+class MaybeSync(object):
+    """
+    Method descriptor returning the coroutine function on objects whose
+    ``synchronous`` attribute is false, and its generated synchronous twin
+    (see :func:`unasync_function`) on the others.
+    """
+
+    def __init__(self, fn):
+        functools.update_wrapper(self, fn)
+        self._async_fn = fn
+        self._sync_fn = None
+        self._lock = threading.Lock()
+
+    @property
+    def sync_fn(self):
+        if self._sync_fn is None:
+            with self._lock:
+                if self._sync_fn is None:
+                    self._sync_fn = unasync_function(self._async_fn)
+        return self._sync_fn
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        if instance.synchronous:
+            return types.MethodType(self.sync_fn, instance)
+        return types.MethodType(self._async_fn, instance)
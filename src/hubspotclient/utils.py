@@ -1,24 +1,167 @@
-from functools import wraps
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait as wait_futures
 
-import sniffio
+from .unasync import MaybeSync, sync_version
 
 
 def maybe_sync(m):
-    @wraps(m)
-    def _wrapper(*args, **kwargs):
-        coro = m(*args, **kwargs)
-        try:
-            sniffio.current_async_library()
-        except sniffio.AsyncLibraryNotFoundError:
-            pass
-        else:
-            return coro
-
-        result = None
-        try:
-            while True:
-                result = coro.send(result)
-        except StopIteration as si:
-            return si.value
-
-    return _wrapper
+    """
+    Decorate a coroutine method so that it is a coroutine on async clients and
+    a plain synchronous method, generated from the same source, on clients with
+    ``synchronous = True``. See :mod:`~.unasync`.
+    """
+    return MaybeSync(m)
+
+
+def _run_in_context(context, fn, *args):
+    return context.run(fn, *args)
+
+
+def map_bounded_sync(fn, items, limit):
+    """
+    Call ``fn`` on each item on a pool of at most ``limit`` threads and return
+    the results in order. The threads see the caller's context variables
+    (e.g. ``client.context()``).
+    """
+    items = list(items)
+    if not items:
+        return []
+    limit = max(1, min(limit, len(items)))
+    if limit == 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=limit) as executor:
+        futures = [
+            executor.submit(_run_in_context, contextvars.copy_context(), fn, item)
+            for item in items
+        ]
+        return [future.result() for future in futures]
+
+
+@sync_version(map_bounded_sync)
+async def map_bounded(fn, items, limit):
+    """
+    Await ``fn(item)`` for each item with at most ``limit`` of them in flight,
+    and return the results in order.
+    """
+    items = list(items)
+    if not items:
+        return []
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def _bounded(item):
+        async with semaphore:
+            return await fn(item)
+
+    return await asyncio.gather(*(_bounded(item) for item in items))
+
+
+@sync_version(time.sleep)
+async def sleep(seconds):
+    if seconds > 0:
+        await asyncio.sleep(seconds)
+
+
+def _future_result(future, timeout=None):
+    return future.result(timeout)
+
+
+@sync_version(_future_result)
+async def wait_future(future, timeout=None):
+    """
+    Wait for a ``concurrent.futures.Future`` without blocking the loop, for
+    at most ``timeout`` seconds, after which ``concurrent.futures.TimeoutError``
+    is raised and the future is left running.
+    """
+    if timeout is None:
+        return await asyncio.wrap_future(future)
+    try:
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+    except asyncio.TimeoutError:
+        raise FutureTimeoutError() from None
+
+
+class _ThreadTask(object):
+    """Handle on a function running on its own thread, see start_background."""
+
+    __slots__ = ("_future",)
+
+    def __init__(self, fn, args, kwargs):
+        self._future = Future()
+        context = contextvars.copy_context()
+
+        def _run():
+            try:
+                self._future.set_result(context.run(fn, *args, **kwargs))
+            except BaseException as e:
+                self._future.set_exception(e)
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    def result(self):
+        return self._future.result()
+
+    def cancel(self):
+        # the request is already on the wire; its result is just dropped
+        return False
+
+
+def start_background_sync(fn, *args, **kwargs):
+    return _ThreadTask(fn, args, kwargs)
+
+
+@sync_version(start_background_sync)
+def start_background(fn, *args, **kwargs):
+    """
+    Start running ``fn(*args, **kwargs)`` now and return a handle to pass to
+    :func:`wait_background`: an ``asyncio`` task, or a thread for synchronous
+    code.
+    """
+    return asyncio.ensure_future(fn(*args, **kwargs))
+
+
+@sync_version(_ThreadTask.result)
+async def wait_background(task):
+    """Wait for the result of a task from :func:`start_background`."""
+    return await task
+
+
+def wait_first_sync(tasks, timeout=None):
+    done, _ = wait_futures(
+        [task._future for task in tasks], timeout=timeout, return_when=FIRST_COMPLETED
+    )
+    return [task for task in tasks if task._future in done]
+
+
+@sync_version(wait_first_sync)
+async def wait_first(tasks, timeout=None):
+    """
+    Wait until one of the tasks from :func:`start_background` is done, or for
+    ``timeout`` seconds, and return those that are done.
+    """
+    done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    return [task for task in tasks if task in done]
+
+
+def cancel_background(task):
+    """Cancel a task from :func:`start_background` whose result isn't needed."""
+    task.cancel()
+    if isinstance(task, asyncio.Future) and task.done() and not task.cancelled():
+        # retrieve it so asyncio doesn't log "exception was never retrieved"
+        task.exception()
+
+
+def chunked(iterable, size):
+    """Yield lists of at most ``size`` items from ``iterable``."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
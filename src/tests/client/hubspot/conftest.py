@@ -0,0 +1,32 @@
+import pytest
+
+from hubspotclient.client.hubspot.client import HubspotClient
+from hubspotclient.client.hubspot.fake import FakeHubspot
+
+
+@pytest.fixture
+def make_client():
+  """
+  Build a client without rate limiting talking to a ``FakeHubspot`` or to any
+  httpx transport, e.g. ``make_client(fake, AsyncHubspotClient, retry=False)``.
+  """
+  def _make(backend, cls=HubspotClient, **kwargs):
+    transport = backend.transport() if isinstance(backend, FakeHubspot) else backend
+    kwargs.setdefault("rate_limiter", False)
+    return cls(hubspot_auth_token="12345", transport=transport, **kwargs)
+  return _make
+
+
+@pytest.fixture
+def fake_hubspot(make_client):
+  """
+  Seed a ``FakeHubspot`` and build a client of it; returns both, e.g.
+  ``fake, hubspot = fake_hubspot(contacts=30, companies=0, typed_results=True)``.
+  """
+  def _make(contacts=0, companies=None, cls=HubspotClient, **kwargs):
+    seed = {"contacts": contacts}
+    if companies is not None:
+      seed["companies"] = companies
+    fake = FakeHubspot().seed(**seed)
+    return fake, make_client(fake, cls, **kwargs)
+  return _make
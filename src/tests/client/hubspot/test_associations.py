@@ -0,0 +1,135 @@
+import time
+
+import pytest
+
+from hubspotclient.client.hubspot.async_client import HubspotClient as AsyncHubspotClient
+from hubspotclient.client.hubspot.fake import FakeHubspot
+from hubspotclient.client.hubspot.models import Company, Contact
+
+
+ASSOCIATIONS = "POST associations/contacts/companies/batch/read"
+
+
+def _companies_by_name(fake):
+  return {c["properties"]["name"]: c["id"] for c in fake.records("companies")}
+
+
+def test_get_associations_in_chunks_and_cached(fake_hubspot):
+  fake, hubspot = fake_hubspot(contacts=250)
+  contacts = fake.records("contacts")
+  companies = _companies_by_name(fake)
+
+  associations = hubspot.get_associations("contacts", "companies", [c["id"] for c in contacts])
+  assert list(associations) == [c["id"] for c in contacts]
+  for contact in contacts:
+    committee = contact["properties"].get("disease_group_executive_committee")
+    assert associations[contact["id"]] == ([companies[committee]] if committee else [])
+  assert fake.calls[ASSOCIATIONS] == 3
+
+  again = hubspot.get_associations("contacts", "companies", [int(c["id"]) for c in contacts[:10]])
+  assert again == {c["id"]: associations[c["id"]] for c in contacts[:10]}
+  assert fake.calls[ASSOCIATIONS] == 3
+  assert hubspot.association_stats() == {"entries": 250, "hits": 10, "misses": 250}
+
+
+def test_associations_and_properties_have_their_own_breaker_groups(fake_hubspot):
+  fake, hubspot = fake_hubspot(contacts=5)
+  hubspot.get_associations("contacts", "companies", [c["id"] for c in fake.records("contacts")])
+  hubspot.get_property_schema("contacts")
+  hubspot.get_contact_by_email("nobody@example.org")
+
+  assert sorted(hubspot.circuit_breaker_status()) == [
+    "associations/batch",
+    "contacts/search",
+    "properties/objects",
+  ]
+
+
+def test_get_associations_back_from_companies(fake_hubspot):
+  fake, hubspot = fake_hubspot(contacts=100)
+  companies = _companies_by_name(fake)
+
+  members = hubspot.get_associations("companies", "contacts", [companies["INRG"]])
+  expected = [
+    c["id"] for c in fake.records("contacts")
+    if c["properties"].get("disease_group_executive_committee") == "INRG"
+  ]
+  assert expected and members == {companies["INRG"]: expected}
+
+
+def test_chunks_are_read_concurrently(make_client):
+  fake = FakeHubspot(latency=0.05).seed(contacts=400)
+  hubspot = make_client(fake)
+  ids = [c["id"] for c in fake.records("contacts")]
+
+  start = time.monotonic()
+  hubspot.get_associations("contacts", "companies", ids, max_concurrency=4)
+  assert time.monotonic() - start < 4 * 0.05 * 0.75
+  assert fake.calls[ASSOCIATIONS] == 4
+
+
+def test_associations_without_cache(fake_hubspot):
+  fake, hubspot = fake_hubspot(contacts=5, association_ttl=0)
+  ids = [c["id"] for c in fake.records("contacts")]
+  hubspot.get_associations("contacts", "companies", ids)
+  hubspot.get_associations("contacts", "companies", ids)
+  assert fake.calls[ASSOCIATIONS] == 2
+  assert hubspot.association_stats() is None
+
+
+def test_contacts_with_companies_from_records(fake_hubspot):
+  fake, hubspot = fake_hubspot(contacts=200)
+  members = hubspot.get_contacts_by_committee("MaGIC")["results"]
+  assert members
+
+  joined = hubspot.get_contacts_with_companies(members)
+  assert [c["id"] for c in joined] == [m["id"] for m in members]
+  for contact, member in zip(joined, members):
+    assert contact["properties"] == member["properties"]
+    assert [c["properties"]["name"] for c in contact["companies"]] == ["MaGIC"]
+    assert contact["companies"][0]["properties"]["domain"] == "magic.example.org"
+  assert "companies" not in members[0], "the records passed in aren't changed"
+  assert fake.calls[ASSOCIATIONS] == 1
+  assert fake.calls["POST companies/batch/read"] == 1
+  assert fake.calls["POST contacts/batch/read"] == 0
+
+
+def test_contacts_with_companies_from_ids(fake_hubspot):
+  fake, hubspot = fake_hubspot(contacts=30)
+  contacts = fake.records("contacts")
+  ids = [c["id"] for c in contacts] + ["999999"]
+
+  joined = hubspot.get_contacts_with_companies(ids, properties=["email"])
+  assert [c["id"] for c in joined] == [c["id"] for c in contacts]
+  for contact, stored in zip(joined, contacts):
+    assert contact["properties"]["email"] == stored["properties"]["email"]
+    committee = stored["properties"].get("disease_group_executive_committee")
+    assert [c["properties"]["name"] for c in contact["companies"]] == ([committee] if committee else [])
+  assert fake.calls["POST contacts/batch/read"] == 1
+  assert fake.calls[ASSOCIATIONS] == 1
+  assert fake.calls["POST companies/batch/read"] == 1
+
+
+def test_typed_contacts_with_companies(fake_hubspot):
+  fake, hubspot = fake_hubspot(contacts=40, typed_results=True)
+  members = hubspot.get_contacts_by_committee("INRG")
+
+  joined = hubspot.get_contacts_with_companies(members)
+  assert all(isinstance(contact, Contact) for contact in joined)
+  company = joined[0].companies[0]
+  assert isinstance(company, Company) and company.name == "INRG"
+  assert Contact.from_json(joined[0].to_json()) == joined[0]
+  assert members.results[0].companies is None
+
+
+@pytest.mark.asyncio
+async def test_async_contacts_with_companies(make_client):
+  fake = FakeHubspot(latency=0.01).seed(contacts=60)
+  hubspot = make_client(fake, cls=AsyncHubspotClient)
+  contacts = fake.records("contacts")
+
+  joined = await hubspot.get_contacts_with_companies([c["id"] for c in contacts])
+  assert len(joined) == 60
+  for contact, stored in zip(joined, contacts):
+    committee = stored["properties"].get("disease_group_executive_committee")
+    assert [c["properties"]["name"] for c in contact["companies"]] == ([committee] if committee else [])
@@ -0,0 +1,170 @@
+import json
+
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot.async_client import HubspotClient
+from hubspotclient.client.hubspot.errors import HubspotError
+from hubspotclient.client.hubspot.fake import FakeHubspot
+from hubspotclient.utils import map_bounded_sync
+
+
+CONTACTS = {
+  "luca@example.org": "9601",
+  "debra@example.org": "52551",
+  "dup@example.org": "9601",
+}
+
+
+def _batch_read(request):
+  body = json.loads(request.content)
+  assert body["idProperty"] == "email"
+  assert "email" in body["properties"]
+  results, missing = [], []
+  for item in body["inputs"]:
+    if item["id"].lower() in CONTACTS:
+      results.append({"id": CONTACTS[item["id"].lower()], "properties": {"email": item["id"].lower()}})
+    else:
+      missing.append(item["id"])
+  data = {"status": "COMPLETE", "results": results}
+  if missing:
+    data["errors"] = [{"status": "error", "category": "OBJECT_NOT_FOUND", "context": {"ids": missing}}]
+    return httpx.Response(207, json=data)
+  return httpx.Response(200, json=data)
+
+
+@pytest.mark.asyncio
+async def test_get_contacts_by_emails():
+  requests = []
+
+  def handler(request):
+    requests.append(request)
+    return _batch_read(request)
+
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=httpx.MockTransport(handler))
+  emails = ["Luca@example.org", "debra@example.org"] + ["nobody{}@example.org".format(i) for i in range(150)]
+  response = await hubspot.get_contacts_by_emails(emails)
+
+  assert len(requests) == 2, "emails should be chunked to the batch limit"
+  assert response["Luca@example.org"]["id"] == "9601"
+  assert response["debra@example.org"]["id"] == "52551"
+  assert response["nobody0@example.org"] is None
+  assert len(response) == len(emails)
+
+
+@pytest.mark.asyncio
+async def test_get_contacts_by_emails_error():
+  def handler(request):
+    return httpx.Response(400, json={"status": "error", "message": "bad input"})
+
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=httpx.MockTransport(handler))
+  with pytest.raises(HubspotError) as e:
+    await hubspot.get_contacts_by_emails(["a@example.org"])
+  assert "bad input" in e.value.message
+
+
+def test_map_bounded_sync():
+  assert map_bounded_sync(lambda n: n * n, range(10), 3) == [n * n for n in range(10)]
+
+
+def _batch_write(request):
+  body = json.loads(request.content)
+  inputs = body["inputs"]
+  if request.url.path.endswith("/batch/read"):
+    return _batch_read(request)
+  if request.url.path.endswith("/batch/create"):
+    if any(item["properties"]["email"] == "dup@example.org" for item in inputs):
+      return httpx.Response(409, json={"status": "error", "message": "Contact already exists. Existing ID: 9601", "category": "CONFLICT"})
+    results = [{"id": str(1000 + i), "properties": item["properties"]} for i, item in enumerate(inputs)]
+    return httpx.Response(201, json={"status": "COMPLETE", "results": list(reversed(results))})
+  if request.url.path.endswith("/batch/upsert"):
+    results = [{"id": "1", "properties": item["properties"], "new": item["id"] != "luca@example.org"} for item in inputs]
+    return httpx.Response(200, json={"status": "COMPLETE", "results": results})
+  results = [{"id": item["id"], "properties": item["properties"]} for item in inputs if item["id"] != "404"]
+  errors = [{"status": "error", "category": "OBJECT_NOT_FOUND", "message": "not found", "context": {"ids": ["404"]}}]
+  return httpx.Response(207, json={"status": "COMPLETE", "results": results, "errors": errors})
+
+
+@pytest.mark.asyncio
+async def test_create_contacts_isolates_conflicts():
+  requests = []
+
+  def handler(request):
+    requests.append(request)
+    return _batch_write(request)
+
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=httpx.MockTransport(handler))
+  records = [{"email": "user{}@example.org".format(i)} for i in range(8)]
+  records.insert(3, {"email": "dup@example.org"})
+  results = await hubspot.create_contacts(records)
+
+  assert [result.input for result in results] == records
+  assert results[3].status == "conflict" and results[3].id == "9601"
+  assert all(result.status == "created" for i, result in enumerate(results) if i != 3)
+  assert results[0].record["properties"]["email"] == "user0@example.org"
+  assert len(requests) == 3, "create, look up the existing contact, create the others"
+
+
+@pytest.mark.asyncio
+async def test_create_contacts_resolves_many_conflicts_at_once():
+  fake = FakeHubspot().seed(contacts=0)
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=fake.transport(), rate_limiter=False)
+  records = [{"email": "user{}@example.org".format(i)} for i in range(100)]
+  existing = {}
+  for record in records[::10] + records[5::10] + records[7::10]:
+    existing[record["email"]] = fake.add("contacts", dict(record))["id"]
+  fake.calls.clear()
+
+  results = await hubspot.create_contacts(records)
+
+  assert sum(fake.calls.values()) == 3
+  assert fake.calls["POST contacts/batch/create"] == 2
+  assert fake.calls["POST contacts/batch/read"] == 1
+  for record, result in zip(records, results):
+    if record["email"] in existing:
+      assert result.status == "conflict" and result.id == existing[record["email"]]
+      assert result.code == 409
+    else:
+      assert result.status == "created"
+  assert fake.count("contacts") == 100
+
+
+@pytest.mark.asyncio
+async def test_create_contacts_splits_only_invalid_chunks():
+  requests = []
+  forbidden = []
+
+  def handler(request):
+    inputs = json.loads(request.content)["inputs"]
+    requests.append(len(inputs))
+    if forbidden:
+      return httpx.Response(403, json={"status": "error", "message": "missing scopes"})
+    if any("@" not in item["properties"]["email"] for item in inputs):
+      return httpx.Response(400, json={"status": "error", "message": "invalid email"})
+    results = [{"id": str(i), "properties": item["properties"]} for i, item in enumerate(inputs)]
+    return httpx.Response(201, json={"status": "COMPLETE", "results": results})
+
+  records = [{"email": "user{}@example.org".format(i)} for i in range(8)]
+  records[5] = {"email": "not an email"}
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=httpx.MockTransport(handler))
+  results = await hubspot.create_contacts(records)
+  assert [result.status for result in results] == ["created"] * 5 + ["error"] + ["created"] * 2
+  assert results[5].code == 400 and len(requests) == 7
+
+  del requests[:]
+  forbidden.append(True)
+  results = await hubspot.create_contacts(records * 10)
+  assert requests == [80], "a 403 fails every half again: don't split"
+  assert all(result.status == "error" and result.code == 403 for result in results)
+
+
+@pytest.mark.asyncio
+async def test_update_and_upsert_contacts():
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=httpx.MockTransport(_batch_write))
+
+  results = await hubspot.update_contacts([("9601", {"firstname": "Luca"}), ("404", {"firstname": "Nobody"})])
+  assert [result.status for result in results] == ["updated", "error"]
+  assert results[1].error == "not found"
+
+  results = await hubspot.upsert_contacts([{"email": "luca@example.org"}, {"email": "new@example.org"}])
+  assert [result.status for result in results] == ["updated", "created"]
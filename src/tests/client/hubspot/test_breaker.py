@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+import pytest
+
+from hubspotclient.client.hubspot.async_client import HubspotClient
+from hubspotclient.client.hubspot.breaker import CircuitBreaker, endpoint_group
+from hubspotclient.client.hubspot.errors import HubspotCircuitOpenError, HubspotUnhealthyError
+from hubspotclient.client.hubspot.fake import FakeHubspot
+
+
+BASE = "https://api.hubapi.com/crm/v3/objects"
+OPTIONS = {"min_requests": 4, "failure_rate": 0.5, "open_seconds": 0.05, "half_open_probes": 2}
+
+
+def test_endpoint_group():
+  assert endpoint_group(BASE + "/contacts/search", BASE) == "contacts/search"
+  assert endpoint_group(BASE + "/contacts/batch/read", BASE) == "contacts/batch"
+  assert endpoint_group(BASE + "/contacts/9601", BASE) == "contacts/objects"
+  assert endpoint_group(BASE + "/companies", BASE) == "companies/objects"
+  crm = "https://api.hubapi.com/crm/v3"
+  assert endpoint_group(crm + "/associations/contacts/companies/batch/read", BASE) == "associations/batch"
+  assert endpoint_group(crm + "/properties/contacts", BASE) == "properties/objects"
+
+
+def test_breaker_states():
+  breaker = CircuitBreaker("contacts/search", **OPTIONS)
+  for failed in (False, True, True):
+    breaker.acquire()
+    breaker.record(failed, 0.01)
+  assert breaker.status()["state"] == "closed", "not enough requests yet"
+  breaker.acquire()
+  breaker.record(True, 0.01)
+  assert breaker.status()["state"] == "open"
+  with pytest.raises(HubspotCircuitOpenError) as e:
+    breaker.acquire()
+  assert isinstance(e.value, HubspotUnhealthyError) and e.value.group == "contacts/search"
+
+  time.sleep(0.06)
+  breaker.acquire()
+  breaker.acquire()
+  with pytest.raises(HubspotCircuitOpenError):
+    breaker.acquire()  # only two probes at a time
+  breaker.record(False, 0.01)
+  breaker.record(True, 0.01)
+  assert breaker.status()["state"] == "open", "a failed probe opens it again"
+
+  time.sleep(0.06)
+  for _ in range(2):
+    breaker.acquire()
+    breaker.record(False, 0.01)
+  assert breaker.status() == dict(
+    breaker.status(), state="closed", requests=0, times_opened=2
+  )
+
+
+def test_slow_calls_trip_the_breaker():
+  breaker = CircuitBreaker("contacts/objects", min_requests=2, slow_call_seconds=0.5, slow_rate=1.0)
+  for _ in range(2):
+    breaker.acquire()
+    breaker.record(False, 0.6)
+  assert breaker.status()["state"] == "open"
+
+
+@pytest.mark.asyncio
+async def test_client_fails_fast_per_group():
+  fake = FakeHubspot(error_rate=1.0)
+  hubspot = HubspotClient(
+    hubspot_auth_token="12345",
+    transport=fake.transport(),
+    rate_limiter=False,
+    retry=False,
+    circuit_breaker=OPTIONS,
+  )
+  responses = await asyncio.gather(*(hubspot.get_contacts_by_committee("INRG") for _ in range(4)))
+  assert [r["category"] for r in responses] == ["INTERNAL_ERROR"] * 4
+
+  with pytest.raises(HubspotCircuitOpenError):
+    await hubspot.get_contacts_by_committee("INRG")
+  assert fake.calls["POST contacts/search"] == 4, "no request sent while open"
+
+  fake.error_rate = 0.0
+  assert (await hubspot.get_commitees_info("INRG"))["total"] == 0, "other groups are unaffected"
+
+  status = hubspot.circuit_breaker_status()
+  assert status["contacts/search"]["state"] == "open" and status["contacts/search"]["rejected"] == 1
+  assert status["companies/search"]["state"] == "closed"
+
+  await asyncio.sleep(0.06)
+  for _ in range(2):
+    await hubspot.get_contacts_by_committee("INRG")
+  assert hubspot.circuit_breaker_status()["contacts/search"]["state"] == "closed"
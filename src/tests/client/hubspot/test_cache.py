@@ -0,0 +1,82 @@
+import json
+
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot.async_client import HubspotClient
+from hubspotclient.client.hubspot.cache import InMemoryCacheBackend, ResponseCache
+
+
+def _transport(requests):
+  def handler(request):
+    requests.append(request)
+    body = json.loads(request.content)
+    if request.method == "PATCH":
+      return httpx.Response(200, json={"id": "9601", "properties": body["properties"]})
+    if request.url.path.endswith("/contacts"):
+      return httpx.Response(201, json={"id": "61051", "properties": body["properties"]})
+    value = body["filterGroups"][0]["filters"][0]["value"]
+    if value in ("luca@example.org", "FAKE Executive Committee Member"):
+      return httpx.Response(200, json={"total": 1, "results": [{"id": "9601", "properties": {}}]})
+    return httpx.Response(200, json={"total": 0, "results": []})
+  return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_reads_are_cached_and_invalidated_by_writes():
+  requests = []
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=_transport(requests), cache=True)
+
+  first = await hubspot.get_contact_by_email("luca@example.org")
+  first["results"].clear()
+  second = await hubspot.get_contact_by_email("Luca@example.org")
+  assert len(requests) == 1
+  assert second["results"][0]["id"] == "9601", "cached values must not be shared with callers"
+
+  await hubspot.get_contacts_by_committee("FAKE Executive Committee Member")
+  await hubspot.get_contacts_by_committee("FAKE Executive Committee Member")
+  assert len(requests) == 2
+
+  await hubspot.update_contact("9601", {"firstname": "Luca"})
+  await hubspot.get_contact_by_email("luca@example.org")
+  await hubspot.get_contacts_by_committee("FAKE Executive Committee Member")
+  assert len(requests) == 5
+
+  stats = hubspot.cache_stats()
+  assert stats["hits"] == 2 and stats["misses"] == 4 and stats["invalidations"] == 2
+
+
+@pytest.mark.asyncio
+async def test_not_found_is_cached_until_contact_is_created():
+  requests = []
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=_transport(requests), cache=True)
+
+  await hubspot.get_contact_by_email("new@example.org")
+  await hubspot.get_contact_by_email("new@example.org")
+  assert len(requests) == 1
+  assert hubspot.cache_stats()["negative_hits"] == 1
+
+  await hubspot.create_contact({"email": "new@example.org"})
+  await hubspot.get_contact_by_email("new@example.org")
+  assert len(requests) == 3
+
+
+def test_in_memory_backend_lru_and_ttl():
+  backend = InMemoryCacheBackend(max_entries=2)
+  backend.set("a", 1, 60)
+  backend.set("b", 2, 60)
+  backend.get("a")
+  backend.set("c", 3, 60)
+  assert backend.get("b") is None
+  assert backend.get("a") == 1 and backend.get("c") == 3
+  assert backend.stats()["evictions"] == 1
+
+  backend.set("d", 4, 0)
+  assert backend.get("d") is None
+  assert backend.stats()["expirations"] == 1
+
+
+def test_method_ttl_can_be_disabled():
+  cache = ResponseCache(ttls={"get_commitees_info": 0})
+  cache.set("get_commitees_info", ("INSTRuCT",), {"total": 1, "results": [{}]})
+  assert cache.get("get_commitees_info", "INSTRuCT") == (False, None)
@@ -0,0 +1,116 @@
+import pytest
+
+from hubspotclient.client.hubspot import base
+from hubspotclient.client.hubspot import fake as fake_module
+from hubspotclient.client.hubspot.async_client import HubspotClient as AsyncHubspotClient
+from hubspotclient.client.hubspot.changes import (
+  FileCheckpoint,
+  MemoryCheckpoint,
+  Watermark,
+  timestamp_ms,
+)
+from hubspotclient.client.hubspot.errors import HubspotError
+from hubspotclient.client.hubspot.fake import FakeHubspot
+
+
+def test_timestamp_ms():
+  assert timestamp_ms("2021-07-28T20:52:30.963Z") == 1627505550963
+  assert timestamp_ms("1627505550963") == 1627505550963
+  assert timestamp_ms(None) == 0
+
+
+def test_watermark_skips_what_was_seen():
+  watermark = Watermark()
+  watermark.advance("1", 1000)
+  watermark.advance("2", 1000)
+  assert not watermark.is_new("1", 1000)
+  assert watermark.is_new("1", 1001), "modified again"
+  assert watermark.is_new("3", 1000)
+  watermark.advance("1", 2000)
+  assert watermark.to_state()["seen"] == {"1": 2000}
+  assert Watermark(5000, overlap=2).search_from() == 3000
+
+
+def test_iter_changes_incremental(fake_hubspot):
+  fake, hubspot = fake_hubspot(contacts=30)
+  checkpoint = MemoryCheckpoint()
+
+  first = list(hubspot.iter_changes("contacts", checkpoint, ["email"], page_size=7))
+  assert len(first) == 30
+  stamps = [c["properties"]["lastmodifieddate"] for c in first]
+  assert stamps == sorted(stamps)
+  assert list(hubspot.iter_changes("contacts", checkpoint)) == []
+
+  changed = first[3]["id"]
+  hubspot.update_contact(changed, {"firstname": "Changed"})
+  again = list(hubspot.iter_changes("contacts", checkpoint, ["firstname"]))
+  assert [(c["id"], c["properties"]["firstname"]) for c in again] == [(changed, "Changed")]
+  assert checkpoint.load()["seen"] == {changed: timestamp_ms(again[0]["properties"]["lastmodifieddate"])}
+
+
+def test_iter_changes_resumes_inside_a_timestamp(tmp_path, make_client):
+  fake = FakeHubspot().seed(contacts=5, companies=0)
+  for i in range(12):
+    fake.add("contacts", {"email": "tie{}@example.org".format(i)}, created_at=1700000000.0)
+  hubspot = make_client(fake)
+  checkpoint = FileCheckpoint(str(tmp_path / "contacts.json"))
+
+  seen = []
+  with pytest.raises(RuntimeError):
+    for contact in hubspot.iter_changes("contacts", checkpoint, page_size=4):
+      if len(seen) == 9:
+        raise RuntimeError("crash while handling the 10th change")
+      seen.append(contact["id"])
+
+  # a new process, reading the same file
+  resumed = [
+    c["id"] for c in hubspot.iter_changes("contacts", FileCheckpoint(checkpoint.path), page_size=4)
+  ]
+  assert sorted(seen + resumed) == sorted(c["id"] for c in fake.records("contacts"))
+  assert len(set(seen + resumed)) == 17
+
+
+def test_iter_changes_search_error_keeps_progress(fake_hubspot):
+  fake, hubspot = fake_hubspot(contacts=30, companies=0)
+  checkpoint = MemoryCheckpoint()
+
+  seen = []
+  with pytest.raises(HubspotError) as error:
+    for contact in hubspot.iter_changes("contacts", checkpoint, page_size=10, retry=False):
+      seen.append(contact["id"])
+      if len(seen) == 5:
+        # the second page is already fetched, the third one fails
+        fake.fail_next(400)
+  assert error.value.code == 400
+
+  resumed = [c["id"] for c in hubspot.iter_changes("contacts", checkpoint)]
+  assert sorted(seen + resumed) == sorted(c["id"] for c in fake.records("contacts"))
+
+
+@pytest.mark.asyncio
+async def test_iter_changes_restarts_before_the_result_limit(monkeypatch, fake_hubspot):
+  monkeypatch.setattr(base, "SEARCH_RESULT_LIMIT", 20)
+  monkeypatch.setattr(fake_module, "SEARCH_RESULT_LIMIT", 20)
+  fake, hubspot = fake_hubspot(contacts=45, companies=0, cls=AsyncHubspotClient)
+
+  ids = [c["id"] async for c in hubspot.iter_changes("contacts", page_size=10)]
+
+  assert ids == [c["id"] for c in fake.records("contacts")]
+
+
+def test_iter_changes_misses_nothing_modified_during_the_sync(fake_hubspot):
+  fake, hubspot = fake_hubspot(contacts=60, companies=0)
+  checkpoint = MemoryCheckpoint()
+  ids = [c["id"] for c in fake.records("contacts")]
+
+  delivered = []
+  for contact in hubspot.iter_changes("contacts", checkpoint, page_size=10):
+    delivered.append(contact["id"])
+    if len(delivered) % 10 == 5:
+      # moves a contact not yet delivered to the end of the sort order
+      pending = [i for i in ids if i not in delivered]
+      if pending:
+        hubspot.update_contact(pending[0], {"firstname": "Moved"})
+
+  assert set(delivered) == set(ids)
+  assert list(hubspot.iter_changes("contacts", checkpoint)) == []
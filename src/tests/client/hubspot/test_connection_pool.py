@@ -0,0 +1,51 @@
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot.async_client import HubspotClient
+
+
+def _transport(calls):
+  def handler(request):
+    calls.append(request)
+    return httpx.Response(200, json={"total": 0, "results": []})
+  return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_pooled_client_is_reused():
+  calls = []
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=_transport(calls))
+
+  await hubspot.get_contact_by_email("a@example.org")
+  first = hubspot._pool.client
+  await hubspot.get_contact_by_email("b@example.org")
+
+  assert hubspot._pool.client is first
+  assert len(calls) == 2
+  await hubspot.close()
+
+
+@pytest.mark.asyncio
+async def test_close_and_reopen():
+  calls = []
+  async with HubspotClient(hubspot_auth_token="12345", transport=_transport(calls)) as hubspot:
+    await hubspot.get_contact_by_email("a@example.org")
+    first = hubspot._pool.client
+
+  assert first.is_closed
+  assert not hubspot._pool.is_open
+
+  await hubspot.get_contact_by_email("a@example.org")
+  assert hubspot._pool.client is not first
+  await hubspot.close()
+
+
+def test_pool_is_dropped_after_fork():
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=_transport([]))
+  first = hubspot._pool.client
+
+  # what the os.register_at_fork hook does in the child process
+  hubspot._pool._forget()
+
+  assert hubspot._pool.client is not first
+  assert not first.is_closed
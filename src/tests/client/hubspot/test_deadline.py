@@ -0,0 +1,190 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot import client as sync_client
+from hubspotclient.client.hubspot.async_client import HubspotClient
+from hubspotclient.client.hubspot.deadline import Deadline, as_deadline, cap_timeout, earliest
+from hubspotclient.client.hubspot.errors import HubspotDeadlineError, HubspotUnhealthyError
+from hubspotclient.client.hubspot.retry import RetryPolicy
+
+
+OK = {"total": 0, "results": []}
+SEARCH = "https://api.hubapi.com/crm/v3/objects/contacts/search"
+
+
+def _client(outcomes, seen, client_class=HubspotClient, **kwargs):
+  """A client whose transport records the read timeout of every request."""
+  outcomes = list(outcomes)
+
+  def handler(request):
+    seen.append(request.extensions["timeout"]["read"])
+    outcome = outcomes.pop(0) if len(outcomes) > 1 else outcomes[0]
+    if isinstance(outcome, Exception):
+      raise outcome
+    return httpx.Response(outcome, json=OK if outcome < 400 else {"status": "error", "message": "nope"})
+
+  kwargs.setdefault("retry", RetryPolicy(base_delay=0.001, max_delay=0.01, budget=None))
+  return client_class(
+    hubspot_auth_token="12345",
+    transport=httpx.MockTransport(handler),
+    rate_limiter=False,
+    **kwargs
+  )
+
+
+def test_deadline_helpers():
+  assert as_deadline(None) is None
+  deadline = as_deadline(2)
+  assert 1.9 < deadline.remaining() <= 2
+  assert as_deadline(deadline) is deadline
+  assert earliest(None, deadline, Deadline.after(5)) is deadline
+  assert earliest(None, None) is None
+  assert deadline.fits(1) and not deadline.fits(2)
+  assert not Deadline.after(-1).fits(0)
+
+  assert cap_timeout(10, 2) == 2
+  assert cap_timeout(None, 2) == 2
+  timeout = cap_timeout(httpx.Timeout(10, connect=1), 2)
+  assert (timeout.connect, timeout.read) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_attempt_timeout_is_cut_to_the_time_left():
+  seen = []
+  hubspot = _client([200], seen, timeout=10)
+  await hubspot.request("post", SEARCH, json={}, deadline=0.5)
+  await hubspot.request("post", SEARCH, json={}, deadline=60)
+  assert 0 < seen[0] <= 0.5
+  assert seen[1] == 10
+
+
+@pytest.mark.asyncio
+async def test_nested_contexts_keep_the_earliest_deadline():
+  seen = []
+  hubspot = _client([200], seen, timeout=10)
+  with hubspot.context(deadline=0.5):
+    with hubspot.context(deadline=30):
+      await hubspot.request("post", SEARCH, json={})
+    await hubspot.request("post", SEARCH, json={}, deadline=30)
+  assert len(seen) == 2 and all(timeout <= 0.5 for timeout in seen)
+
+
+@pytest.mark.asyncio
+async def test_expired_deadline_sends_nothing():
+  seen = []
+  hubspot = _client([200], seen)
+  with pytest.raises(HubspotDeadlineError) as e:
+    await hubspot.request("post", SEARCH, json={}, deadline=-1)
+  assert e.value.code == 504
+  assert isinstance(e.value, HubspotUnhealthyError)
+  assert seen == []
+
+
+@pytest.mark.asyncio
+async def test_no_retry_that_cannot_fit():
+  seen = []
+  policy = RetryPolicy(base_delay=0.5, max_delay=1, budget=None)
+  hubspot = _client([503, 200], seen, retry=policy)
+  response = await hubspot.request("post", SEARCH, json={}, deadline=0.3)
+  assert response.code == 503
+  assert len(seen) == 1
+
+  seen[:] = []
+  hubspot = _client([503, 200], seen, retry=policy)
+  response = await hubspot.request("post", SEARCH, json={}, deadline=5)
+  assert response.code == 200
+  assert len(seen) == 2
+
+
+@pytest.mark.asyncio
+async def test_timeout_cut_by_the_deadline_raises_deadline_error():
+  seen = []
+  hubspot = _client([httpx.ReadTimeout("slow")], seen, timeout=10)
+  with pytest.raises(HubspotDeadlineError):
+    await hubspot.request("post", SEARCH, json={}, deadline=0.2)
+
+  # a timeout the deadline didn't cut is reported as before
+  hubspot = _client([httpx.ReadTimeout("slow")], seen, timeout=1, retry=False)
+  with pytest.raises(httpx.ReadTimeout):
+    await hubspot.request("post", SEARCH, json={}, deadline=60)
+
+
+@pytest.mark.asyncio
+async def test_batch_chunks_share_one_deadline():
+  async def handler(request):
+    await asyncio.sleep(0.15)
+    return httpx.Response(200, json={"results": []})
+
+  hubspot = HubspotClient(
+    hubspot_auth_token="12345", transport=httpx.MockTransport(handler), rate_limiter=False
+  )
+  emails = ["{}@example.org".format(i) for i in range(250)]
+  with pytest.raises(HubspotDeadlineError):
+    await hubspot.get_contacts_by_emails(emails, max_concurrency=1, deadline=0.25)
+  result = await hubspot.get_contacts_by_emails(emails, max_concurrency=1, deadline=5)
+  assert len(result) == 250
+
+
+@pytest.mark.asyncio
+async def test_coalesced_read_waits_no_longer_than_its_deadline():
+  requests = []
+
+  async def handler(request):
+    requests.append(request)
+    await asyncio.sleep(0.6)
+    return httpx.Response(200, json=OK)
+
+  hubspot = HubspotClient(
+    hubspot_auth_token="12345", transport=httpx.MockTransport(handler), rate_limiter=False
+  )
+  leader = asyncio.ensure_future(hubspot.request("post", SEARCH, json={}))
+  await asyncio.sleep(0.05)
+
+  started = asyncio.get_event_loop().time()
+  with pytest.raises(HubspotDeadlineError):
+    await hubspot.request("post", SEARCH, json={}, deadline=0.2)
+  assert asyncio.get_event_loop().time() - started < 0.4
+
+  # the shared request carries on for the callers still waiting
+  assert (await leader).json == OK
+  assert len(requests) == 1
+
+
+def test_coalesced_read_waits_no_longer_than_its_deadline_sync():
+  requests = []
+
+  def handler(request):
+    requests.append(request)
+    time.sleep(0.6)
+    return httpx.Response(200, json=OK)
+
+  hubspot = sync_client.HubspotClient(
+    hubspot_auth_token="12345", transport=httpx.MockTransport(handler), rate_limiter=False
+  )
+  leader = threading.Thread(target=hubspot.request, args=("post", SEARCH), kwargs={"json": {}})
+  leader.start()
+  time.sleep(0.05)
+
+  started = time.monotonic()
+  with pytest.raises(HubspotDeadlineError):
+    hubspot.request("post", SEARCH, json={}, deadline=0.2)
+  assert time.monotonic() - started < 0.4
+  leader.join()
+  assert len(requests) == 1
+
+
+def test_fan_out_calls_see_the_context_deadline():
+  seen = []
+  hubspot = _client([200], seen, client_class=sync_client.HubspotClient, timeout=10)
+  with hubspot.context(deadline=0.5):
+    results = hubspot.map(hubspot.get_contact_by_email, ["a@x.org", "b@x.org", "c@x.org"])
+  assert all(result.ok for result in results)
+  assert len(seen) == 3 and all(timeout <= 0.5 for timeout in seen)
+
+  with hubspot.context(deadline=-1):
+    results = hubspot.map(hubspot.get_contact_by_email, ["d@x.org"])
+  assert isinstance(results[0].error, HubspotDeadlineError)
@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from hubspotclient.client.hubspot.async_client import HubspotClient
+from hubspotclient.client.hubspot.errors import HubspotError
+from hubspotclient.client.hubspot.events import EventListener, endpoint_of
+from hubspotclient.client.hubspot.fake import FakeHubspot
+from hubspotclient.client.hubspot.metrics import MetricsCollector
+from hubspotclient.client.hubspot.ratelimit import RateLimiter
+
+
+class Recorder(EventListener):
+  def __init__(self):
+    self.events = []
+
+  def on_request_start(self, event):
+    self.events.append(("start", event.endpoint))
+
+  def on_response(self, event):
+    self.events.append(("response", event.status))
+
+  def on_retry(self, event):
+    self.events.append(("retry", event.attempt))
+
+  def on_give_up(self, event):
+    self.events.append(("give_up", event.status))
+
+  def on_request_end(self, event):
+    self.events.append(("end", event.attempt))
+
+  def on_cache_hit(self, method, args):
+    self.events.append(("cache_hit", method))
+
+
+class Broken(EventListener):
+  def on_response(self, event):
+    raise RuntimeError("listener bug")
+
+
+def test_endpoint_of():
+  base = "https://api.hubapi.com/crm/v3/objects"
+  assert endpoint_of(base + "/contacts/search", base) == "contacts/search"
+  assert endpoint_of(base + "/contacts/9601", base) == "contacts/{id}"
+  assert endpoint_of(base + "/contacts/a@example.org", base) == "contacts/{id}"
+  crm = "https://api.hubapi.com/crm/v3"
+  assert endpoint_of(crm + "/associations/contacts/companies/batch/read", base) == (
+    "associations/contacts/companies/batch/read"
+  )
+  assert endpoint_of(crm + "/properties/contacts?archived=false", base) == "properties/contacts"
+
+
+@pytest.mark.asyncio
+async def test_request_lifecycle():
+  fake = FakeHubspot()
+  recorder = Recorder()
+  hubspot = HubspotClient(
+    hubspot_auth_token="12345",
+    transport=fake.transport(),
+    rate_limiter=RateLimiter(),
+    retry={"base_delay": 0.01},
+    cache=True,
+    listeners=[Broken(), recorder],
+  )
+
+  fake.fail_next(429, retry_after=0.01)
+  await hubspot.get_contact_by_email("nobody@example.org")
+  assert recorder.events == [
+    ("start", "contacts/search"),
+    ("response", 429),
+    ("retry", 1),
+    ("response", 200),
+    ("end", 2),
+  ]
+
+  del recorder.events[:]
+  await hubspot.get_contact_by_email("nobody@example.org")
+  assert recorder.events == [("cache_hit", "get_contact_by_email")]
+
+  hubspot.remove_listener(recorder)
+  await hubspot.get_contacts_by_committee("INRG")
+  assert recorder.events == [("cache_hit", "get_contact_by_email")]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_ends():
+  recorder = Recorder()
+  hubspot = HubspotClient(
+    hubspot_auth_token="12345",
+    transport=FakeHubspot(latency=1).transport(),
+    rate_limiter=False,
+    listeners=[recorder],
+  )
+
+  task = asyncio.ensure_future(hubspot.get_contacts_by_committee("INRG"))
+  await asyncio.sleep(0.05)
+  task.cancel()
+  with pytest.raises(asyncio.CancelledError):
+    await task
+  assert recorder.events == [("start", "contacts/search"), ("end", 1)]
+
+
+@pytest.mark.asyncio
+async def test_metrics_collector():
+  fake = FakeHubspot(rate_limit=(100, 10)).seed(contacts=20)
+  metrics = MetricsCollector()
+  hubspot = HubspotClient(
+    hubspot_auth_token="12345",
+    transport=fake.transport(),
+    rate_limiter=RateLimiter(),
+    retry={"base_delay": 0.01},
+    listeners=[metrics],
+  )
+
+  for _ in range(3):
+    await hubspot.get_contacts_by_committee("INRG")
+  fake.fail_next(429, count=4, retry_after=0)
+  with pytest.raises(HubspotError):
+    await hubspot.update_contact("1010", {"firstname": "Luca"})
+
+  snapshot = metrics.snapshot()
+  search = snapshot["requests"]["POST contacts/search"]
+  assert search["count"] == 3 and search["statuses"] == {200: 3}
+  assert search["received_bytes"] > 0 and search["sent_bytes"] > 0
+  update = snapshot["requests"]["PATCH contacts/{id}"]
+  assert update["statuses"] == {429: 4}
+  assert update["retries"] == 3 and update["give_ups"] == 1
+  assert snapshot["errors"] == {"PATCH contacts/{id} 429": 4}
+  assert snapshot["rate_limit_remaining"] == 97
+
+  text = metrics.to_prometheus()
+  assert '# TYPE hubspot_request_duration_seconds histogram' in text
+  assert 'hubspot_request_duration_seconds_count{endpoint="contacts/search",method="POST"} 3' in text
+  assert 'hubspot_request_duration_seconds_bucket{endpoint="contacts/search",le="+Inf",method="POST"} 3' in text
+  assert 'hubspot_retries_total{endpoint="contacts/{id}",method="PATCH"} 3' in text
+  assert 'hubspot_responses_total{endpoint="contacts/{id}",method="PATCH",status="429"} 4' in text
+
+
+@pytest.mark.asyncio
+async def test_opentelemetry_spans():
+  pytest.importorskip("opentelemetry.sdk")
+  from opentelemetry.sdk.trace import TracerProvider
+  from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+  from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+  from hubspotclient.client.hubspot.tracing import OpenTelemetryListener
+
+  exporter = InMemorySpanExporter()
+  provider = TracerProvider()
+  provider.add_span_processor(SimpleSpanProcessor(exporter))
+  hubspot = HubspotClient(
+    hubspot_auth_token="12345",
+    transport=FakeHubspot().transport(),
+    rate_limiter=False,
+    listeners=[OpenTelemetryListener(provider.get_tracer("test"))],
+  )
+  await hubspot.get_contact_by_email("nobody@example.org")
+  span, = exporter.get_finished_spans()
+  assert span.name == "HubSpot POST contacts/search"
+  assert span.attributes["http.status_code"] == 200
@@ -0,0 +1,101 @@
+import csv
+import json
+import os
+
+import httpx
+import pytest
+
+from hubspotclient import cli
+from hubspotclient.client.hubspot.async_client import HubspotClient as AsyncHubspotClient
+from hubspotclient.client.hubspot.errors import HubspotError
+from hubspotclient.client.hubspot.export import split_range
+from hubspotclient.client.hubspot.fake import FakeHubspot, FakeHubspotTransport
+
+
+class _FailingTransport(FakeHubspotTransport):
+  """Fails the search requests after the first ``searches``."""
+
+  def __init__(self, fake, searches):
+    super(_FailingTransport, self).__init__(fake)
+    self.searches = searches
+
+  def handle_request(self, request):
+    if request.url.path.endswith("/search"):
+      self.searches -= 1
+      if self.searches < 0:
+        return httpx.Response(400, json={"status": "error", "message": "boom"})
+    return super(_FailingTransport, self).handle_request(request)
+
+
+def test_split_range():
+  assert split_range(1, 100, 4) == [(None, 26), (26, 51), (51, 76), (76, None)]
+  assert split_range(5, 6, 4) == [(None, 6), (6, None)]
+  assert split_range(5, 5, 1) == [(None, None)]
+
+
+def test_export_ndjson_in_partitions(tmp_path, make_client):
+  fake = FakeHubspot().seed(contacts=250)
+  path = str(tmp_path / "contacts.ndjson")
+
+  count = make_client(fake, retry=False).export("contacts", path, ["email"], partitions=3, page_size=40)
+
+  with open(path) as f:
+    records = [json.loads(line) for line in f]
+  assert count == len(records) == 250
+  assert [r["id"] for r in records] == [r["id"] for r in fake.records("contacts")]
+  assert records[0]["properties"]["email"] == fake.records("contacts")[0]["properties"]["email"]
+  assert sorted(os.listdir(str(tmp_path))) == ["contacts.ndjson"], "parts and checkpoint removed"
+
+
+@pytest.mark.asyncio
+async def test_export_csv_with_the_async_client(tmp_path, make_client):
+  fake = FakeHubspot().seed(contacts=30)
+  path = str(tmp_path / "companies.csv")
+
+  count = await make_client(fake, AsyncHubspotClient, retry=False).export(
+    "companies", path, ["name", "approval_committees"], format="csv"
+  )
+
+  with open(path, newline="") as f:
+    rows = list(csv.reader(f))
+  assert count == 8
+  assert rows[0] == ["id", "name", "approval_committees"]
+  assert rows[1][1:] == ["INSTRuCT", "INSTRuCT Executive Committee Member"]
+
+
+def test_interrupted_export_resumes(tmp_path, make_client):
+  fake = FakeHubspot().seed(contacts=300)
+  path = str(tmp_path / "contacts.ndjson")
+
+  with pytest.raises(HubspotError):
+    make_client(_FailingTransport(fake, 8), retry=False).export("contacts", path, ["email"], partitions=2, page_size=20)
+  assert os.path.exists(path + ".checkpoint") and not os.path.exists(path)
+  progress = json.load(open(path + ".checkpoint"))["partitions"]
+  assert sum(partition["count"] for partition in progress) > 0
+
+  searches = fake.calls["POST contacts/search"]
+  count = make_client(fake, retry=False).export("contacts", path, ["email"], partitions=2, page_size=20)
+
+  with open(path) as f:
+    ids = [json.loads(line)["id"] for line in f]
+  assert count == 300
+  assert ids == [r["id"] for r in fake.records("contacts")]
+  assert fake.calls["POST contacts/search"] - searches < 17, "the saved progress was reused"
+
+
+def test_cli(tmp_path, capsys, make_client):
+  fake = FakeHubspot().seed(contacts=40)
+  hubspot = make_client(fake, retry=False)
+  email = fake.records("contacts")[0]["properties"]["email"]
+
+  assert cli.run(cli.parse_args(["--token", "x", "contact", email]), hubspot) == 0
+  assert json.loads(capsys.readouterr().out)["total"] == 1
+  assert cli.run(cli.parse_args(["contact", "nobody@example.org"]), hubspot) == 1
+  capsys.readouterr()
+
+  path = str(tmp_path / "contacts.csv")
+  args = cli.parse_args(["export", "contacts", path, "--format", "csv", "--properties", "email,firstname"])
+  assert cli.run(args, hubspot) == 0
+  assert capsys.readouterr().out == "exported 40 contacts to {}\n".format(path)
+  with open(path) as f:
+    assert len(f.readlines()) == 41
@@ -0,0 +1,106 @@
+import time
+
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot.async_client import HubspotClient
+from hubspotclient.client.hubspot.fake import FakeHubspot, generate_dataset
+from hubspotclient.client.hubspot.ratelimit import RateLimiter
+
+
+def test_generate_dataset_is_seeded():
+  assert generate_dataset(50, seed=1) == generate_dataset(50, seed=1)
+  assert generate_dataset(50, seed=1) != generate_dataset(50, seed=2)
+
+
+@pytest.mark.asyncio
+async def test_search_filtering_and_paging(fake_hubspot):
+  fake, hubspot = fake_hubspot(contacts=450, cls=HubspotClient)
+  contacts, _ = generate_dataset(450)
+  expected = [c["email"] for c in contacts if c.get("disease_group_executive_committee") == "INRG"]
+
+  page = await hubspot.get_contacts_by_committee("INRG")
+  assert page["total"] == len(expected)
+  assert len(page["results"]) == 10, "Hubspot's default page size"
+
+  found = [c async for c in hubspot.iter_search(
+    "contacts",
+    [{"filters": [{"propertyName": "disease_group_executive_committee", "operator": "EQ", "value": "INRG"}]}],
+    properties=["email"],
+    page_size=7,
+  )]
+  assert [c["properties"]["email"] for c in found] == expected
+
+  one = await hubspot.get_contact_by_email(expected[0].upper())
+  assert one["total"] == 1 and one["results"][0]["properties"]["firstname"]
+
+
+@pytest.mark.asyncio
+async def test_search_result_limit(make_client):
+  fake = FakeHubspot()
+  hubspot = make_client(fake, HubspotClient)
+  response = await hubspot.post(
+    url=hubspot._contacts_url + "/search", json={"filterGroups": [], "limit": 100, "after": "9950"}
+  )
+  assert response.code == 400
+
+
+@pytest.mark.asyncio
+async def test_conflicts_and_batches(make_client):
+  fake = FakeHubspot()
+  existing = fake.add("contacts", {"email": "luca@example.org", "firstname": "Luca"})
+  hubspot = make_client(fake, HubspotClient)
+
+  assert await hubspot.create_contact({"email": "LUCA@example.org"}) is None
+  results = await hubspot.create_contacts([{"email": "new@example.org"}, {"email": "luca@example.org"}])
+  assert [r.status for r in results] == ["created", "conflict"]
+  assert results[1].id == existing["id"]
+
+  found = await hubspot.get_contacts_by_emails(["luca@example.org", "nobody@example.org"])
+  assert found["luca@example.org"]["id"] == existing["id"]
+  assert found["nobody@example.org"] is None
+
+  results = await hubspot.upsert_contacts([{"email": "luca@example.org", "lastname": "Graglia"}])
+  assert results[0].status == "updated"
+  assert fake.get("contacts", existing["id"])["properties"]["lastname"] == "Graglia"
+
+
+@pytest.mark.asyncio
+async def test_injected_failures(make_client):
+  fake = FakeHubspot(retry_after=0.01)
+  hubspot = make_client(fake, HubspotClient, rate_limiter=RateLimiter(), retry={"base_delay": 0.01})
+
+  fake.fail_next(429, count=2, retry_after=0.01)
+  response = await hubspot.get_contact_by_email("nobody@example.org")
+  assert response["total"] == 0
+  assert fake.calls["POST contacts/search"] == 3
+
+  fake.fail_next(503)
+  response = await hubspot.post(url=hubspot._contacts_url + "/search", json={}, retry=False)
+  assert response.code == 503
+
+  always = FakeHubspot(error_rate=1.0, error_status=502)
+  response = await make_client(always, HubspotClient).post(url=hubspot._contacts_url + "/search", json={}, retry=False)
+  assert response.code == 502
+
+
+def test_sync_transport_latency():
+  fake = FakeHubspot(latency=0.05)
+  transport = fake.transport()
+  with httpx.Client(transport=transport) as client:
+    start = time.monotonic()
+    response = client.post("https://api.hubapi.com/crm/v3/objects/contacts", json={"properties": {"email": "a@example.org"}})
+    assert time.monotonic() - start >= 0.05
+  assert response.status_code == 201
+  assert response.json()["properties"]["email"] == "a@example.org"
+
+
+@pytest.mark.asyncio
+async def test_asgi_app():
+  fake = FakeHubspot().seed(companies=3)
+  async with httpx.AsyncClient(transport=httpx.ASGITransport(app=fake), base_url="http://fake") as client:
+    response = await client.get("/crm/v3/objects/companies", params={"limit": 2})
+    assert response.status_code == 200
+    assert [c["properties"]["name"] for c in response.json()["results"]] == ["INSTRuCT", "INRG"]
+    response = await client.get("/crm/v3/objects/companies/1", params={"limit": 2})
+    assert response.status_code == 404
@@ -0,0 +1,83 @@
+import threading
+import time
+
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot.errors import HubspotError
+from hubspotclient.client.hubspot.fake import FakeHubspot
+from hubspotclient.client.hubspot.fanout import CallResult
+
+
+def test_map_returns_results_in_order(make_client):
+  fake = FakeHubspot(latency=0.02).seed(contacts=30)
+  hubspot = make_client(fake)
+  contacts = fake.records("contacts")
+  emails = [c["properties"]["email"] for c in contacts]
+
+  start = time.monotonic()
+  results = hubspot.map(hubspot.get_contact_by_email, emails, max_workers=10)
+  elapsed = time.monotonic() - start
+
+  assert [r.value["results"][0]["id"] for r in results] == [c["id"] for c in contacts]
+  assert all(r.ok for r in results)
+  assert elapsed < 30 * 0.02 / 2, "calls ran concurrently"
+
+
+def test_map_captures_errors_per_item(make_client):
+  fake = FakeHubspot().seed(contacts=5)
+  hubspot = make_client(fake)
+  contacts = fake.records("contacts")
+
+  results = hubspot.map(
+    "update_contact",
+    [(contacts[0]["id"], {"firstname": "A"}), ("999999", {"firstname": "B"}), (contacts[1]["id"], {"firstname": "C"})],
+  )
+
+  assert [r.ok for r in results] == [True, False, True]
+  assert isinstance(results[1].error, HubspotError)
+  with pytest.raises(HubspotError):
+    results[1].get()
+  assert results[2].get()["properties"]["firstname"] == "C"
+  assert results[1].args == ("999999", {"firstname": "B"})
+
+
+def test_map_bounds_concurrency_and_sees_the_context(make_client):
+  lock = threading.Lock()
+  state = {"running": 0, "peak": 0, "timeouts": set()}
+
+  def handler(request):
+    with lock:
+      state["running"] += 1
+      state["peak"] = max(state["peak"], state["running"])
+      state["timeouts"].add(request.extensions["timeout"]["read"])
+    time.sleep(0.01)
+    with lock:
+      state["running"] -= 1
+    return httpx.Response(200, json={"total": 0, "results": []})
+
+  hubspot = make_client(httpx.MockTransport(handler), fanout_workers=8)
+  with hubspot.context(timeout=3):
+    results = hubspot.map(hubspot.get_contacts_by_committee, ["C{}".format(i) for i in range(20)], max_workers=3)
+  assert all(r.ok for r in results)
+  assert state["peak"] == 3
+  assert state["timeouts"] == {3}
+
+
+def test_submit_and_nested_fanout(make_client):
+  fake = FakeHubspot().seed(contacts=12)
+  hubspot = make_client(fake, fanout_workers=2)
+  emails = [c["properties"]["email"] for c in fake.records("contacts")]
+
+  def _lookup_all(chunk):
+    # fans out again from a fan-out thread, without deadlocking the pool
+    return [r.get()["total"] for r in hubspot.map(hubspot.get_contact_by_email, chunk)]
+
+  futures = [hubspot.submit(_lookup_all, emails[i:i + 4]) for i in range(0, 12, 4)]
+  assert [f.result(timeout=5) for f in futures] == [[1] * 4] * 3
+  hubspot.close()
+  assert hubspot.map(hubspot.get_contact_by_email, emails[:2])[0].ok, "usable after close"
+
+
+def test_call_result_repr():
+  assert repr(CallResult(("a",), value=1)) == "CallResult(('a',), ok)"
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot.async_client import HubspotClient as AsyncHubspotClient
+from hubspotclient.client.hubspot.client import HubspotClient
+from hubspotclient.client.hubspot.hedging import Hedger
+
+
+EMPTY_SEARCH = {"total": 0, "results": []}
+OPTIONS = {"min_samples": 4, "min_delay": 0.01, "max_fraction": 1.0}
+
+
+def test_hedger_delay_and_cap():
+  hedger = Hedger(quantile=0.5, min_samples=4, min_delay=0.01, max_delay=1.0, max_fraction=0.25)
+  assert hedger.delay("contacts/search") is None
+  for seconds in (0.02, 0.04, 0.06, 0.08):
+    hedger.record("contacts/search", seconds)
+  assert hedger.delay("contacts/search") == 0.06
+  hedger.record("contacts/{id}", 5.0)
+  assert hedger.delay("contacts/{id}") is None, "per endpoint"
+
+  # at most a quarter of the reads are hedged
+  assert not hedger.try_hedge(), "3 reads so far"
+  hedger.delay("contacts/search")
+  assert [hedger.try_hedge() for _ in range(2)] == [True, False]
+  assert hedger.stats() == dict(hedger.stats(), reads=4, hedges=1)
+
+
+@pytest.mark.asyncio
+async def test_slow_read_is_hedged():
+  calls = []
+
+  async def handler(request):
+    calls.append(request.url.path)
+    if len(calls) == 5:
+      await asyncio.sleep(1)
+    return httpx.Response(200, json=EMPTY_SEARCH)
+
+  hubspot = AsyncHubspotClient(
+    hubspot_auth_token="12345",
+    transport=httpx.MockTransport(handler),
+    rate_limiter=False,
+    hedging=OPTIONS,
+  )
+  for _ in range(4):
+    await hubspot.get_contacts_by_committee("INRG")
+  assert hubspot.hedging_stats()["delays"]["contacts/search"] == 0.01
+
+  start = time.monotonic()
+  assert await hubspot.get_contacts_by_committee("INRG") == EMPTY_SEARCH
+  assert time.monotonic() - start < 0.5, "the hedge answered"
+  assert len(calls) == 6
+  stats = hubspot.hedging_stats()
+  assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_are_not_hedged():
+  calls = []
+
+  async def handler(request):
+    calls.append(request.method)
+    await asyncio.sleep(0.05)
+    return httpx.Response(200, json={"id": "1", "properties": {}})
+
+  hubspot = AsyncHubspotClient(
+    hubspot_auth_token="12345",
+    transport=httpx.MockTransport(handler),
+    rate_limiter=False,
+    hedging=OPTIONS,
+  )
+  for i in range(6):
+    await hubspot.create_contact({"email": "h{}@example.com".format(i)})
+  assert calls == ["POST"] * 6
+  assert hubspot.hedging_stats()["reads"] == 0
+
+
+@pytest.mark.asyncio
+async def test_puts_and_deletes_are_not_hedged():
+  contact = "https://api.hubapi.com/crm/v3/objects/contacts/1"
+  calls = []
+
+  async def handler(request):
+    calls.append(request.method)
+    if request.method != "GET":
+      await asyncio.sleep(0.1)
+    return httpx.Response(200, json={"id": "1", "properties": {}})
+
+  hubspot = AsyncHubspotClient(
+    hubspot_auth_token="12345",
+    transport=httpx.MockTransport(handler),
+    rate_limiter=False,
+    hedging=OPTIONS,
+  )
+  for _ in range(4):
+    await hubspot.request("GET", contact)
+  assert hubspot.hedging_stats()["delays"]["contacts/{id}"] == 0.01
+
+  await hubspot.request("PUT", contact, json={"properties": {}})
+  await hubspot.request("DELETE", contact, expect_json=False)
+  assert calls == ["GET"] * 4 + ["PUT", "DELETE"]
+  assert hubspot.hedging_stats()["hedges"] == 0
+
+
+def test_sync_slow_read_is_hedged():
+  calls = []
+  lock = threading.Lock()
+
+  def handler(request):
+    with lock:
+      calls.append(request.url.path)
+      slow = len(calls) == 5
+    if slow:
+      time.sleep(0.5)
+    return httpx.Response(200, json=EMPTY_SEARCH)
+
+  hubspot = HubspotClient(
+    hubspot_auth_token="12345",
+    transport=httpx.MockTransport(handler),
+    rate_limiter=False,
+    hedging=OPTIONS,
+  )
+  for _ in range(4):
+    hubspot.get_contacts_by_committee("INRG")
+  start = time.monotonic()
+  assert hubspot.get_contacts_by_committee("INRG") == EMPTY_SEARCH
+  assert time.monotonic() - start < 0.4
+  assert hubspot.hedging_stats()["hedge_wins"] == 1
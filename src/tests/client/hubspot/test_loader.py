@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot.async_client import HubspotClient
+
+
+def _transport(requests):
+  async def handler(request):
+    requests.append(request)
+    body = json.loads(request.content)
+    await asyncio.sleep(0.01)
+    results = [
+      {"id": str(i), "properties": {"email": item["id"].lower()}}
+      for i, item in enumerate(body["inputs"]) if not item["id"].startswith("missing")
+    ]
+    return httpx.Response(200, json={"status": "COMPLETE", "results": results})
+  return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_are_batched():
+  requests = []
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=_transport(requests), batch_lookups=True)
+  emails = ["user{}@example.org".format(i) for i in range(30)] + ["missing@example.org", "User0@example.org"]
+
+  responses = await asyncio.gather(*[hubspot.get_contact_by_email(email) for email in emails])
+
+  assert len(requests) == 1
+  assert requests[0].url.path.endswith("/contacts/batch/read")
+  for email, response in zip(emails, responses):
+    if email.startswith("missing"):
+      assert response == {"total": 0, "results": []}
+    else:
+      assert response["total"] == 1 and response["results"][0]["properties"]["email"] == email.lower()
+
+  stats = hubspot.batch_lookup_stats()
+  assert stats["lookups"] == 32 and stats["keys"] == 31 and stats["batches"] == 1
+  assert stats["flushed_window"] == 1
+
+
+@pytest.mark.asyncio
+async def test_full_batches_are_sent_without_waiting():
+  requests = []
+  hubspot = HubspotClient(
+    hubspot_auth_token="12345",
+    transport=_transport(requests),
+    batch_lookups={"window": 10, "max_batch_size": 10},
+  )
+
+  await asyncio.wait_for(
+    asyncio.gather(*[hubspot.get_contact_by_email("user{}@example.org".format(i)) for i in range(20)]),
+    timeout=5,
+  )
+
+  assert len(requests) == 2
+  assert hubspot.batch_lookup_stats()["flushed_full"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_dispatch_is_sent_again():
+  requests = []
+  hubspot = HubspotClient(
+    hubspot_auth_token="12345",
+    transport=_transport(requests),
+    batch_lookups={"window": 0.05, "max_batch_size": 10},
+  )
+  emails = ["user{}@example.org".format(i) for i in range(10)]
+  waiting = [asyncio.ensure_future(hubspot.get_contact_by_email(email)) for email in emails[:9]]
+  await asyncio.sleep(0)
+  filling = asyncio.ensure_future(hubspot.get_contact_by_email(emails[9]))
+  await asyncio.sleep(0.005)
+  assert len(requests) == 1, "the tenth lookup sends the batch"
+  filling.cancel()
+
+  responses = await asyncio.wait_for(asyncio.gather(*waiting), timeout=5)
+  assert filling.cancelled()
+  for email, response in zip(emails, responses):
+    assert response["total"] == 1 and response["results"][0]["properties"]["email"] == email
+  assert len(requests) == 2
+  assert hubspot.batch_lookup_stats()["flushed_window"] == 1
@@ -0,0 +1,100 @@
+import time
+
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot.async_client import HubspotClient as AsyncHubspotClient
+from hubspotclient.client.hubspot.client import HubspotClient
+from hubspotclient.client.hubspot.mirror import Mirror
+
+
+def _offline(request):
+  raise httpx.ConnectError("offline")
+
+
+def test_reads_are_served_from_the_mirror(fake_hubspot):
+  mirror = Mirror()
+  fake, hubspot = fake_hubspot(contacts=200, mirror=mirror)
+  assert hubspot.refresh_mirror() == {"contacts": 200, "companies": 8}
+  searches = fake.calls["POST contacts/search"]
+
+  contact = fake.records("contacts")[10]
+  email = contact["properties"]["email"]
+  found = hubspot.get_contact_by_email(email.upper())
+  assert [c["id"] for c in found["results"]] == [contact["id"]]
+  assert set(found["results"][0]["properties"]) == {
+    "firstname", "lastname", "institution", "createdate", "hs_object_id", "lastmodifieddate"
+  }
+
+  direct = HubspotClient(hubspot_auth_token="12345", transport=fake.transport(), rate_limiter=False)
+  for committee in ("INRG", "magic"):
+    mirrored = hubspot.get_contacts_by_committee(committee)
+    expected = direct.get_contacts_by_committee(committee)
+    assert mirrored["total"] == expected["total"] > 10
+    assert [c["id"] for c in mirrored["results"]] == [c["id"] for c in expected["results"]]
+  assert hubspot.get_commitees_info("NODAL")["results"][0]["properties"]["approval_committees"] == (
+    "NODAL Executive Committee Member"
+  )
+  assert fake.calls["POST contacts/search"] == searches + 2, "only the direct client searched"
+
+  assert hubspot.get_contact_by_email("nobody@example.org")["total"] == 0
+  assert fake.calls["POST contacts/search"] == searches + 3, "a miss asks Hubspot"
+  stats = mirror.stats()
+  assert stats == dict(stats, contacts=200, companies=8, hits=4, misses=1)
+
+
+def test_refresh_is_incremental_and_writes_go_through(tmp_path, fake_hubspot):
+  path = str(tmp_path / "mirror.sqlite")
+  fake, hubspot = fake_hubspot(contacts=50, mirror=Mirror(path))
+  hubspot.refresh_mirror()
+
+  contact = fake.records("contacts")[0]
+  direct = HubspotClient(hubspot_auth_token="12345", transport=fake.transport(), rate_limiter=False)
+  direct.update_contact(contact["id"], {"disease_group_executive_committee": "CARPI"})
+  fake.add("contacts", {"email": "new@example.org", "firstname": "New"})
+  assert hubspot.refresh_mirror() == {"contacts": 2, "companies": 0}
+
+  carpi = hubspot.get_contacts_by_committee("CARPI")
+  assert carpi["results"][0]["id"] == contact["id"], "the lowest contact ID"
+
+  hubspot.update_contact(contact["id"], {"firstname": "Renamed"})
+  email = contact["properties"]["email"]
+  searches = fake.calls["POST contacts/search"]
+  assert hubspot.get_contact_by_email(email)["results"][0]["properties"]["firstname"] == "Renamed"
+  assert fake.calls["POST contacts/search"] == searches
+
+  # the mirror file keeps serving after a restart, without Hubspot
+  offline = HubspotClient(
+    hubspot_auth_token="12345",
+    transport=httpx.MockTransport(_offline),
+    mirror=Mirror(path, offline=True),
+  )
+  assert offline.get_contact_by_email("new@example.org")["results"][0]["properties"]["firstname"] == "New"
+  assert offline.get_contact_by_email("nobody@example.org") == {"total": 0, "results": []}
+
+
+@pytest.mark.asyncio
+async def test_stale_mirror_falls_back_to_hubspot(fake_hubspot):
+  mirror = Mirror(max_staleness=60)
+  fake, hubspot = fake_hubspot(contacts=20, cls=AsyncHubspotClient, mirror=mirror)
+  await hubspot.refresh_mirror(["contacts"])
+  email = fake.records("contacts")[0]["properties"]["email"]
+
+  assert (await hubspot.get_contact_by_email(email))["total"] == 1
+  searches = fake.calls["POST contacts/search"]
+  mirror.mark_refreshed("contacts", time.time() - 120)
+  assert (await hubspot.get_contact_by_email(email))["total"] == 1
+  assert fake.calls["POST contacts/search"] == searches + 1
+  assert mirror.stats()["stale"] == 1
+
+
+def test_full_refresh_drops_deleted_objects(fake_hubspot):
+  mirror = Mirror()
+  fake, hubspot = fake_hubspot(contacts=10, mirror=mirror)
+  hubspot.refresh_mirror()
+  gone = fake.records("contacts")[0]
+  fake.clear()
+  fake.seed(contacts=0)
+  hubspot.refresh_mirror(full=True)
+  assert mirror.stats()["contacts"] == 0
+  assert mirror.contact_by_email(gone["properties"]["email"], ()) is None
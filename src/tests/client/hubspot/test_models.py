@@ -0,0 +1,90 @@
+import json
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot.async_client import HubspotClient
+from hubspotclient.client.hubspot.models import Company, Contact, SearchPage
+
+
+CONTACT = {
+  "id": "9601",
+  "properties": {"firstname": "Luca", "lastname": "Graglia", "institution": "The University of Chicago"},
+  "createdAt": "2019-12-18T19:49:03.109Z",
+  "updatedAt": "2021-07-08T17:28:39.152Z",
+  "archived": False,
+}
+
+
+def test_contact_model():
+  contact = Contact.from_json(CONTACT)
+
+  assert contact.id == "9601"
+  assert contact["firstname"] == "Luca"
+  assert contact.get("email") is None
+  assert "lastname" in contact
+  assert contact.properties == CONTACT["properties"]
+  assert contact.created_at == datetime(2019, 12, 18, 19, 49, 3, 109000, tzinfo=timezone.utc)
+  assert contact.to_json() == CONTACT
+  with pytest.raises(KeyError):
+    contact["email"]
+  with pytest.raises(AttributeError):
+    contact.extra = 1
+
+
+def test_property_names_are_shared():
+  first = Contact.from_json(CONTACT)
+  second = Contact.from_json(dict(CONTACT, id="52551", properties={"firstname": "Debra", "lastname": "Venckus", "institution": "UChicago"}))
+  assert first._names is second._names
+
+
+def test_search_page():
+  data = {"total": "3", "results": [CONTACT], "paging": {"next": {"after": "1"}}}
+  page = SearchPage.from_json(data, Contact)
+
+  assert page.total == 3 and len(page) == 1 and page.after == "1"
+  assert [c.id for c in page] == ["9601"]
+  assert page.to_json() == dict(data, total=3)
+
+
+@pytest.mark.asyncio
+async def test_client_typed_results():
+  def handler(request):
+    if request.url.path.endswith("/companies/search"):
+      return httpx.Response(200, json={"total": 1, "results": [{"id": "1", "properties": {"name": "INSTRuCT"}}]})
+    return httpx.Response(200, json={"total": 1, "results": [CONTACT]})
+
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=httpx.MockTransport(handler), typed_results=True)
+
+  page = await hubspot.get_contact_by_email("luca@example.org")
+  assert isinstance(page, SearchPage) and page.results[0] == Contact.from_json(CONTACT)
+
+  companies = await hubspot.get_commitees_info("INSTRuCT")
+  assert isinstance(companies.results[0], Company) and companies.results[0].name == "INSTRuCT"
+
+  contacts = [c async for c in hubspot.iter_contacts_by_committee("FAKE")]
+  assert isinstance(contacts[0], Contact)
+
+
+@pytest.mark.asyncio
+async def test_typed_results_with_batch_lookups():
+  def handler(request):
+    inputs = json.loads(request.content)["inputs"]
+    results = [dict(CONTACT, properties=dict(CONTACT["properties"], email=item["id"])) for item in inputs]
+    return httpx.Response(200, json={"status": "COMPLETE", "results": results[:1]})
+
+  hubspot = HubspotClient(
+    hubspot_auth_token="12345",
+    transport=httpx.MockTransport(handler),
+    typed_results=True,
+    batch_lookups=True,
+  )
+
+  page = await hubspot.get_contact_by_email("luca@example.org")
+  assert isinstance(page, SearchPage) and page.total == 1
+  assert page.results[0].id == "9601" and page.results[0]["firstname"] == "Luca"
+
+  contacts = await hubspot.get_contacts_by_emails(["luca@example.org", "missing@example.org"])
+  assert isinstance(contacts["luca@example.org"], Contact) and contacts["luca@example.org"].id == "9601"
+  assert contacts["missing@example.org"] is None
@@ -0,0 +1,78 @@
+import json
+
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot import base
+from hubspotclient.client.hubspot.async_client import HubspotClient
+
+
+def _search_transport(records, limit, requests):
+  def handler(request):
+    body = json.loads(request.content)
+    requests.append(body)
+    after = int(body.get("after", 0))
+    if after >= limit:
+      return httpx.Response(400, json={"status": "error", "message": "after is too large"})
+    matches = []
+    for record in records:
+      for group in body["filterGroups"]:
+        ok = True
+        for f in group["filters"]:
+          value = record["id"] if f["propertyName"] == "hs_object_id" else record["properties"].get(f["propertyName"])
+          if f["operator"] == "EQ" and value != f["value"]:
+            ok = False
+          if f["operator"] == "GT" and int(value) <= int(f["value"]):
+            ok = False
+        if ok:
+          matches.append(record)
+          break
+    page = matches[after:after + body["limit"]]
+    data = {"total": len(matches), "results": page}
+    if after + body["limit"] < len(matches):
+      data["paging"] = {"next": {"after": str(after + body["limit"])}}
+    return httpx.Response(200, json=data)
+  return httpx.MockTransport(handler)
+
+
+def _records(n, committee="FAKE Executive Committee Member"):
+  return [
+    {"id": str(i), "properties": {"email": "user{}@example.org".format(i), "disease_group_executive_committee": committee}}
+    for i in range(1, n + 1)
+  ]
+
+
+@pytest.mark.asyncio
+async def test_iter_contacts_by_committee_follows_paging():
+  requests = []
+  records = _records(250) + _records(5, "OTHER Executive Committee Member")
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=_search_transport(records, 10000, requests))
+
+  ids = [c["id"] async for c in hubspot.iter_contacts_by_committee("FAKE Executive Committee Member")]
+
+  assert ids == [str(i) for i in range(1, 251)]
+  assert len(requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_iter_search_partitions_past_result_limit(monkeypatch):
+  monkeypatch.setattr(base, "SEARCH_RESULT_LIMIT", 100)
+  requests = []
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=_search_transport(_records(250), 100, requests))
+
+  ids = [c["id"] async for c in hubspot.iter_contacts_by_committee("FAKE Executive Committee Member", page_size=30)]
+
+  assert ids == [str(i) for i in range(1, 251)]
+  assert all(int(r.get("after", 0)) < 100 for r in requests)
+
+
+@pytest.mark.asyncio
+async def test_iter_search_stops_early():
+  requests = []
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=_search_transport(_records(1000), 10000, requests))
+
+  async for contact in hubspot.iter_contacts_by_committee("FAKE Executive Committee Member"):
+    if contact["id"] == "5":
+      break
+
+  assert len(requests) <= 2, "at most one page should be prefetched"
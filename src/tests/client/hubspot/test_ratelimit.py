@@ -0,0 +1,113 @@
+import calendar
+
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot.async_client import HubspotClient
+from hubspotclient.client.hubspot.errors import HubspotDailyLimitError
+from hubspotclient.client.hubspot.ratelimit import RateLimiter, parse_retry_after
+
+
+HEADERS = {
+  "X-HubSpot-RateLimit-Max": "150",
+  "X-HubSpot-RateLimit-Remaining": "40",
+  "X-HubSpot-RateLimit-Interval-Milliseconds": "10000",
+  "X-HubSpot-RateLimit-Daily": "500000",
+  "X-HubSpot-RateLimit-Daily-Remaining": "499000",
+}
+
+
+def test_limiter_seeds_from_headers():
+  limiter = RateLimiter()
+  limiter.update(200, HEADERS)
+  status = limiter.status()
+
+  assert status["interval_max"] == 150
+  assert status["interval_seconds"] == 10.0
+  assert 40 <= status["interval_remaining"] <= 41
+  assert status["daily_remaining"] == 499000
+
+  limiter.acquire()
+  assert limiter.status()["daily_remaining"] == 498999
+
+
+def test_limiter_waits_when_bucket_is_empty():
+  limiter = RateLimiter(interval_max=2, interval_seconds=1.0)
+  assert limiter.acquire() == 0
+  assert limiter.acquire() == 0
+  assert 0.4 < limiter.acquire() <= 0.5
+
+
+def test_limiter_blocks_on_retry_after():
+  limiter = RateLimiter()
+  assert limiter.update(429, {"Retry-After": "2"}) == 2.0
+  assert limiter.acquire() > 1.9
+  assert limiter.status()["blocked_for"] > 1.9
+
+
+def test_limiter_fails_fast_when_daily_limit_is_used_up():
+  limiter = RateLimiter()
+  limiter.update(200, dict(HEADERS, **{"X-HubSpot-RateLimit-Daily-Remaining": "1"}))
+  assert limiter.acquire() == 0
+  with pytest.raises(HubspotDailyLimitError) as e:
+    limiter.acquire()
+  assert e.value.code == 429 and 59 < e.value.retry_in <= 60
+
+  # after a while one request checks whether the limit has been reset
+  limiter._daily_recheck_at -= 60
+  assert limiter.acquire() == 0
+  with pytest.raises(HubspotDailyLimitError):
+    limiter.acquire()
+  limiter.update(200, HEADERS)
+  assert limiter.acquire() == 0
+
+
+def test_parse_retry_after():
+  assert parse_retry_after("3") == 3.0
+  assert parse_retry_after(None) is None
+  date = "Wed, 21 Oct 2015 07:28:00 GMT"
+  assert parse_retry_after(date, now=calendar.timegm((2015, 10, 21, 7, 27, 0))) == pytest.approx(60)
+
+
+@pytest.mark.asyncio
+async def test_request_is_sent_again_after_429():
+  responses = [
+    httpx.Response(429, headers={"Retry-After": "0.1"}, json={"status": "error", "message": "slow down"}),
+    httpx.Response(200, headers=HEADERS, json={"total": 0, "results": []}),
+  ]
+  hubspot = HubspotClient(
+    hubspot_auth_token="12345",
+    transport=httpx.MockTransport(lambda request: responses.pop(0)),
+    rate_limiter=RateLimiter(),
+  )
+
+  response = await hubspot.get_contact_by_email("a@example.org")
+
+  assert response == {"total": 0, "results": []}
+  assert hubspot.rate_limit_status()["interval_max"] == 150
+
+
+@pytest.mark.asyncio
+async def test_request_fails_fast_when_daily_limit_is_used_up():
+  requests = []
+
+  def handler(request):
+    requests.append(request)
+    headers = dict(HEADERS, **{"X-HubSpot-RateLimit-Daily-Remaining": "0"})
+    return httpx.Response(200, headers=headers, json={"total": 0, "results": []})
+
+  hubspot = HubspotClient(
+    hubspot_auth_token="12345",
+    transport=httpx.MockTransport(handler),
+    rate_limiter=RateLimiter(),
+  )
+  await hubspot.get_contact_by_email("a@example.org")
+  with pytest.raises(HubspotDailyLimitError):
+    await hubspot.get_contact_by_email("b@example.org")
+  assert len(requests) == 1
+
+
+def test_limiter_is_shared_by_token():
+  assert HubspotClient(hubspot_auth_token="abc")._rate_limiter is HubspotClient(hubspot_auth_token="abc")._rate_limiter
+  assert HubspotClient(hubspot_auth_token="abc")._rate_limiter is not HubspotClient(hubspot_auth_token="def")._rate_limiter
+  assert HubspotClient(hubspot_auth_token="abc", rate_limiter=False).rate_limit_status() is None
@@ -0,0 +1,55 @@
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot import base
+from hubspotclient.client.hubspot.base import HubspotResponse
+from hubspotclient.client.hubspot.errors import HubspotError
+
+
+PAGE = {"total": 2, "results": [{"id": "1", "properties": {"score": 1.5}}, {"id": "2", "properties": {}}]}
+
+
+def test_body_is_decoded_once_and_lazily(monkeypatch):
+  calls = []
+  loads = base._json_loads
+
+  def counting_loads(content):
+    calls.append(content)
+    return loads(content)
+
+  monkeypatch.setattr(base, "_json_loads", counting_loads)
+  response = HubspotResponse(httpx.Response(200, json=PAGE))
+  assert calls == []
+
+  assert response.successful
+  assert response.json["total"] == 2
+  assert response.json is response.json
+  assert len(calls) == 1
+
+
+def test_body_is_not_touched_without_expect_json():
+  response = HubspotResponse(httpx.Response(204, content=b"not json"), expect_json=False)
+  assert response.successful
+  with pytest.raises(AttributeError):
+    response.json
+
+
+def test_confusing_body():
+  response = HubspotResponse(httpx.Response(200, content=b"<html>"))
+  with pytest.raises(HubspotError):
+    response.json
+
+  response = HubspotResponse(httpx.Response(500, content=b"<html>"))
+  assert not response.successful
+  assert response.json["error"]["code"] == 500
+
+
+@pytest.mark.parametrize("with_ijson", [True, False])
+def test_iter_items(monkeypatch, with_ijson):
+  if not with_ijson:
+    monkeypatch.setattr(base, "ijson", None)
+  elif base.ijson is None:
+    pytest.skip("ijson is not installed")
+
+  response = HubspotResponse(httpx.Response(200, json=PAGE))
+  assert list(response.iter_items()) == PAGE["results"]
@@ -0,0 +1,140 @@
+import time
+
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot.async_client import HubspotClient
+from hubspotclient.client.hubspot.errors import HubspotError, HubspotUnhealthyError
+from hubspotclient.client.hubspot.retry import RetryBudget, RetryPolicy, is_idempotent
+
+
+OK = {"total": 0, "results": []}
+FAST = RetryPolicy(base_delay=0.001, max_delay=0.01, budget=None)
+
+
+def _client(outcomes, seen=None, **kwargs):
+  """A client whose transport returns/raises the given outcomes in order."""
+  outcomes = list(outcomes)
+
+  def handler(request):
+    if seen is not None:
+      seen.append(request.method)
+    outcome = outcomes.pop(0) if len(outcomes) > 1 else outcomes[0]
+    if isinstance(outcome, Exception):
+      raise outcome
+    return httpx.Response(outcome, json=OK if outcome < 400 else {"status": "error", "message": "nope"})
+
+  kwargs.setdefault("retry", FAST)
+  return HubspotClient(
+    hubspot_auth_token="12345",
+    transport=httpx.MockTransport(handler),
+    rate_limiter=False,
+    **kwargs
+  )
+
+
+def test_is_idempotent():
+  assert is_idempotent("get", "https://x/contacts/1")
+  assert is_idempotent("POST", "https://x/contacts/search")
+  assert is_idempotent("POST", "https://x/contacts/batch/read")
+  assert not is_idempotent("POST", "https://x/contacts")
+  assert not is_idempotent("PATCH", "https://x/contacts/1")
+
+
+def test_decorrelated_jitter():
+  policy = RetryPolicy(base_delay=0.1, max_delay=1.0)
+  previous = 0.0
+  for _ in range(50):
+    wait = policy.backoff(previous)
+    assert 0.1 <= wait <= min(1.0, max(0.1, previous * 3))
+    previous = wait
+
+
+@pytest.mark.asyncio
+async def test_safe_requests_are_retried():
+  seen = []
+  hubspot = _client([502, 503, 200], seen)
+  assert await hubspot.get_contact_by_email("a@example.org") == OK
+  assert len(seen) == 3
+
+
+@pytest.mark.asyncio
+async def test_unsafe_requests_are_not_retried_after_errors():
+  seen = []
+  hubspot = _client([502, 200], seen)
+  with pytest.raises(HubspotError):
+    await hubspot.update_contact("1", {"firstname": "Luca"})
+  assert seen == ["PATCH"]
+
+  seen = []
+  hubspot = _client([429, httpx.ConnectError("refused"), 200], seen)
+  assert await hubspot.update_contact("1", {"firstname": "Luca"}) == OK
+  assert seen == ["PATCH"] * 3, "429s and connect errors never reached Hubspot"
+
+  hubspot = _client([httpx.ReadTimeout("slow"), 200])
+  with pytest.raises(HubspotUnhealthyError):
+    await hubspot.update_contact("1", {"firstname": "Luca"})
+
+
+@pytest.mark.asyncio
+async def test_give_up():
+  seen = []
+  hubspot = _client([httpx.ReadTimeout("slow")], seen)
+  with pytest.raises(HubspotUnhealthyError):
+    await hubspot.get_contact_by_email("a@example.org")
+  assert len(seen) == 4
+
+  hubspot = _client([httpx.ReadTimeout("slow")], retry=False)
+  with pytest.raises(httpx.ReadTimeout):
+    await hubspot.get_contact_by_email("a@example.org")
+
+  seen = []
+  hubspot = _client([503], seen)
+  response = await hubspot.post(url=hubspot._contacts_url + "/search", json={})
+  assert response.code == 503 and len(seen) == 4
+
+
+@pytest.mark.asyncio
+async def test_policy_per_call():
+  seen = []
+  hubspot = _client([503], seen)
+  with hubspot.context(retry=RetryPolicy(max_attempts=2, base_delay=0, budget=None)):
+    await hubspot.post(url=hubspot._contacts_url + "/search", json={})
+  assert len(seen) == 2
+
+  seen = []
+  hubspot = _client([503], seen)
+  await hubspot.post(url=hubspot._contacts_url + "/search", json={}, retry={"max_tries": 3})
+  assert len(seen) == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_after_and_time_budget():
+  def handler(request):
+    handler.calls += 1
+    if handler.calls == 1:
+      return httpx.Response(429, headers={"Retry-After": handler.retry_after}, json={})
+    return httpx.Response(200, json=OK)
+
+  handler.calls, handler.retry_after = 0, "0.2"
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=httpx.MockTransport(handler), rate_limiter=False, retry=FAST)
+  start = time.monotonic()
+  assert await hubspot.get_contact_by_email("a@example.org") == OK
+  assert time.monotonic() - start >= 0.2
+
+  handler.calls, handler.retry_after = 0, "30"
+  start = time.monotonic()
+  response = await hubspot.post(url=hubspot._contacts_url + "/search", json={}, retry={"total_timeout": 5})
+  assert response.code == 429, "waiting 30s would blow the 5s budget"
+  assert time.monotonic() - start < 1
+
+
+@pytest.mark.asyncio
+async def test_retry_budget():
+  budget = RetryBudget(ratio=0.5, min_per_second=0, window=60)
+  seen = []
+  hubspot = _client([503], seen, retry=RetryPolicy(base_delay=0, max_delay=0, budget=budget))
+  for _ in range(4):
+    await hubspot.post(url=hubspot._contacts_url + "/search", json={})
+  assert budget.status() == {"requests": 4, "retries": 2, "allowed": 2}
+  assert len(seen) == 6
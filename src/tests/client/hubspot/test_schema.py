@@ -0,0 +1,192 @@
+import json
+
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot.async_client import HubspotClient as AsyncHubspotClient
+from hubspotclient.client.hubspot.batch import CREATED, ERROR
+from hubspotclient.client.hubspot.client import HubspotClient
+from hubspotclient.client.hubspot.errors import HubspotValidationError
+from hubspotclient.client.hubspot.fake import FakeHubspot
+from hubspotclient.client.hubspot.mirror import Mirror
+from hubspotclient.client.hubspot.schema import PropertySchema
+
+
+ALWAYS_RETURNED = {"createdate", "hs_object_id", "lastmodifieddate"}
+
+
+def test_reads_return_the_requested_properties(fake_hubspot):
+  fake, hubspot = fake_hubspot(contacts=50)
+  contact = [c for c in fake.records("contacts") if "disease_group_executive_committee" in c["properties"]][0]
+  email = contact["properties"]["email"]
+  committee = contact["properties"]["disease_group_executive_committee"]
+
+  found = hubspot.get_contact_by_email(email)
+  assert set(found["results"][0]["properties"]) == {"firstname", "lastname", "institution"} | ALWAYS_RETURNED
+
+  found = hubspot.get_contact_by_email(email, properties=["email"])
+  assert set(found["results"][0]["properties"]) == {"email"} | ALWAYS_RETURNED
+
+  members = hubspot.get_contacts_by_committee(committee, properties=["firstname"])
+  assert members["results"] and all(
+    set(member["properties"]) == {"firstname"} | ALWAYS_RETURNED for member in members["results"]
+  )
+
+  companies = hubspot.get_commitees_info(committee, properties=["domain", "name"])
+  assert companies["results"][0]["properties"]["domain"] == "{}.example.org".format(committee.lower())
+
+
+def test_projections_are_cached_apart(fake_hubspot):
+  fake, hubspot = fake_hubspot(contacts=10, cache=True)
+  email = fake.records("contacts")[0]["properties"]["email"]
+
+  default = hubspot.get_contact_by_email(email)
+  projected = hubspot.get_contact_by_email(email, properties=["email"])
+  assert "email" not in default["results"][0]["properties"]
+  assert "email" in projected["results"][0]["properties"]
+  assert fake.calls["POST contacts/search"] == 2
+
+  # the same projection, in any order
+  assert hubspot.get_contact_by_email(email, properties=["email", "email"]) == projected
+  assert hubspot.get_contact_by_email(email, properties=("firstname", "lastname", "institution")) == default
+  assert fake.calls["POST contacts/search"] == 2
+
+
+def test_mirror_answers_only_mirrored_projections(make_client):
+  fake = FakeHubspot().seed(contacts=20)
+  mirror = Mirror()
+  hubspot = make_client(fake, mirror=mirror)
+  hubspot.refresh_mirror()
+  searches = fake.calls["POST contacts/search"]
+  email = fake.records("contacts")[3]["properties"]["email"]
+
+  found = hubspot.get_contact_by_email(email, properties=["email", "firstname"])
+  assert set(found["results"][0]["properties"]) == {"email", "firstname"} | ALWAYS_RETURNED
+  assert fake.calls["POST contacts/search"] == searches
+
+  fake.define_property("contacts", "phone")
+  hubspot.get_contact_by_email(email, properties=["phone"])
+  assert fake.calls["POST contacts/search"] == searches + 1
+
+
+def test_schema_is_cached(make_client):
+  fake = FakeHubspot()
+  hubspot = make_client(fake)
+  schema = hubspot.get_property_schema("contacts")
+  assert "email" in schema and "phone" not in schema
+  assert schema.options("disease_group_executive_committee")[:2] == ["INSTRuCT", "INRG"]
+  assert hubspot.get_property_schema("contacts") is schema
+  assert fake.calls["GET properties/contacts"] == 1
+
+  hubspot.get_property_schema("contacts", refresh=True)
+  hubspot.get_property_schema("companies")
+  assert fake.calls["GET properties/contacts"] == 2
+  assert fake.calls["GET properties/companies"] == 1
+
+  expiring = make_client(fake, schema_ttl=0)
+  expiring.get_property_schema("contacts")
+  expiring.get_property_schema("contacts")
+  assert fake.calls["GET properties/contacts"] == 4
+
+
+def test_schema_errors():
+  schema = PropertySchema("contacts", [
+    {"name": "email", "type": "string", "fieldType": "text"},
+    {"name": "tier", "type": "enumeration", "fieldType": "select", "options": [{"value": "a"}, {"value": "b"}]},
+    {"name": "groups", "type": "enumeration", "fieldType": "checkbox", "options": [{"value": "x"}, {"value": "y"}]},
+  ])
+  assert schema.errors({"email": "a@b.org", "tier": "a", "groups": "x;y"}) == []
+  assert schema.errors({"tier": "", "groups": None}) == []
+  assert schema.errors({"phone": "1", "tier": "c", "groups": "x;z"}) == [
+    "unknown property `phone` of contacts",
+    "`c` is not an option of `tier` (a, b)",
+    "`z` is not an option of `groups` (x, y)",
+  ]
+
+
+def test_writes_are_checked_locally(fake_hubspot):
+  fake, hubspot = fake_hubspot(contacts=5, validate_properties=True)
+
+  with pytest.raises(HubspotValidationError) as e:
+    hubspot.create_contact({"email": "new@example.org", "phone": "555"})
+  assert e.value.code == 400
+  assert e.value.errors == ["unknown property `phone` of contacts"]
+  with pytest.raises(HubspotValidationError):
+    hubspot.update_contact(
+      fake.records("contacts")[0]["id"], {"disease_group_executive_committee": "NOPE"}
+    )
+  assert fake.calls["POST contacts"] == 0
+  assert fake.calls["PATCH contacts/{id}"] == 0
+
+  created = hubspot.create_contact(
+    {"email": "new@example.org", "disease_group_executive_committee": "INRG;MaGIC"}
+  )
+  assert created["properties"]["disease_group_executive_committee"] == "INRG;MaGIC"
+  assert fake.calls["GET properties/contacts"] == 1
+
+
+def test_json_string_writes_are_checked(fake_hubspot):
+  fake, hubspot = fake_hubspot(contacts=1, validate_properties=True)
+  contact_id = fake.records("contacts")[0]["id"]
+
+  with pytest.raises(HubspotValidationError) as e:
+    hubspot.update_contact(contact_id, json.dumps({"phone": "555"}))
+  assert e.value.errors == ["unknown property `phone` of contacts"]
+  with pytest.raises(TypeError, match="not valid JSON"):
+    hubspot.create_contact("{'email': 'new@example.org'}")
+  with pytest.raises(TypeError, match="not list"):
+    hubspot.update_contact(contact_id, json.dumps([{"firstname": "Fred"}]))
+  assert fake.calls["POST contacts"] == fake.calls["PATCH contacts/{id}"] == 0
+
+
+def test_stale_schema_is_read_again_before_rejecting(make_client):
+  fake = FakeHubspot()
+  hubspot = make_client(fake, validate_properties=True)
+  hubspot.get_property_schema("contacts").fetched -= 120
+  fake.define_property("contacts", "phone")
+
+  assert hubspot.create_contact({"email": "new@example.org", "phone": "555"})["id"]
+  assert fake.calls["GET properties/contacts"] == 2
+
+
+def test_batch_writes_reject_invalid_records_only(make_client):
+  fake = FakeHubspot()
+  hubspot = make_client(fake, validate_properties=True)
+  records = [
+    {"email": "a@example.org"},
+    {"email": "b@example.org", "phone": "555"},
+    {"email": "c@example.org", "disease_group_executive_committee": "INRG"},
+  ]
+  results = hubspot.create_contacts(records)
+  assert [result.status for result in results] == [CREATED, ERROR, CREATED]
+  assert [result.input for result in results] == records
+  assert results[1].code == 400 and "phone" in results[1].error
+  assert fake.count("contacts") == 2
+
+
+def test_unreadable_definitions_leave_the_check_to_hubspot():
+  fake = FakeHubspot()
+  transport = fake.transport()
+
+  def handler(request):
+    if "/properties/" in request.url.path:
+      return httpx.Response(403, json={"status": "error", "message": "missing scopes"})
+    return transport.handle_request(request)
+
+  hubspot = HubspotClient(
+    hubspot_auth_token="12345",
+    transport=httpx.MockTransport(handler),
+    rate_limiter=False,
+    validate_properties=True,
+  )
+  assert hubspot.create_contact({"email": "new@example.org", "phone": "555"})["id"]
+
+
+@pytest.mark.asyncio
+async def test_async_validation(make_client):
+  fake = FakeHubspot()
+  hubspot = make_client(fake, cls=AsyncHubspotClient, validate_properties=True)
+  with pytest.raises(HubspotValidationError):
+    await hubspot.create_contact({"email": "new@example.org", "phone": "555"})
+  found = await hubspot.get_contact_by_email("missing@example.org", properties=["email"])
+  assert found["total"] == 0
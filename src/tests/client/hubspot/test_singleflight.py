@@ -0,0 +1,67 @@
+import asyncio
+
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot.async_client import HubspotClient
+from hubspotclient.client.hubspot.singleflight import SingleFlight, flight_key
+
+
+def _slow_transport(requests, status=200):
+  async def handler(request):
+    requests.append(request)
+    await asyncio.sleep(0.05)
+    return httpx.Response(status, json={"total": 1, "results": [{"id": "9601", "properties": {}}]})
+  return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_identical_reads_share_one_request():
+  requests = []
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=_slow_transport(requests))
+
+  responses = await asyncio.gather(*[
+    hubspot.get_contacts_by_committee("FAKE Executive Committee Member") for _ in range(10)
+  ])
+
+  assert len(requests) == 1
+  assert all(response["results"][0]["id"] == "9601" for response in responses)
+  responses[0]["results"].clear()
+  assert responses[1]["results"], "each caller gets its own decoded response"
+  assert hubspot._single_flight.coalesced == 9
+
+
+@pytest.mark.asyncio
+async def test_different_reads_and_writes_are_not_coalesced():
+  requests = []
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=_slow_transport(requests))
+
+  await asyncio.gather(
+    hubspot.get_contacts_by_committee("A"),
+    hubspot.get_contacts_by_committee("B"),
+    hubspot.update_contact("9601", {"firstname": "Luca"}),
+    hubspot.update_contact("9601", {"firstname": "Luca"}),
+  )
+  assert len(requests) == 4
+
+  hubspot = HubspotClient(hubspot_auth_token="12345", transport=_slow_transport(requests), coalesce=False)
+  await asyncio.gather(hubspot.get_contacts_by_committee("A"), hubspot.get_contacts_by_committee("A"))
+  assert len(requests) == 6
+
+
+@pytest.mark.asyncio
+async def test_exception_is_shared():
+  flight = SingleFlight()
+  calls = []
+
+  async def fail():
+    calls.append(1)
+    await asyncio.sleep(0.01)
+    raise ValueError("boom")
+
+  key = flight_key("post", "/search", json_body={"b": 1, "a": 2})
+  results = await asyncio.gather(flight.do(key, fail), flight.do(key, fail), return_exceptions=True)
+
+  assert len(calls) == 1
+  assert all(isinstance(result, ValueError) for result in results)
+  assert key == flight_key("POST", "/search", json_body={"a": 2, "b": 1})
@@ -0,0 +1,152 @@
+import asyncio
+
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot.async_client import HubspotClient
+from hubspotclient.client.hubspot.errors import HubspotError
+from hubspotclient.client.hubspot.fake import FakeHubspot
+from hubspotclient.client.hubspot.singleflight import SingleFlight
+from hubspotclient.client.hubspot.taskgroup import TaskGroup
+
+
+def _slow_transport(state, fail=()):
+  async def handler(request):
+    committee = request.read().decode()
+    state["running"] += 1
+    state["peak"] = max(state["peak"], state["running"])
+    try:
+      for name in fail:
+        if name in committee:
+          await asyncio.sleep(0.01)
+          return httpx.Response(400, json={"status": "error", "message": "bad " + name})
+      await asyncio.sleep(0.05)
+      state["finished"] += 1
+      return httpx.Response(200, json={"total": 0, "results": []})
+    except asyncio.CancelledError:
+      state["cancelled"] += 1
+      raise
+    finally:
+      state["running"] -= 1
+  return httpx.MockTransport(handler)
+
+
+def _state():
+  return {"running": 0, "peak": 0, "finished": 0, "cancelled": 0}
+
+
+@pytest.mark.asyncio
+async def test_map_is_bounded_and_ordered(make_client):
+  fake = FakeHubspot(latency=0.01).seed(contacts=20)
+  hubspot = make_client(fake, HubspotClient, retry=False)
+  contacts = fake.records("contacts")
+
+  results = await hubspot.map(
+    hubspot.get_contact_by_email, [c["properties"]["email"] for c in contacts], max_concurrency=5
+  )
+
+  assert [r.value["results"][0]["id"] for r in results] == [c["id"] for c in contacts]
+  assert [r.index for r in results] == list(range(20))
+
+
+@pytest.mark.asyncio
+async def test_collect_all_keeps_going(make_client):
+  state = _state()
+  hubspot = make_client(_slow_transport(state, fail=["C3"]), HubspotClient, retry=False)
+
+  async def _get(committee):
+    response = await hubspot.get_contacts_by_committee(committee)
+    if "status" in response:
+      raise HubspotError(response["message"], 400)
+    return response
+
+  results = await hubspot.map(_get, ["C{}".format(i) for i in range(8)], max_concurrency=3)
+  assert [r.ok for r in results] == [True] * 3 + [False] + [True] * 4
+  assert state["peak"] == 3 and state["finished"] == 7
+
+
+@pytest.mark.asyncio
+async def test_fail_fast_cancels_requests_in_flight(make_client):
+  state = _state()
+  hubspot = make_client(_slow_transport(state, fail=["C1"]), HubspotClient, retry=False)
+
+  async def _get(committee):
+    response = await hubspot.get_contacts_by_committee(committee)
+    if "status" in response:
+      raise HubspotError(response["message"], 400)
+    return response
+
+  with pytest.raises(HubspotError):
+    await hubspot.map(_get, ["C{}".format(i) for i in range(10)], max_concurrency=4, fail_fast=True)
+  assert state["cancelled"] == 3, "the other requests in flight"
+  assert state["finished"] == 0 and state["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_as_completed_streams_fastest_first(make_client):
+  delays = {"slow": 0.2, "fast": 0.0, "mid": 0.05}
+
+  async def _call(name):
+    await asyncio.sleep(delays[name])
+    return name
+
+  hubspot = make_client(httpx.MockTransport(lambda request: httpx.Response(200)), HubspotClient, retry=False)
+  names = [r.value async for r in hubspot.as_completed(_call, ["slow", "fast", "mid"])]
+  assert names == ["fast", "mid", "slow"]
+
+  async with TaskGroup(max_concurrency=2) as group:
+    tasks = [group.spawn(_call, name) for name in ("slow", "fast")]
+    async for task in group.as_completed():
+      assert task.result() == "fast"
+      group.cancel()
+  assert tasks[0].cancelled()
+
+  with pytest.raises(KeyError):
+    async with TaskGroup() as group:
+      slow = group.spawn(_call, "slow")
+      raise KeyError("an error in the block")
+  assert slow.cancelled(), "the calls don't outlive the block"
+
+
+@pytest.mark.asyncio
+async def test_as_completed_cancels_the_rest_on_close(make_client):
+  started, finished = [], []
+
+  async def _call(delay):
+    started.append(delay)
+    await asyncio.sleep(delay)
+    finished.append(delay)
+    return delay
+
+  hubspot = make_client(httpx.MockTransport(lambda request: httpx.Response(200)), HubspotClient, retry=False)
+  async with hubspot.as_completed(_call, [0.0, 0.2, 0.2]) as results:
+    async for result in results:
+      assert result.value == 0.0
+      break
+  assert started == [0.0, 0.2, 0.2]
+  await asyncio.sleep(0.3)
+  assert finished == [0.0], "the calls still running were cancelled"
+
+  results = hubspot.as_completed(_call, [0.0, 0.2])
+  assert (await results.__anext__()).value == 0.0
+  await results.aclose()
+  await asyncio.sleep(0.3)
+  assert finished == [0.0, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_cancel_followers():
+  flight = SingleFlight()
+  calls = []
+
+  async def _fetch():
+    calls.append(1)
+    await asyncio.sleep(0.05)
+    return len(calls)
+
+  leader = asyncio.ensure_future(flight.do("key", _fetch))
+  await asyncio.sleep(0)
+  follower = asyncio.ensure_future(flight.do("key", _fetch))
+  await asyncio.sleep(0.01)
+  leader.cancel()
+  assert await follower == 2, "sent again by the follower"
@@ -0,0 +1,113 @@
+import inspect
+import threading
+import time
+
+import httpx
+import pytest
+
+from hubspotclient.client.hubspot.base import BaseHubspotClient
+from hubspotclient.client.hubspot.ratelimit import RateLimiter
+from hubspotclient.unasync import unasync_function
+from hubspotclient.utils import maybe_sync, sleep
+
+
+class _Resource(object):
+  closed = False
+
+  def close(self):
+    self.closed = "sync"
+
+  async def aclose(self):
+    self.closed = "async"
+
+
+class _Widget(object):
+  def __init__(self, synchronous):
+    self.synchronous = synchronous
+    self.resource = _Resource()
+
+  @maybe_sync
+  async def double(self, n):
+    async def _inner(m):
+      await sleep(0)
+      return m * 2
+    return await _inner(n)
+
+  @maybe_sync
+  async def shutdown(self):
+    await self.resource.aclose()
+    return threading.current_thread().name
+
+  @maybe_sync
+  async def count(self, n):
+    for i in range(n):
+      await sleep(0)
+      yield i
+
+
+def test_sync_twin_is_plain_function():
+  widget = _Widget(synchronous=True)
+
+  assert widget.double(21) == 42
+  assert list(widget.count(3)) == [0, 1, 2]
+  widget.shutdown()
+  assert widget.resource.closed == "sync"
+
+
+@pytest.mark.asyncio
+async def test_async_source_is_unchanged():
+  widget = _Widget(synchronous=False)
+
+  assert await widget.double(21) == 42
+  assert [i async for i in widget.count(3)] == [0, 1, 2]
+  await widget.shutdown()
+  assert widget.resource.closed == "async"
+
+
+def test_closures_are_rejected():
+  n = 1
+
+  async def closure():
+    return n
+
+  with pytest.raises(TypeError):
+    unasync_function(closure)
+
+
+def test_missing_source_is_reported(monkeypatch):
+  async def compiled():
+    return 1
+
+  def no_source(fn):
+    raise OSError("could not get source code")
+
+  monkeypatch.setattr(inspect, "getsource", no_source)
+  with pytest.raises(RuntimeError) as e:
+    unasync_function(compiled)
+  assert "source code is not available" in str(e.value)
+
+
+class _SyncClient(BaseHubspotClient):
+  client_cls = httpx.Client
+  synchronous = True
+
+
+def test_sync_client_really_sleeps():
+  def handler(request):
+    return httpx.Response(200, json={"total": 0, "results": []})
+
+  # the second call has to wait for the rate limiter, which the old coroutine
+  # stepping couldn't do
+  hubspot = _SyncClient(
+    hubspot_auth_token="12345",
+    transport=httpx.MockTransport(handler),
+    rate_limiter=RateLimiter(interval_max=1, interval_seconds=0.1),
+  )
+  started = time.monotonic()
+  assert hubspot.get_contact_by_email("a@example.org") == {"total": 0, "results": []}
+  assert hubspot.get_contact_by_email("b@example.org") == {"total": 0, "results": []}
+  assert time.monotonic() - started >= 0.09
+
+  assert isinstance(hubspot._pool.client, httpx.Client)
+  hubspot.close()
+  assert not hubspot._pool.is_open